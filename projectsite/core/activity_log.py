@@ -0,0 +1,115 @@
+# core/activity_log.py
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connections
+from django.utils import timezone
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogBuffer:
+    """Collect login/logout audit rows in memory and write them with one bulk insert.
+
+    Every entry is kept (unlike read events, nothing is summarised), but a
+    burst of logins at a shift change costs one INSERT per
+    ACTIVITY_LOG_BATCH_SIZE entries instead of one per login. A quieter
+    trickle is written ACTIVITY_LOG_FLUSH_SECONDS after its first entry.
+    Rows keep the time of the event in created_at. Queued rows live only
+    in this process until written, so a killed worker loses them; that is
+    why 'immediate' is the default mode.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = []
+        self._timer = None
+
+    def record(self, user, action, target, detail):
+        """Queue one audit row by `user`"""
+        target_model, target_pk = AuditLog.split_target(target)
+        row = AuditLog(
+            user_id=getattr(user, 'pk', None),
+            action=action,
+            target=target,
+            target_model=target_model,
+            target_pk=target_pk,
+            detail=detail,
+            created_at=timezone.now(),
+        )
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= settings.ACTIVITY_LOG_BATCH_SIZE
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def _schedule(self):
+        """Start the flush timer unless one is pending; call with the lock held"""
+        if self._timer is None:
+            self._timer = threading.Timer(settings.ACTIVITY_LOG_FLUSH_SECONDS, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write the queued rows; returns how many were written"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not rows:
+            return 0
+        try:
+            try:
+                AuditLog.objects.bulk_create(rows)
+            except IntegrityError:
+                # A user deleted since the event: keep the row without them, as on_delete=SET_NULL would
+                existing = set(User.objects.filter(pk__in={row.user_id for row in rows}).values_list('pk', flat=True))
+                for row in rows:
+                    if row.user_id not in existing:
+                        row.user_id = None
+                AuditLog.objects.bulk_create(rows)
+        except Exception:
+            # Auditing should not break the main flow; keep the rows for the next flush
+            logger.exception('Could not write %d audit rows; keeping them queued', len(rows))
+            with self._lock:
+                self._rows[:0] = rows
+                self._schedule()
+            return 0
+        return len(rows)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's own connection
+            connections.close_all()
+
+
+activity_log = ActivityLogBuffer()
+
+
+def log_activity(user, action, target, detail):
+    """Audit a login or logout.
+
+    ACTIVITY_LOG selects the mode:
+      'immediate' - write the row now (default)
+      'batched'   - queue in memory, write in bulk
+    """
+    if settings.ACTIVITY_LOG == 'batched':
+        activity_log.record(user, action, target, detail)
+    else:
+        try:
+            AuditLog.objects.create(user=user, action=action, target=target, detail=detail)
+        except Exception:
+            # Fail silently; auditing should not break main flow
+            pass
+
+
+# Do not lose queued rows when the worker process exits
+atexit.register(activity_log.flush)
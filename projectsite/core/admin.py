@@ -1,6 +1,6 @@
 # core/admin.py
 from django.contrib import admin
-from .models import Supplier, Category, Product, PurchaseOrder, PurchaseItem, AuditLog, UserRole
+from .models import Supplier, Category, Product, PurchaseOrder, PurchaseItem, AuditLog, AuditLogArchive, UserRole, Job
 
 @admin.register(UserRole)
 class UserRoleAdmin(admin.ModelAdmin):
@@ -42,3 +42,15 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_display = ('user','action','target','created_at')
     search_fields = ('action','target')
     list_filter = ('user','created_at')
+
+@admin.register(AuditLogArchive)
+class AuditLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ('filename','period_start','period_end','row_count','size_bytes','created_at')
+    search_fields = ('filename',)
+    readonly_fields = ('filename','period_start','period_end','first_id','last_id','row_count','size_bytes','sha256')
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id','kind','status','progress','attempts','created_by','created_at','finished_at')
+    list_filter = ('kind','status')
+    readonly_fields = ('locked_by','locked_at','started_at','finished_at','result','result_file','error')
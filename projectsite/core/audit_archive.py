@@ -0,0 +1,335 @@
+# core/audit_archive.py
+import gzip
+import hashlib
+import heapq
+import json
+import os
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import AuditLog, AuditLogArchive
+
+
+class AuditArchiver:
+    """Move old AuditLog rows into monthly compressed NDJSON files"""
+
+    ARCHIVE_DIR = Path(settings.AUDIT_ARCHIVE_DIR)
+
+    @staticmethod
+    def serialize(log):
+        return {
+            'id': log.id,
+            'created_at': log.created_at.isoformat(),
+            'user_id': log.user_id,
+            'username': log.user.username if log.user_id and log.user else None,
+            'action': log.action,
+            'target': log.target,
+            'target_model': log.target_model,
+            'target_pk': log.target_pk,
+            'detail': log.detail,
+            'changes': log.changes,
+        }
+
+    @staticmethod
+    def _month_bounds(dt):
+        start = dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start, end
+
+    @staticmethod
+    def _file_sha256(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _verify(path, expected_ids):
+        """Re-read the archive and make sure every row round-trips"""
+        found = []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                found.append(json.loads(line)['id'])
+        return found == expected_ids
+
+    @staticmethod
+    def archive_batch(logs):
+        """Write one batch (all rows from the same month) to disk, verify it, then delete it.
+
+        Returns the AuditLogArchive index entry.
+        """
+        first, last = logs[0], logs[-1]
+        month_dir = AuditArchiver.ARCHIVE_DIR / first.created_at.strftime('%Y-%m')
+        month_dir.mkdir(parents=True, exist_ok=True)
+        path = month_dir / f"auditlog_{first.created_at:%Y%m}_{first.id}-{last.id}.ndjson.gz"
+        tmp_path = path.with_name(path.name + '.tmp')
+
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            for log in logs:
+                f.write(json.dumps(AuditArchiver.serialize(log), separators=(',', ':'), cls=DjangoJSONEncoder) + '\n')
+
+        ids = [log.id for log in logs]
+        if not AuditArchiver._verify(tmp_path, ids):
+            tmp_path.unlink()
+            raise RuntimeError(f'Verification failed for {path.name}')
+        os.replace(tmp_path, path)
+
+        with transaction.atomic():
+            archive = AuditLogArchive.objects.create(
+                filename=str(path.relative_to(AuditArchiver.ARCHIVE_DIR)),
+                period_start=min(log.created_at for log in logs),
+                period_end=max(log.created_at for log in logs),
+                first_id=first.id,
+                last_id=last.id,
+                row_count=len(logs),
+                size_bytes=path.stat().st_size,
+                sha256=AuditArchiver._file_sha256(path),
+            )
+            AuditLog.objects.filter(id__in=ids).delete()
+        return archive
+
+    @staticmethod
+    def archive_older_than(days=None, batch_size=5000, dry_run=False):
+        """
+        Archive audit rows older than `days`, oldest month first
+
+        Returns:
+            dict: {status, archived_rows, archives, cutoff}
+        """
+        if days is None:
+            days = settings.AUDIT_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=days)
+        old = AuditLog.objects.filter(created_at__lt=cutoff)
+        if dry_run:
+            return {'status': 'success', 'archived_rows': old.count(), 'archives': [], 'cutoff': cutoff.isoformat()}
+
+        archived_rows = 0
+        archives = []
+        while True:
+            oldest = old.order_by('created_at', 'id').only('created_at').first()
+            if oldest is None:
+                break
+            month_start, month_end = AuditArchiver._month_bounds(timezone.localtime(oldest.created_at))
+            batch = list(
+                old.filter(created_at__gte=month_start, created_at__lt=month_end)
+                .select_related('user')
+                .order_by('created_at', 'id')[:batch_size]
+            )
+            archive = AuditArchiver.archive_batch(batch)
+            archived_rows += archive.row_count
+            archives.append(archive.filename)
+        return {'status': 'success', 'archived_rows': archived_rows, 'archives': archives, 'cutoff': cutoff.isoformat()}
+
+    @staticmethod
+    def search(audit_filter):
+        """
+        Archived entries matching `audit_filter`, newest first
+
+        Nothing is read until the result is counted or sliced; see ArchivedEntries.
+        """
+        archives = AuditLogArchive.objects.all()
+        if audit_filter.start:
+            archives = archives.filter(period_end__gte=audit_filter.start)
+        if audit_filter.end:
+            archives = archives.filter(period_start__lt=audit_filter.end)
+        return ArchivedEntries(list(archives.order_by('-period_start', '-first_id')), audit_filter)
+
+
+class AuditLogFilter:
+    """The audit log page's filters, applied alike to the table (as a query) and to archived rows"""
+
+    def __init__(self, q='', action='', target='', start=None, end=None):
+        self.q = (q or '').strip()
+        # Actions are stored lower-case
+        self.action = (action or '').strip().lower()
+        self.target = (target or '').strip()
+        self.target_model, self.target_pk = AuditLog.resolve_target(self.target)
+        self.start = start
+        self.end = end
+
+    @property
+    def filters_rows(self):
+        """Whether anything besides the date range narrows the rows"""
+        return bool(self.q or self.action or self.target)
+
+    def target_query(self):
+        """Indexed lookup for "Model:pk" or "Model" targets; free text falls back to a scan"""
+        model, pk = self.target_model, self.target_pk
+        if model and pk:
+            lookup = Q(target_model=model, target_pk=pk)
+            legacy = Q(target__iexact=f'{model}:{pk}')
+        elif model:
+            lookup = Q(target_model=model)
+            legacy = Q(target__istartswith=f'{model}:')
+        else:
+            return Q(target__icontains=self.target)
+        # Rows not yet backfilled by `backfill_audit_targets` still carry only the free-text target
+        return lookup | (Q(target_model__isnull=True) & legacy)
+
+    def apply(self, queryset):
+        if self.q:
+            queryset = queryset.filter(detail__icontains=self.q)
+        if self.action:
+            # An exact match can use the (action, created_at) index
+            queryset = queryset.filter(action=self.action)
+        if self.target:
+            queryset = queryset.filter(self.target_query())
+        if self.start:
+            queryset = queryset.filter(created_at__gte=self.start)
+        if self.end:
+            queryset = queryset.filter(created_at__lt=self.end)
+        return queryset
+
+    def _matches_target(self, row):
+        text = (row['target'] or '').lower()
+        model, pk = self.target_model, self.target_pk
+        if not model:
+            return self.target.lower() in text
+        # Archived before the structured columns existed (or before the backfill): use the free-text target
+        if row.get('target_model') is None:
+            return text == f'{model}:{pk}'.lower() if pk else text.startswith(f'{model}:'.lower())
+        return row['target_model'] == model and (not pk or row['target_pk'] == pk)
+
+    def matches(self, row):
+        """apply() for one archived row (with created_at already parsed)"""
+        if self.start and row['created_at'] < self.start:
+            return False
+        if self.end and row['created_at'] >= self.end:
+            return False
+        if self.q and self.q.lower() not in (row['detail'] or '').lower():
+            return False
+        if self.action and self.action != row['action']:
+            return False
+        return not self.target or self._matches_target(row)
+
+
+class ArchivedEntries:
+    """
+    Archived rows matching a filter, newest first, read lazily
+
+    Counting and slicing stream the archive files, so memory is bounded by
+    one archive (at most one archive_older_than batch) rather than by the
+    whole range. An archive entirely inside the range is counted from its
+    index row when no other filter applies, without opening it. Entries
+    expose the attributes the audit log template uses (created_at,
+    user.username, action, target, detail).
+    """
+
+    def __init__(self, archives, audit_filter):
+        self.archives = archives
+        self.filter = audit_filter
+        self._counts = None
+
+    def _rows(self, archive):
+        """Matching rows of one archive, newest first"""
+        path = AuditArchiver.ARCHIVE_DIR / archive.filename
+        if not path.exists():
+            return []
+        rows = []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                row['created_at'] = datetime.fromisoformat(row['created_at'])
+                if self.filter.matches(row):
+                    rows.append(row)
+        # Archives are written oldest first
+        rows.reverse()
+        return rows
+
+    def _count(self, archive):
+        inside = (
+            (not self.filter.start or archive.period_start >= self.filter.start)
+            and (not self.filter.end or archive.period_end < self.filter.end)
+        )
+        if inside and not self.filter.filters_rows:
+            return archive.row_count
+        return len(self._rows(archive))
+
+    @staticmethod
+    def _entry(row):
+        return SimpleNamespace(
+            id=row['id'],
+            created_at=row['created_at'],
+            user=SimpleNamespace(username=row['username']) if row['username'] else None,
+            action=row['action'],
+            target=row['target'],
+            detail=row['detail'],
+            changes=row.get('changes'),
+            archived=True,
+        )
+
+    def count(self):
+        if self._counts is None:
+            self._counts = [self._count(archive) for archive in self.archives]
+        return sum(self._counts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        """Entries [start:stop], reading only the archives that hold them"""
+        start, stop = index.start or 0, index.stop
+        self.count()
+        entries = []
+        offset = 0
+        for archive, count in zip(self.archives, self._counts):
+            if stop is not None and offset >= stop:
+                break
+            if offset + count > start:
+                rows = self._rows(archive)
+                first = max(start - offset, 0)
+                last = None if stop is None else stop - offset
+                entries.extend(self._entry(row) for row in rows[first:last])
+            offset += count
+        return entries
+
+
+class AuditTrail:
+    """
+    Audit log rows (a lazy queryset, newest first) and archived rows, merged
+    newest first by (created_at, id)
+
+    Table rows newer than every archive come first and are sliced straight
+    from the queryset. Below that, the table and the archives can overlap
+    (e.g. after a partial archive run), so a page is merged from the first
+    rows of both. The paginator counts both sources and slices only the page
+    it shows, so a page view never loads the whole table or every archive.
+    """
+
+    def __init__(self, queryset, archived):
+        newest_archived = max(archive.period_end for archive in archived.archives)
+        self.newer = queryset.filter(created_at__gt=newest_archived)
+        self.overlapping = queryset.filter(created_at__lte=newest_archived)
+        self.archived = archived
+        self._newer_count = None
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._newer_count = self.newer.count()
+            self._count = self._newer_count + self.overlapping.count() + self.archived.count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        start, stop = index.start or 0, index.stop
+        self.count()
+        newer_count = self._newer_count
+        entries = list(self.newer[start:min(stop, newer_count)]) if start < newer_count else []
+        if stop > newer_count:
+            first, last = max(start - newer_count, 0), stop - newer_count
+            merged = heapq.merge(
+                self.overlapping[:last], self.archived[:last],
+                key=lambda entry: (entry.created_at, entry.id), reverse=True,
+            )
+            entries.extend(islice(merged, first, last))
+        return entries
@@ -1,14 +1,451 @@
 # core/backup.py
 import json
 import gzip
+import hashlib
+import logging
 import os
+import re
+import subprocess
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from django.db import connection
+from django.db import connections
 from django.core.management import call_command
 from django.conf import settings
+from django.contrib.auth.models import User
+from .changelog import ChangeLog
+from .report_cache import ReportCache
+from .roles import RoleCache
 import sqlite3
-import shutil
+
+logger = logging.getLogger(__name__)
+
+# Read/write buffer for streaming restores
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# backup_<YYYYmmdd>_<HHMMSS>[_suffix].<ext>
+BACKUP_TIMESTAMP_RE = re.compile(r'^backup_(\d{8}_\d{6})(?:_[\w]+)?\.')
+
+
+class SQLiteBackend:
+    """Backup backend for the file-based SQLite database"""
+
+    vendor = 'sqlite'
+    extension = '.db.gz'
+    # Restore points are stored uncompressed
+    restore_extensions = ('.db.gz', '.db')
+
+    def __init__(self, db_settings):
+        self.db_path = db_settings['NAME']
+        self.timeout = db_settings.get('OPTIONS', {}).get('timeout', 5)
+
+    def size_hint(self):
+        """Approximate dump size in bytes, for progress reporting"""
+        return os.path.getsize(self.db_path)
+
+    @contextmanager
+    def open_dump(self):
+        """Yield a readable binary stream of the database contents"""
+        with open(self.db_path, 'rb') as f_in:
+            yield f_in
+
+    def load(self, stream, before_swap=None, progress=None):
+        """
+        Replace the database with the given binary stream
+
+        The stream is written to a temp file next to the database, fsync'd and
+        checked with `PRAGMA integrity_check`; only then is the file renamed
+        over the live database. A crash at any point leaves either the old or
+        the new database, never a mix. `before_swap` (the restore point) runs
+        after verification, while other connections can still write; only the
+        rename runs under an exclusive lock on the live database, so no
+        journal can be in use when the file is replaced.
+        """
+        db_path = Path(self.db_path)
+        tmp_path = db_path.with_name(db_path.name + '.restore-tmp')
+        try:
+            with open(tmp_path, 'wb') as f_out:
+                copy_stream(stream, f_out, progress)
+                f_out.flush()
+                os.fsync(f_out.fileno())
+            self._integrity_check(tmp_path)
+            if before_swap:
+                before_swap()
+
+            connections.close_all()
+            with self._exclusive_lock():
+                os.replace(tmp_path, db_path)
+                _fsync_directory(db_path.parent)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @contextmanager
+    def _exclusive_lock(self):
+        """
+        Hold an EXCLUSIVE lock on the live database
+
+        Taking it rolls back any hot journal left by a crashed writer, and
+        while it is held no other connection can have a journal open.
+        Writers wait up to the database's busy timeout, as they would for
+        any long transaction.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        try:
+            # In WAL mode readers and the -wal/-shm files outlive the lock; backups copy the main file only
+            if conn.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal':
+                raise RuntimeError('Cannot restore over a database in WAL mode; switch it to journal_mode=DELETE first')
+            conn.execute('BEGIN EXCLUSIVE')
+            yield
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _integrity_check(path):
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute('PRAGMA integrity_check').fetchall()
+        except sqlite3.DatabaseError as e:
+            # e.g. 'file is not a database'
+            rows = [(str(e),)]
+        finally:
+            conn.close()
+        if rows != [('ok',)]:
+            problems = '; '.join(str(row[0]) for row in rows[:5])
+            raise RuntimeError(f'Backup failed integrity check: {problems}')
+
+    def create_restore_point(self, timestamp):
+        """
+        Snapshot the live database before it is replaced
+
+        Copied with SQLite's online backup API, RESTORE_POINT_STEP_PAGES
+        pages at a time: each step holds a read lock only briefly, so writers
+        keep going, and a write between steps restarts the copy, so the
+        result is always a consistent snapshot. Writes committed after the
+        snapshot and before the swap are in neither database.
+        """
+        copy_path = BackupManager.get_backup_path(timestamp, '.db')
+        counter = 1
+        while copy_path.exists():
+            copy_path = BackupManager.get_backup_path(f'{timestamp}_{counter}', '.db')
+            counter += 1
+        source = sqlite3.connect(self.db_path, timeout=self.timeout)
+        target = sqlite3.connect(copy_path)
+        try:
+            source.backup(target, pages=settings.RESTORE_POINT_STEP_PAGES)
+        finally:
+            target.close()
+            source.close()
+        return copy_path
+
+
+class PostgreSQLBackend:
+    """Backup backend that streams `pg_dump` output and restores through `psql`"""
+
+    vendor = 'postgresql'
+    extension = '.sql.gz'
+    restore_extensions = ('.sql.gz',)
+
+    def __init__(self, db_settings):
+        self.db_settings = db_settings
+
+    def _connection_args(self):
+        args = []
+        for flag, key in (('--host', 'HOST'), ('--port', 'PORT'), ('--username', 'USER')):
+            value = self.db_settings.get(key)
+            if value:
+                args += [flag, str(value)]
+        args += ['--dbname', str(self.db_settings['NAME'])]
+        return args
+
+    def _env(self):
+        env = os.environ.copy()
+        if self.db_settings.get('PASSWORD'):
+            env['PGPASSWORD'] = self.db_settings['PASSWORD']
+        return env
+
+    def size_hint(self):
+        """On-disk database size; a plain-SQL dump is usually of the same order"""
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT pg_database_size(current_database())')
+            return cursor.fetchone()[0]
+
+    @contextmanager
+    def open_dump(self):
+        """Yield the stdout of a running plain-SQL `pg_dump`"""
+        cmd = [
+            getattr(settings, 'PG_DUMP_BIN', 'pg_dump'),
+            '--clean', '--if-exists', '--no-owner', '--no-privileges',
+            *self._connection_args(),
+        ]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self._env())
+        try:
+            yield proc.stdout
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            returncode = proc.wait()
+        if returncode != 0:
+            raise RuntimeError(f"pg_dump failed: {stderr.decode(errors='replace').strip()}")
+
+    def create_restore_point(self, timestamp):
+        """Dump the current database as a compressed restore point"""
+        path = BackupManager.get_backup_path(timestamp, self.extension)
+        with self.open_dump() as f_in:
+            parallel_gzip(f_in, path)
+        return path
+
+    def load(self, stream, before_swap=None, progress=None):
+        """Feed a plain-SQL dump to `psql` in a single transaction"""
+        if before_swap:
+            before_swap()
+        connections.close_all()
+        cmd = [
+            getattr(settings, 'PSQL_BIN', 'psql'),
+            '--quiet', '--single-transaction', '--set', 'ON_ERROR_STOP=1',
+            *self._connection_args(),
+        ]
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE, env=self._env()
+        )
+        try:
+            copy_stream(stream, proc.stdin, progress)
+        except BrokenPipeError:
+            # psql exited early; its stderr below explains why
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"psql restore failed: {stderr.decode(errors='replace').strip()}")
+
+
+def _fsync_directory(path):
+    """Persist a rename by syncing its directory entry (not supported on Windows)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def copy_stream(f_in, f_out, progress=None):
+    """Copy a binary stream in COPY_BUFFER_SIZE blocks, calling `progress(bytes_copied)` after each"""
+    copied = 0
+    for chunk in iter(lambda: f_in.read(COPY_BUFFER_SIZE), b''):
+        f_out.write(chunk)
+        copied += len(chunk)
+        if progress:
+            progress(copied)
+
+
+@contextmanager
+def open_backup_file(path):
+    """Open a backup for streaming reads, decompressing `.gz` files on the fly"""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as f_in:
+        yield f_in
+
+
+def parallel_gzip(f_in, dest_path, level=None, workers=None, chunk_size=None, progress=None):
+    """
+    Compress a binary stream into a multi-member gzip file using a thread pool
+
+    The input is read in fixed-size chunks; each chunk is compressed as an
+    independent gzip member (zlib releases the GIL, so threads scale across
+    cores) and members are written in input order. Any gzip reader,
+    including `gzip.open` and `gunzip`, decompresses the concatenation.
+    `progress`, if given, is called with the number of bytes read so far.
+
+    Returns:
+        dict: Compression statistics and the SHA-256 of the uncompressed input
+    """
+    level = settings.BACKUP_COMPRESSION_LEVEL if level is None else level
+    workers = settings.BACKUP_COMPRESSION_WORKERS if workers is None else workers
+    chunk_size = settings.BACKUP_COMPRESSION_CHUNK_SIZE if chunk_size is None else chunk_size
+    workers = max(1, workers)
+
+    started = time.monotonic()
+    bytes_in = 0
+    digest = hashlib.sha256()
+    with open(dest_path, 'wb') as f_out, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            chunk = f_in.read(chunk_size)
+            if not chunk:
+                break
+            bytes_in += len(chunk)
+            # Checksum of the uncompressed data, verified end to end by `verify_backups`
+            digest.update(chunk)
+            pending.append(pool.submit(gzip.compress, chunk, level, mtime=0))
+            # Bound memory to a couple of chunks per worker
+            if len(pending) >= workers * 2:
+                f_out.write(pending.popleft().result())
+            if progress:
+                progress(bytes_in)
+        while pending:
+            f_out.write(pending.popleft().result())
+
+    seconds = max(time.monotonic() - started, 1e-6)
+    throughput = bytes_in / (1024 * 1024) / seconds
+    return {
+        'level': level,
+        'workers': workers,
+        'chunk_size': chunk_size,
+        'input_bytes': bytes_in,
+        'seconds': round(seconds, 3),
+        'throughput_mb_s': round(throughput, 2),
+        'throughput_per_core_mb_s': round(throughput / workers, 2),
+        'sha256': digest.hexdigest(),
+    }
+
+
+def get_backup_backend():
+    """Return the backup backend matching the default database engine"""
+    db_settings = settings.DATABASES['default']
+    if 'postgresql' in db_settings['ENGINE']:
+        return PostgreSQLBackend(db_settings)
+    return SQLiteBackend(db_settings)
+
+
+class BackupCatalog:
+    """
+    SQLite index of backup metadata kept in the backup directory
+
+    Listing, counting and lookups by filename are indexed queries instead of
+    a glob plus one JSON read per backup. The JSON sidecar files are still
+    written; a missing catalog is rebuilt from them on first use.
+    """
+
+    FILENAME = 'catalog.sqlite3'
+
+    def __init__(self, backup_dir):
+        self.backup_dir = Path(backup_dir)
+        self.path = self.backup_dir / self.FILENAME
+
+    @contextmanager
+    def _connect(self):
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists()
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS backups ('
+                'filename TEXT PRIMARY KEY, created TEXT NOT NULL, '
+                'size INTEGER NOT NULL DEFAULT 0, metadata TEXT NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS backups_created_idx ON backups (created)')
+            if is_new:
+                self._import_sidecars(conn)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(metadata):
+        return (
+            metadata['filename'],
+            metadata.get('datetime') or metadata.get('timestamp', ''),
+            metadata.get('size', 0),
+            json.dumps(metadata),
+        )
+
+    def _import_sidecars(self, conn):
+        rows = []
+        for metadata_file in self.backup_dir.glob('backup_*.json'):
+            try:
+                with open(metadata_file, 'r') as f:
+                    metadata = json.load(f)
+                if metadata.get('filename'):
+                    rows.append(self._row(metadata))
+            except Exception:
+                logger.exception('Could not read backup metadata %s; leaving it out of the catalog', metadata_file)
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO backups VALUES (?, ?, ?, ?)', rows)
+
+    def rebuild(self):
+        """Recreate the catalog from the JSON sidecar files"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM backups')
+            self._import_sidecars(conn)
+
+    def add(self, metadata):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO backups VALUES (?, ?, ?, ?)', self._row(metadata))
+
+    def update(self, filename, **fields):
+        """Merge fields into a backup's stored metadata"""
+        metadata = self.get(filename)
+        if metadata is None:
+            return None
+        metadata.update(fields)
+        self.add(metadata)
+        return metadata
+
+    def remove(self, filename):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM backups WHERE filename = ?', (filename,))
+
+    def get(self, filename):
+        with self._connect() as conn:
+            row = conn.execute('SELECT metadata FROM backups WHERE filename = ?', (filename,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, offset=0, limit=None):
+        """Backups newest first; `limit=None` returns everything after `offset`"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT metadata FROM backups ORDER BY created DESC, filename DESC LIMIT ? OFFSET ?',
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM backups').fetchone()[0]
+
+    def totals(self):
+        """Return (count, total size in bytes)"""
+        with self._connect() as conn:
+            count, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM backups').fetchone()
+        return count, size
+
+
+class BackupList:
+    """Lazy sequence over the catalog so a Paginator only loads the requested page"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def count(self):
+        return self.catalog.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start = key.start or 0
+            limit = None if key.stop is None else max(0, key.stop - start)
+            return self.catalog.list(offset=start, limit=limit)
+        rows = self.catalog.list(offset=key, limit=1)
+        if not rows:
+            raise IndexError(key)
+        return rows[0]
+
 
 class BackupManager:
     """Manage database backups and recovery"""
@@ -20,37 +457,49 @@ class BackupManager:
         self.BACKUP_DIR.mkdir(exist_ok=True)
     
     @staticmethod
-    def get_backup_path(timestamp=None):
+    def get_catalog():
+        """Return the catalog for the backup directory"""
+        return BackupCatalog(BackupManager.BACKUP_DIR)
+    
+    @staticmethod
+    def get_backup_path(timestamp=None, extension=None):
         """Generate backup file path"""
         if timestamp is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        return BackupManager.BACKUP_DIR / f'backup_{timestamp}.db.gz'
+        if extension is None:
+            extension = get_backup_backend().extension
+        return BackupManager.BACKUP_DIR / f'backup_{timestamp}{extension}'
     
     @staticmethod
-    def create_backup(description=""):
+    def create_backup(description="", tier=None, progress=None):
         """
         Create a complete database backup
         
         Args:
             description: Optional description for the backup
+            tier: Retention tier for scheduled backups ('hourly', 'daily', 'weekly');
+                  manual backups (None) are never removed by the retention policy
+            progress: Optional callable(bytes_done, bytes_expected) for long-running callers
             
         Returns:
             dict: Backup metadata {filename, path, size, timestamp, description}
         """
         try:
+            backend = get_backup_backend()
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_path = BackupManager.get_backup_path(timestamp)
+            backup_path = BackupManager.get_backup_path(timestamp, backend.extension)
             
             # Ensure backup directory exists
             backup_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Get current database file
-            db_path = settings.DATABASES['default']['NAME']
-            
-            # Create gzip compressed backup
-            with open(db_path, 'rb') as f_in:
-                with gzip.open(backup_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            # Stream the database dump through the parallel gzip compressor
+            on_chunk = None
+            if progress:
+                expected = backend.size_hint()
+                on_chunk = lambda done: progress(done, expected)
+            with backend.open_dump() as f_in:
+                compression = parallel_gzip(f_in, backup_path, progress=on_chunk)
+            checksum = compression.pop('sha256')
             
             # Get file size
             file_size = backup_path.stat().st_size
@@ -64,6 +513,10 @@ class BackupManager:
                 'timestamp': timestamp,
                 'datetime': datetime.now().isoformat(),
                 'description': description,
+                'engine': backend.vendor,
+                'tier': tier,
+                'sha256': checksum,
+                'compression': compression,
                 'status': 'success'
             }
             
@@ -71,6 +524,7 @@ class BackupManager:
             metadata_path = backup_path.with_suffix('.json')
             with open(metadata_path, 'w') as f:
                 json.dump(metadata, f, indent=2)
+            BackupManager.get_catalog().add(metadata)
             
             return metadata
             
@@ -82,42 +536,70 @@ class BackupManager:
             }
     
     @staticmethod
-    def get_backups():
+    def get_backups(offset=0, limit=None):
         """
-        Get list of all available backups
+        Get list of available backups, newest first
+        
+        Args:
+            offset: Number of backups to skip
+            limit: Maximum number to return (None = all)
         
         Returns:
-            list: Sorted list of backup metadata
+            list: Backup metadata dicts
         """
-        backups = []
-        backup_dir = BackupManager.BACKUP_DIR
-        
-        if not backup_dir.exists():
-            return backups
-        
-        # Find all .json metadata files
-        for metadata_file in sorted(backup_dir.glob('backup_*.json'), reverse=True):
-            try:
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
-                    backups.append(metadata)
-            except Exception as e:
-                print(f"Error reading metadata {metadata_file}: {e}")
+        return BackupManager.get_catalog().list(offset=offset, limit=limit)
+    
+    @staticmethod
+    def get_backup(backup_filename):
+        """Return metadata for one backup, or None if it is not in the catalog"""
+        return BackupManager.get_catalog().get(backup_filename)
+    
+    @staticmethod
+    def find_base_backup(target_time):
+        """
+        Return metadata of the newest backup taken at or before `target_time`
         
-        return backups
+        Backups from history that a later restore rolled back are skipped.
+        """
+        backend = get_backup_backend()
+        restores = ChangeLog.restores()
+        for backup in BackupManager.get_backups():
+            created = BackupManager.parse_backup_timestamp(backup['filename'])
+            if created is None or created > target_time:
+                continue
+            if not backup['filename'].endswith(backend.restore_extensions) or ChangeLog.abandoned(created, restores):
+                continue
+            return backup
+        return None
     
     @staticmethod
-    def restore_backup(backup_filename):
+    def restore_backup(backup_filename=None, target_time=None, progress=None):
         """
         Restore database from backup
         
+        With `target_time`, performs a point-in-time restore: the nearest
+        full backup at or before `target_time` (or `backup_filename`, if
+        given) is restored and the captured row changes up to `target_time`
+        are replayed on top of it.
+        
         Args:
             backup_filename: Name of backup file (e.g., 'backup_20251204_120000.db.gz')
+            target_time: Optional datetime to roll forward to
+            progress: Optional callable(bytes_done, bytes_expected), called as the backup is loaded
             
         Returns:
             dict: Restoration result
         """
         try:
+            if target_time is not None and backup_filename is None:
+                base = BackupManager.find_base_backup(target_time)
+                if base is None:
+                    return {
+                        'status': 'error',
+                        'error': f'No backup found at or before {target_time:%Y-%m-%d %H:%M:%S}'
+                    }
+                backup_filename = base['filename']
+            
             backup_path = BackupManager.BACKUP_DIR / backup_filename
             
             # Verify backup exists
@@ -127,29 +609,65 @@ class BackupManager:
                     'error': f'Backup file not found: {backup_filename}'
                 }
             
-            # Get current database path
-            db_path = settings.DATABASES['default']['NAME']
+            backend = get_backup_backend()
+            if not backup_path.name.endswith(backend.restore_extensions):
+                return {
+                    'status': 'error',
+                    'error': f'Backup {backup_filename} was not created by the {backend.vendor} backend'
+                }
             
-            # Create a restore point backup before restoring
-            restore_point = BackupManager.get_backup_path(
-                datetime.now().strftime('%Y%m%d_%H%M%S_restore_point')
-            )
-            with open(db_path, 'rb') as f_in:
-                with gzip.open(restore_point, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            backup_time = BackupManager.parse_backup_timestamp(backup_filename)
+            if target_time is not None and backup_time and backup_time > target_time:
+                return {
+                    'status': 'error',
+                    'error': f'Backup {backup_filename} was taken after {target_time:%Y-%m-%d %H:%M:%S}'
+                }
             
-            # Restore from backup
-            with gzip.open(backup_path, 'rb') as f_in:
-                with open(db_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            # The restore point is taken only once the new data has been verified
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_restore_point')
+            restore_points = []
             
-            return {
+            def take_restore_point():
+                restore_points.append(backend.create_restore_point(timestamp))
+            
+            on_chunk = None
+            if progress:
+                # Uncompressed size as recorded at creation; restore points are stored uncompressed
+                metadata = BackupManager.get_backup(backup_filename) or {}
+                expected = metadata.get('compression', {}).get('input_bytes') or backup_path.stat().st_size
+                on_chunk = lambda done: progress(done, expected)
+            
+            # Stream-decompress the backup and swap it in
+            with open_backup_file(backup_path) as f_in:
+                backend.load(f_in, before_swap=take_restore_point, progress=on_chunk)
+            restore_point = restore_points[0]
+            
+            result = {
                 'status': 'success',
                 'message': f'Database restored from {backup_filename}',
                 'restore_point': restore_point.name,
                 'timestamp': datetime.now().isoformat()
             }
             
+            restored_to = backup_time or datetime.now()
+            if target_time is not None:
+                # Changes committed while the backup was being taken are replayed too;
+                # full-row images make that harmless
+                changes = ChangeLog.read(since=backup_time, until=target_time)
+                try:
+                    result['changes_applied'] = ChangeLog.apply(changes)
+                    restored_to = target_time
+                    result['message'] += f' and rolled forward to {target_time:%Y-%m-%d %H:%M:%S}'
+                except Exception as e:
+                    result.update(status='error', error=f'Restored {backup_filename} but replaying changes failed: {e}')
+            
+            # Later changes belong to the history this restore rolled back
+            ChangeLog.record_restore(restored_to)
+            # Cached reports and roles describe the data that was just replaced
+            ReportCache.bump()
+            RoleCache.invalidate(*User.objects.values_list('pk', flat=True))
+            return result
+            
         except Exception as e:
             return {
                 'status': 'error',
@@ -157,6 +675,83 @@ class BackupManager:
                 'timestamp': datetime.now().isoformat()
             }
     
+    @staticmethod
+    def verify_backup(backup_filename):
+        """
+        Verify a backup end to end
+        
+        Streams the decompressed backup through SHA-256 and compares it with
+        the checksum recorded at creation. SQLite backups are also written to
+        a temp copy and checked with `PRAGMA quick_check`. The result is
+        stored in the backup metadata under 'verification'.
+        
+        Args:
+            backup_filename: Name of backup file to verify
+            
+        Returns:
+            dict: Verification result {status, checksum, quick_check, error, checked_at}
+        """
+        metadata = BackupManager.get_backup(backup_filename)
+        backup_path = BackupManager.BACKUP_DIR / backup_filename
+        result = {
+            'status': 'ok',
+            'checksum': None,
+            'quick_check': None,
+            'error': '',
+            'checked_at': datetime.now().isoformat(),
+        }
+        is_sqlite = backup_filename.endswith(SQLiteBackend.restore_extensions)
+        tmp_path = None
+        try:
+            if not backup_path.exists():
+                raise FileNotFoundError(f'Backup file not found: {backup_filename}')
+            
+            digest = hashlib.sha256()
+            f_tmp = None
+            if is_sqlite:
+                fd, tmp_path = tempfile.mkstemp(dir=BackupManager.BACKUP_DIR, suffix='.verify-tmp')
+                f_tmp = os.fdopen(fd, 'wb')
+            try:
+                with open_backup_file(backup_path) as f_in:
+                    for chunk in iter(lambda: f_in.read(COPY_BUFFER_SIZE), b''):
+                        digest.update(chunk)
+                        if f_tmp:
+                            f_tmp.write(chunk)
+            finally:
+                if f_tmp:
+                    f_tmp.close()
+            
+            expected = (metadata or {}).get('sha256')
+            if expected:
+                result['checksum'] = 'ok' if digest.hexdigest() == expected else 'mismatch'
+            else:
+                result['checksum'] = 'missing'
+            
+            if is_sqlite:
+                conn = sqlite3.connect(tmp_path)
+                try:
+                    rows = conn.execute('PRAGMA quick_check').fetchall()
+                finally:
+                    conn.close()
+                result['quick_check'] = 'ok' if rows == [('ok',)] else '; '.join(str(r[0]) for r in rows[:5])
+            
+            if result['checksum'] == 'mismatch' or result['quick_check'] not in (None, 'ok'):
+                result['status'] = 'failed'
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        
+        if metadata:
+            metadata = BackupManager.get_catalog().update(backup_filename, verification=result)
+            metadata_path = backup_path.with_suffix('.json')
+            if metadata and metadata_path.exists():
+                with open(metadata_path, 'w') as f:
+                    json.dump(metadata, f, indent=2)
+        return result
+    
     @staticmethod
     def delete_backup(backup_filename):
         """
@@ -179,6 +774,7 @@ class BackupManager:
             # Delete metadata file
             if metadata_path.exists():
                 metadata_path.unlink()
+            BackupManager.get_catalog().remove(backup_filename)
             
             return {
                 'status': 'success',
@@ -201,17 +797,86 @@ class BackupManager:
         Returns:
             dict: Statistics about backups
         """
-        backups = BackupManager.get_backups()
-        total_size = sum(b.get('size', 0) for b in backups)
+        catalog = BackupManager.get_catalog()
+        total_backups, total_size = catalog.totals()
+        latest = catalog.list(limit=1)
+        oldest = catalog.list(offset=total_backups - 1, limit=1) if total_backups else []
         
         return {
-            'total_backups': len(backups),
+            'total_backups': total_backups,
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
-            'latest_backup': backups[0] if backups else None,
-            'oldest_backup': backups[-1] if backups else None
+            'latest_backup': latest[0] if latest else None,
+            'oldest_backup': oldest[0] if oldest else None
         }
     
+    @staticmethod
+    def parse_backup_timestamp(filename):
+        """Return the creation time encoded in a backup filename, or None if it has none"""
+        match = BACKUP_TIMESTAMP_RE.match(filename)
+        if not match:
+            return None
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+    
+    @staticmethod
+    def apply_retention_policy(hourly=24, daily=7, weekly=4, monthly=12):
+        """
+        Grandfather-father-son retention for scheduled backups
+        
+        Keeps the newest `hourly` scheduled backups, plus the newest backup of
+        each of the last `daily` days, of each of the last `weekly` ISO weeks
+        and of each of the last `monthly` calendar months. The newest scheduled
+        backup is always kept. Manual backups (no tier) are left alone.
+        
+        Returns:
+            dict: Retention result
+        """
+        try:
+            scheduled = [b for b in BackupManager.get_backups() if b.get('tier')]
+            keep = {scheduled[0]['filename']} if scheduled else set()
+            buckets = (
+                (daily, lambda created: created.date()),
+                (weekly, lambda created: created.isocalendar()[:2]),
+                (monthly, lambda created: (created.year, created.month)),
+            )
+            seen = [[] for _ in buckets]
+            # get_backups() is newest first, so the first backup seen in a bucket is its newest
+            for index, backup in enumerate(scheduled):
+                created = datetime.fromisoformat(backup['datetime'])
+                if index < hourly:
+                    keep.add(backup['filename'])
+                for (limit, bucket_of), buckets_seen in zip(buckets, seen):
+                    bucket = bucket_of(created)
+                    if bucket not in buckets_seen:
+                        buckets_seen.append(bucket)
+                        if len(buckets_seen) <= limit:
+                            keep.add(backup['filename'])
+            
+            deleted = []
+            freed_space = 0
+            for backup in scheduled:
+                if backup['filename'] in keep:
+                    continue
+                result = BackupManager.delete_backup(backup['filename'])
+                if result.get('status') == 'success':
+                    deleted.append(backup['filename'])
+                    freed_space += backup.get('size', 0)
+            
+            return {
+                'status': 'success',
+                'kept_count': len(keep),
+                'deleted_count': len(deleted),
+                'deleted': deleted,
+                'freed_space_mb': round(freed_space / (1024 * 1024), 2),
+                'timestamp': datetime.now().isoformat()
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+    
     @staticmethod
     def cleanup_old_backups(days=30):
         """
@@ -231,14 +896,14 @@ class BackupManager:
             freed_space = 0
             
             backup_dir = BackupManager.BACKUP_DIR
-            for backup_file in backup_dir.glob('backup_*.db.gz'):
+            catalog = BackupManager.get_catalog()
+            for backup_file in backup_dir.glob('backup_*'):
+                if backup_file.suffix == '.json':
+                    continue
                 try:
-                    # Parse timestamp from filename
-                    timestamp_str = backup_file.name.split('_')[1:3]
-                    timestamp_str = '_'.join(timestamp_str).replace('.db.gz', '')
-                    backup_date = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
+                    backup_date = BackupManager.parse_backup_timestamp(backup_file.name)
                     
-                    if backup_date < cutoff_date:
+                    if backup_date is not None and backup_date < cutoff_date:
                         freed_space += backup_file.stat().st_size
                         backup_file.unlink()
                         
@@ -246,10 +911,11 @@ class BackupManager:
                         metadata_file = backup_file.with_suffix('.json')
                         if metadata_file.exists():
                             metadata_file.unlink()
+                        catalog.remove(backup_file.name)
                         
                         deleted_count += 1
-                except Exception as e:
-                    print(f"Error processing backup {backup_file}: {e}")
+                except Exception:
+                    logger.exception('Could not clean up backup %s', backup_file)
             
             return {
                 'status': 'success',
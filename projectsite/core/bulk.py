@@ -0,0 +1,95 @@
+# core/bulk.py
+"""
+Batched inserts, updates and upserts for the REST API and imports.
+
+bulk_create/bulk_update do not send model signals, so the side effects a
+per-row save() gets from core/signals.py are applied here once per batch:
+a single audit entry, change-capture records (when enabled) and report
+cache invalidation.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .changelog import capture_save
+from .middleware import get_current_user
+from .models import AuditLog
+from .report_cache import invalidate_reports
+
+
+def bulk_save(model, instances, fields=None, user=None, source='API', unique_fields=None, detail=None):
+    """
+    Insert `instances`, or update `fields` on them, in one transaction
+
+    Args:
+        model: Model class of the instances
+        instances: Unsaved instances to insert, or saved ones to update
+        fields: Field names to update; None inserts the instances instead
+        user: User recorded on the audit entry (default: the current user)
+        source: Where the batch came from, for the audit detail
+        unique_fields: Upsert instead: insert the instances, and update `fields` on rows
+            that already have the same values of these (unique) fields
+        detail: Audit detail to record instead of the default "N <models> <verb> via <source>"
+
+    Returns:
+        list: The instances (with primary keys after an insert)
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+    batch_size = settings.BULK_BATCH_SIZE
+
+    with transaction.atomic():
+        if fields is None:
+            model.objects.bulk_create(instances, batch_size=batch_size)
+            verb = 'created'
+        else:
+            fields = list(fields)
+            # auto_now is only applied by save()
+            if any(f.name == 'updated_at' for f in model._meta.fields):
+                now = timezone.now()
+                for obj in instances:
+                    obj.updated_at = now
+                fields.append('updated_at')
+            if unique_fields:
+                model.objects.bulk_create(
+                    instances, batch_size=batch_size,
+                    update_conflicts=True, unique_fields=unique_fields, update_fields=fields,
+                )
+                verb = 'upserted'
+            else:
+                model.objects.bulk_update(instances, fields, batch_size=batch_size)
+                verb = 'updated'
+
+        if detail is None:
+            # The id range, not every id: a batch can hold thousands of rows
+            pks = [obj.pk for obj in instances if obj.pk is not None]
+            detail = f"{len(instances)} {model._meta.verbose_name_plural} {verb} via {source}"
+            if pks:
+                detail += f"; ids {min(pks)}-{max(pks)}"
+        try:
+            AuditLog.objects.create(
+                user=user or get_current_user(),
+                action=f'bulk_{verb}',
+                target=model.__name__,
+                # The batch concerns the model as a whole, so a "Model" target filter finds it
+                target_model=model.__name__,
+                target_pk='',
+                detail=detail,
+            )
+        except Exception:
+            pass
+
+        if settings.CHANGE_CAPTURE:
+            captured = instances
+            if unique_fields:
+                # Updated rows keep columns the upsert did not touch (e.g. created_at); capture what was stored
+                key = unique_fields[0]
+                values = [getattr(obj, key) for obj in instances]
+                captured = [
+                    obj for start in range(0, len(values), batch_size)
+                    for obj in model._base_manager.filter(**{f'{key}__in': values[start:start + batch_size]})
+                ]
+            for obj in captured:
+                capture_save(model, obj)
+        invalidate_reports(model)
+    return instances
@@ -0,0 +1,213 @@
+# core/changelog.py
+import atexit
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Segment names embed the time range they cover so replay can skip whole files
+SEGMENT_TIME_FORMAT = '%Y%m%dT%H%M%S%f'
+
+# Business data replayed by a point-in-time restore. Audit rows, their archive index and the
+# job queue are not captured: replaying them would bring back archived entries and old jobs
+CAPTURED_MODELS = (
+    'core.category', 'core.supplier', 'core.product', 'core.purchaseorder', 'core.purchaseitem',
+    'core.userrole', 'auth.user', 'auth.group',
+)
+
+
+class ChangeLog:
+    """Row-level change capture for point-in-time recovery.
+
+    Every committed save/delete of a captured model is appended as a full-row
+    image to this process's active segment (`active_<pid>_<start>.ndjson`).
+    The segment is sealed into `changes_<first>_<last>_<pid>.ndjson.gz` once
+    it is CHANGE_CAPTURE_SEGMENT_SECONDS old or CHANGE_CAPTURE_SEGMENT_BYTES
+    large. Replaying full rows is idempotent, so records that a backup
+    already contains can safely be applied again.
+    """
+
+    DIR = Path(settings.BASE_DIR) / 'backups' / 'changes'
+    TIMELINE_FILE = 'timeline.jsonl'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = count()
+        self._file = None
+        self._path = None
+        self._opened = None
+        self._first_ts = None
+        self._last_ts = None
+
+    def append(self, record):
+        """Write one change record; it reaches the OS page cache before returning"""
+        with self._lock:
+            now = datetime.now()
+            record['ts'] = now.isoformat()
+            record['pid'] = os.getpid()
+            record['seq'] = next(self._seq)
+            if self._file is None:
+                self.DIR.mkdir(parents=True, exist_ok=True)
+                self._path = self.DIR / f"active_{os.getpid()}_{now.strftime(SEGMENT_TIME_FORMAT)}.ndjson"
+                self._file = open(self._path, 'a', encoding='utf-8')
+                self._opened = now
+                self._first_ts = now
+            self._file.write(json.dumps(record, separators=(',', ':'), cls=DjangoJSONEncoder) + '\n')
+            self._file.flush()
+            self._last_ts = now
+            if ((now - self._opened).total_seconds() >= settings.CHANGE_CAPTURE_SEGMENT_SECONDS
+                    or self._file.tell() >= settings.CHANGE_CAPTURE_SEGMENT_BYTES):
+                self._seal()
+
+    def seal(self):
+        """Compress the active segment (called on rotation and at process exit)"""
+        with self._lock:
+            self._seal()
+
+    def _seal(self):
+        if self._file is None:
+            return
+        self._file.close()
+        name = (
+            f"changes_{self._first_ts.strftime(SEGMENT_TIME_FORMAT)}_"
+            f"{self._last_ts.strftime(SEGMENT_TIME_FORMAT)}_{os.getpid()}.ndjson.gz"
+        )
+        sealed = self.DIR / name
+        tmp_path = sealed.with_name(sealed.name + '.tmp')
+        with open(self._path, 'rb') as f_in, gzip.open(tmp_path, 'wb') as f_out:
+            for chunk in iter(lambda: f_in.read(1024 * 1024), b''):
+                f_out.write(chunk)
+        os.replace(tmp_path, sealed)
+        self._path.unlink()
+        self._file = None
+        self._path = None
+
+    @classmethod
+    def segments(cls, since=None, until=None):
+        """Sealed segments overlapping [since, until], plus every active segment"""
+        if not cls.DIR.exists():
+            return []
+        paths = []
+        for path in cls.DIR.glob('changes_*.ndjson.gz'):
+            _, first, last, _ = path.name.split('.')[0].split('_')
+            if since and datetime.strptime(last, SEGMENT_TIME_FORMAT) < since:
+                continue
+            if until and datetime.strptime(first, SEGMENT_TIME_FORMAT) > until:
+                continue
+            paths.append(path)
+        # Active segments belong to running (or crashed) processes and are read as-is
+        paths.extend(cls.DIR.glob('active_*.ndjson'))
+        return paths
+
+    @classmethod
+    def read(cls, since=None, until=None):
+        """Return change records in [since, until] in commit order, skipping abandoned timelines"""
+        restores = cls.restores()
+        records = []
+        for path in cls.segments(since, until):
+            opener = gzip.open if path.suffix == '.gz' else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        # Torn final line of a segment whose writer died mid-write
+                        break
+                    record = json.loads(line)
+                    ts = datetime.fromisoformat(record['ts'])
+                    if since and ts < since:
+                        continue
+                    if until and ts > until:
+                        continue
+                    if cls.abandoned(ts, restores):
+                        continue
+                    records.append(record)
+        records.sort(key=lambda r: (r['ts'], r['pid'], r['seq']))
+        return records
+
+    @classmethod
+    def restores(cls):
+        """Previous restores as (restored_to, restored_at) pairs"""
+        path = cls.DIR / cls.TIMELINE_FILE
+        if not path.exists():
+            return []
+        with open(path, encoding='utf-8') as f:
+            return [
+                (datetime.fromisoformat(entry['to']), datetime.fromisoformat(entry['restored_at']))
+                for entry in map(json.loads, f)
+            ]
+
+    @staticmethod
+    def abandoned(ts, restores):
+        """True if `ts` falls in history that a later restore rolled back"""
+        return any(restored_to < ts <= restored_at for restored_to, restored_at in restores)
+
+    @classmethod
+    def record_restore(cls, restored_to):
+        """Mark changes after `restored_to` (up to now) as rolled back"""
+        cls.DIR.mkdir(parents=True, exist_ok=True)
+        with open(cls.DIR / cls.TIMELINE_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'to': restored_to.isoformat(), 'restored_at': datetime.now().isoformat()}) + '\n')
+
+    @staticmethod
+    def apply(records, using=DEFAULT_DB_ALIAS):
+        """
+        Apply change records to the database in one transaction
+
+        Saves go through the deserializer (raw saves, so audit and capture
+        signals ignore them); deletes remove the row without cascading,
+        since cascaded rows have their own delete records.
+        """
+        applied = 0
+        with transaction.atomic(using=using):
+            for record in records:
+                # Segments written before capture was limited to CAPTURED_MODELS hold other models too
+                if (record['object']['model'] if record['op'] == 'save' else record['model']) not in CAPTURED_MODELS:
+                    continue
+                if record['op'] == 'save':
+                    for obj in serializers.deserialize('python', [record['object']], using=using):
+                        obj.save(using=using)
+                else:
+                    model = apps.get_model(record['model'])
+                    model._base_manager.using(using).filter(pk=record['pk'])._raw_delete(using)
+                applied += 1
+        return applied
+
+
+change_log = ChangeLog()
+
+
+def capture_save(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_save/m2m_changed handler: ship the saved row once its transaction commits"""
+    if raw or using != DEFAULT_DB_ALIAS:
+        return
+    record = {'op': 'save', 'object': serializers.serialize('python', [instance])[0]}
+    transaction.on_commit(lambda: change_log.append(record), using=using)
+
+
+def capture_m2m(sender, instance, action, reverse=False, model=None, pk_set=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """m2m_changed handler: re-ship the row that owns the many-to-many field"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        capture_save(type(instance), instance, using=using)
+    elif pk_set:
+        for obj in model._base_manager.using(using).filter(pk__in=pk_set):
+            capture_save(model, obj, using=using)
+
+
+def capture_delete(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    record = {'op': 'delete', 'model': instance._meta.label_lower, 'pk': instance.pk}
+    transaction.on_commit(lambda: change_log.append(record), using=using)
+
+
+# Seal the active segment so a clean shutdown leaves only compressed files
+atexit.register(change_log.seal)
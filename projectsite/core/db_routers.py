@@ -0,0 +1,104 @@
+# core/db_routers.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+# Apps and models that must always be read from the primary (sessions, auth, permissions)
+PRIMARY_ONLY_APPS = {'sessions', 'auth', 'contenttypes', 'admin'}
+PRIMARY_ONLY_MODELS = {'core.userrole'}
+
+# A contextvar (not a thread-local) so async views' ORM calls, which run in
+# sync_to_async threads with a copy of the caller's context, see the flag too
+_replica_depth = ContextVar('replica_depth', default=0)
+
+
+def replica_configured():
+    """Return True if a replica alias exists and is ready to serve reads"""
+    db = settings.DATABASES.get(REPLICA_ALIAS)
+    if not db:
+        return False
+    if 'sqlite' in db['ENGINE']:
+        # The emulated replica only exists once `refresh_replica` has run
+        return Path(db['NAME']).exists()
+    return True
+
+
+def replica_reads_enabled():
+    return _replica_depth.get() > 0
+
+
+def is_pinned_to_primary(request):
+    """A user who wrote recently keeps reading from the primary (read-your-writes)"""
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return True
+    return bool(request.COOKIES.get(settings.REPLICA_PIN_COOKIE))
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside `use_replica` views; everything else uses default"""
+
+    def db_for_read(self, model, **hints):
+        if not replica_reads_enabled():
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS or model._meta.label_lower in PRIMARY_ONLY_MODELS:
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of default and never migrated directly
+        return db != REPLICA_ALIAS
+
+
+def use_replica(view_func):
+    """Decorator routing a read-only view's queries to the replica when one is available"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async(request, *args, **kwargs):
+            if is_pinned_to_primary(request) or not replica_configured():
+                return await view_func(request, *args, **kwargs)
+            token = _replica_depth.set(_replica_depth.get() + 1)
+            try:
+                response = await view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                    await sync_to_async(response.render)()
+                return response
+            finally:
+                _replica_depth.reset(token)
+        return _wrapped_async
+
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if is_pinned_to_primary(request) or not replica_configured():
+            return view_func(request, *args, **kwargs)
+        token = _replica_depth.set(_replica_depth.get() + 1)
+        try:
+            response = view_func(request, *args, **kwargs)
+            # Render lazily-evaluated templates while reads are still routed
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+            return response
+        finally:
+            _replica_depth.reset(token)
+    return _wrapped
+
+
+@contextmanager
+def read_from_primary():
+    """Route reads to the primary inside a `use_replica` view (e.g. to build cached data)"""
+    token = _replica_depth.set(0)
+    try:
+        yield
+    finally:
+        _replica_depth.reset(token)
@@ -0,0 +1,88 @@
+# core/formatting.py
+"""
+Money formatting for pages, reports and exports.
+
+Amounts stay Decimal from the database to the page: they are rounded
+half-up to cents and formatted exactly (never through float) with the
+decimal and thousands separators of the active language. Results are
+memoised per (amount, language), since a page of prices repeats the same
+values many times. The output is only digits and separators, so it is
+marked safe and templates print it without escaping.
+
+Tables should not format per cell in the template. Views call
+money_columns() to set ready-made display attributes on every row of the
+page in one pass, and templates print those. The `currency_format` filter
+remains for single totals.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from operator import attrgetter
+from django.conf import settings
+from django.utils import formats, translation
+from django.utils.safestring import SafeString
+
+CENTS = Decimal('0.01')
+
+
+def to_decimal(value):
+    """Decimal for a Decimal, int, str or float (floats via their shortest repr, so 0.1 stays 0.1)"""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+@lru_cache(maxsize=None)
+def _formatter(language):
+    """Function formatting a Decimal amount with the separators of `language`"""
+    decimal_separator = formats.get_format('DECIMAL_SEPARATOR', lang=language, use_l10n=True)
+    thousand_separator = formats.get_format('THOUSAND_SEPARATOR', lang=language, use_l10n=True)
+    # Digits and ordinary separators need no HTML escaping; marking them safe lets templates skip it
+    wrap = str if set(decimal_separator + thousand_separator) & set('<>&\'"') else SafeString
+    if (decimal_separator, thousand_separator) == ('.', ','):
+        return lambda amount: wrap(f"{amount.quantize(CENTS, rounding=ROUND_HALF_UP):,.2f}")
+    separators = str.maketrans({',': thousand_separator, '.': decimal_separator})
+    return lambda amount: wrap(f"{amount.quantize(CENTS, rounding=ROUND_HALF_UP):,.2f}".translate(separators))
+
+
+@lru_cache(maxsize=8192)
+def _format(amount, language):
+    return _formatter(language)(amount)
+
+
+def _language():
+    return translation.get_language() or settings.LANGUAGE_CODE
+
+
+def format_money(value):
+    """'1,234.50' for 1234.5 in the active language; non-numeric values are returned unchanged"""
+    try:
+        amount = to_decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return value
+    if not amount.is_finite():
+        return value
+    return _format(amount, _language())
+
+
+def money_columns(rows, **columns):
+    """
+    Set formatted money attributes on every row in one pass
+
+        money_columns(page, unit_price_display='unit_price',
+                      value_display=lambda p: p.quantity * p.unit_price)
+
+    Each column is a row attribute name or a callable taking the row; None
+    becomes ''. Amounts repeated within a column are formatted once. Returns `rows`.
+    """
+    format_amount = _formatter(_language())
+    getters = [(name, source if callable(source) else attrgetter(source), {}) for name, source in columns.items()]
+    for row in rows:
+        for name, get, formatted in getters:
+            value = get(row)
+            text = formatted.get(value)
+            if text is None:
+                text = formatted[value] = '' if value is None else format_amount(to_decimal(value))
+            setattr(row, name, text)
+    return rows
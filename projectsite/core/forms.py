@@ -1,7 +1,9 @@
 # core/forms.py
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import PasswordChangeForm, UserCreationForm
+from django.core.validators import FileExtensionValidator
 from .models import Category, Product, Supplier, PurchaseOrder, PurchaseItem
 
 class BootstrapFormMixin:
@@ -24,10 +26,16 @@ class CategoryForm(BootstrapFormMixin, forms.ModelForm):
         fields = '__all__'
 
 class ProductForm(BootstrapFormMixin, forms.ModelForm):
+    # Optional: left blank, the product gets DEFAULT_REORDER_LEVEL
+    reorder_level = forms.IntegerField(
+        min_value=0,
+        required=False,
+        help_text='The product is reported as low on stock below this quantity.',
+    )
+
     class Meta:
         model = Product
-        # exclude reorder_level from product forms
-        exclude = ['reorder_level']
+        fields = '__all__'
         widgets = {
             'code': forms.TextInput(attrs={'placeholder': 'Product code', 'maxlength': 30}),
             'name': forms.TextInput(attrs={'placeholder': 'Product name'}),
@@ -37,6 +45,15 @@ class ProductForm(BootstrapFormMixin, forms.ModelForm):
             'quantity': forms.NumberInput(),
         }
 
+    def clean_reorder_level(self):
+        reorder_level = self.cleaned_data['reorder_level']
+        return settings.DEFAULT_REORDER_LEVEL if reorder_level is None else reorder_level
+
+class ProductImportForm(forms.Form):
+    """Upload for the bulk product import (core/imports.py)"""
+    file = forms.FileField(validators=[FileExtensionValidator(['csv', 'xlsx'])])
+    create_missing = forms.BooleanField(required=False)
+
 class SupplierForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
         model = Supplier
@@ -72,6 +89,12 @@ class PurchaseItemForm(forms.ModelForm):
             'unit_cost': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Unit cost', 'step': '0.01'}),
         }
 
+    def clean_quantity(self):
+        quantity = self.cleaned_data['quantity']
+        if quantity < 1:
+            raise forms.ValidationError('Quantity must be at least 1.', code='min_value')
+        return quantity
+
 class BootstrapPasswordChangeForm(PasswordChangeForm):
     """Custom password change form with Bootstrap styling"""
     def __init__(self, *args, **kwargs):
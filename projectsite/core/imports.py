@@ -0,0 +1,321 @@
+# core/imports.py
+"""
+Bulk product import from CSV or XLSX.
+
+The file is streamed (openpyxl read-only mode for workbooks) and processed
+in chunks of IMPORT_CHUNK_SIZE rows:
+
+1. each row is cleaned with the same form fields ProductForm uses;
+2. category and supplier names are resolved through in-memory lookups
+   loaded once per import;
+3. valid rows are upserted on Product.code with one bulk INSERT ... ON
+   CONFLICT per chunk (core/bulk.py), which writes a single audit entry
+   for the chunk instead of per-row signals.
+
+Rejected rows are written, with their line number and the reasons, to a
+CSV error file that can be corrected and imported again.
+"""
+import csv
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError
+from django.utils import timezone
+from .bulk import bulk_save
+from .forms import ProductForm
+from .models import Category, Product, Supplier
+from .signals import suspend_audit
+
+IMPORT_EXTENSIONS = ('.csv', '.xlsx')
+
+REQUIRED_COLUMNS = ('code', 'name', 'category', 'unit_price')
+# Optional columns: when absent, existing products keep their value and new ones get the model default
+OPTIONAL_COLUMNS = ('supplier', 'quantity', 'reorder_level')
+# Cleaned by ProductForm's own field definitions
+FORM_COLUMNS = ('code', 'name', 'unit_price', 'quantity', 'reorder_level')
+
+
+class ImportFormatError(Exception):
+    """The file cannot be imported at all (unknown type, missing columns)"""
+
+
+def _column_name(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+class RowReader:
+    """
+    Stream (line number, {column: value}) pairs from a CSV or XLSX file
+
+        with RowReader(path) as reader:
+            reader.columns      # column names from the header
+            for line, row in reader: ...
+
+    Column names are matched case-insensitively and come from the header,
+    whatever the first row holds. Every row has every column: cells missing
+    from the end of a row read as blank. Blank rows are skipped.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        suffix = self.path.suffix.lower()
+        if suffix == '.csv':
+            self._file = open(self.path, newline='', encoding='utf-8-sig')
+            self._reader = csv.reader(self._file)
+            header = next(self._reader, [])
+        elif suffix == '.xlsx':
+            from openpyxl import load_workbook
+            self._file = load_workbook(self.path, read_only=True, data_only=True)
+            self._reader = self._file.active.iter_rows(values_only=True)
+            header = next(self._reader, ())
+        else:
+            raise ImportFormatError(f"Unsupported file type '{suffix}'; use {' or '.join(IMPORT_EXTENSIONS)}")
+        self.header = [_column_name(name) for name in header]
+        self.columns = {name for name in self.header if name}
+        try:
+            _check_columns(self.header)
+        except ImportFormatError:
+            self.close()
+            raise
+
+    def _row(self, values):
+        values = list(values)[:len(self.header)]
+        values += [None] * (len(self.header) - len(values))
+        return dict(zip(self.header, values))
+
+    def __iter__(self):
+        if self.path.suffix.lower() == '.csv':
+            for values in self._reader:
+                if any(value.strip() for value in values):
+                    yield self._reader.line_num, self._row(values)
+        else:
+            for line, values in enumerate(self._reader, start=2):
+                if any(value not in (None, '') for value in values):
+                    # Excel numbers may come back as floats; keep codes like 1001 from becoming "1001.0"
+                    values = [int(value) if isinstance(value, float) and value.is_integer() else value for value in values]
+                    yield line, self._row(values)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_columns(header):
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}")
+
+
+def estimate_rows(path):
+    """Approximate number of data rows, for progress reporting (None if unknown)"""
+    path = Path(path)
+    if path.suffix.lower() == '.xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        return max_row - 1 if max_row else None
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            lines += block.count(b'\n')
+    return max(lines - 1, 0)
+
+
+class NameLookup:
+    """Case-insensitive name -> pk map of a model, loaded once and kept for the whole import"""
+
+    def __init__(self, model, create_missing=False):
+        self.model = model
+        self.create_missing = create_missing
+        self.ids = {}
+        # Names are not unique; the oldest row with a name wins, as in the web form's ordering
+        for pk, name in model.objects.order_by('pk').values_list('pk', 'name'):
+            self.ids.setdefault(name.strip().casefold(), pk)
+
+    def resolve(self, name):
+        """pk of the row called `name`; creates it when allowed, else raises ValidationError"""
+        key = name.casefold()
+        if key not in self.ids:
+            if not self.create_missing:
+                raise ValidationError(f"Unknown {self.model._meta.verbose_name} '{name}'.")
+            self.ids[key] = self.model.objects.create(name=name).pk
+        return self.ids[key]
+
+
+class ErrorFile:
+    """CSV of rejected rows: line, the original columns, and the reasons; opened on the first error"""
+
+    def __init__(self, path, columns):
+        self.path = Path(path)
+        self.columns = columns
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line, row, errors):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(['line', *self.columns, 'errors'])
+        reasons = '; '.join(f"{field}: {message}" for field, messages in errors.items() for message in messages)
+        self._writer.writerow([line, *(row.get(name, '') for name in self.columns), reasons])
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def clean_row(row, categories, suppliers, columns):
+    """
+    Validate one row with ProductForm's field rules
+
+    Returns:
+        tuple: (field values for Product, None) or (None, {field: [messages]})
+    """
+    fields = ProductForm.base_fields
+    values, errors = {}, {}
+    for name in FORM_COLUMNS:
+        if name not in columns:
+            continue
+        value = row.get(name)
+        try:
+            values[name] = fields[name].clean('' if value is None else value)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if values.get('reorder_level', 0) is None:
+        values['reorder_level'] = settings.DEFAULT_REORDER_LEVEL
+    for name, lookup in (('category', categories), ('supplier', suppliers)):
+        if name not in columns:
+            continue
+        value = str(row.get(name) or '').strip()
+        if not value:
+            if fields[name].required:
+                errors[name] = [fields[name].error_messages['required']]
+            else:
+                values[f'{name}_id'] = None
+            continue
+        if errors and lookup.create_missing:
+            # Don't create categories or suppliers for rows that are rejected anyway
+            continue
+        try:
+            values[f'{name}_id'] = lookup.resolve(value)
+        except ValidationError as e:
+            errors[name] = e.messages
+    return (None, errors) if errors else (values, None)
+
+
+def import_products(path, errors_path=None, chunk_size=None, create_missing=False, source=None, progress=None):
+    """
+    Upsert products from a CSV or XLSX file, keyed on product code
+
+    Args:
+        path: File to import
+        errors_path: Where to write rejected rows (default: <file>.errors.csv next to it)
+        chunk_size: Rows validated and written per transaction (default: IMPORT_CHUNK_SIZE)
+        create_missing: Create categories and suppliers that do not exist yet
+        source: Name of the file in audit entries (default: the file name)
+        progress: Optional callback(done, total) after every chunk; total may be None
+
+    Returns:
+        dict: Import summary with status, row counts and the error file path
+    """
+    path = Path(path)
+    errors_path = Path(errors_path) if errors_path else path.with_name(f"{path.stem}.errors.csv")
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    source = source or path.name
+    started = time.monotonic()
+    counts = {'rows': 0, 'created': 0, 'updated': 0, 'failed': 0, 'batches': 0}
+    error_file = None
+
+    try:
+        # Categories/suppliers created on the fly are summarized in one audit entry
+        with suspend_audit(f'import {source}'), RowReader(path) as rows:
+            # The header decides which columns are imported, for every row
+            columns = rows.columns
+            error_file = ErrorFile(errors_path, [name for name in (*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS) if name in columns])
+            total = estimate_rows(path) if progress else None
+            categories = NameLookup(Category, create_missing)
+            suppliers = NameLookup(Supplier, create_missing)
+            update_fields = [name for name in ('name', 'category', 'supplier', 'unit_price', 'quantity', 'reorder_level')
+                             if name in columns]
+
+            chunk = []
+            for item in rows:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    _import_chunk(chunk, columns, categories, suppliers, update_fields, error_file, counts, source)
+                    chunk = []
+                    if progress:
+                        progress(counts['rows'], total)
+            if chunk:
+                _import_chunk(chunk, columns, categories, suppliers, update_fields, error_file, counts, source)
+                if progress:
+                    progress(counts['rows'], total)
+    except (ImportFormatError, OSError, DatabaseError) as e:
+        return {
+            'status': 'error',
+            'error': str(e),
+            **counts,
+            'errors_file': str(errors_path) if error_file and error_file.count else None,
+            'timestamp': timezone.now().isoformat(),
+        }
+    finally:
+        if error_file:
+            error_file.close()
+
+    return {
+        'status': 'success',
+        **counts,
+        'errors_file': str(errors_path) if error_file.count else None,
+        'seconds': round(time.monotonic() - started, 2),
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def _import_chunk(chunk, columns, categories, suppliers, update_fields, error_file, counts, source):
+    """Validate and upsert one chunk of (line, row) pairs"""
+    counts['rows'] += len(chunk)
+    valid = {}
+    for line, row in chunk:
+        values, errors = clean_row(row, categories, suppliers, columns)
+        if errors:
+            error_file.write(line, row, errors)
+            counts['failed'] += 1
+            continue
+        code = values['code']
+        if code in valid:
+            # One INSERT ... ON CONFLICT cannot touch a row twice; the later line wins, as across chunks
+            earlier_line, earlier_row, _ = valid.pop(code)
+            error_file.write(earlier_line, earlier_row, {'code': [f'Superseded by line {line} with the same code.']})
+            counts['failed'] += 1
+        valid[code] = (line, row, values)
+    if not valid:
+        return
+
+    codes = list(valid)
+    existing = set()
+    for start in range(0, len(codes), settings.BULK_BATCH_SIZE):
+        existing.update(Product.objects.filter(code__in=codes[start:start + settings.BULK_BATCH_SIZE])
+                        .values_list('code', flat=True))
+    products = [Product(**values) for _, _, values in valid.values()]
+    lines = [line for line, _, _ in valid.values()]
+    created = len(products) - len(existing)
+    bulk_save(
+        Product, products, fields=update_fields, unique_fields=['code'],
+        detail=f"{len(products)} products imported from {source} (lines {min(lines)}-{max(lines)}): "
+               f"{created} created, {len(existing)} updated",
+    )
+    counts['created'] += created
+    counts['updated'] += len(existing)
+    counts['batches'] += 1
@@ -0,0 +1,308 @@
+# core/jobs.py
+"""
+Database-backed background job queue.
+
+Views enqueue a Job row and return immediately; `manage.py run_jobs` runs a
+pool of worker processes that claim queued jobs, report progress on the
+row, retry failures with exponential backoff and store results (including
+downloadable files under JOB_RESULT_DIR). No external broker is needed:
+claiming is a conditional UPDATE, which is atomic on SQLite and PostgreSQL.
+"""
+import os
+import socket
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+from .backup import BackupManager
+from .imports import import_products
+from .middleware import acting_as
+from .models import AuditLog, Job
+from .pdf_reports import pdf_filename, render_pdf_report
+from .reports import report_filename, write_report_workbook
+
+JOB_HANDLERS = {}
+
+
+class JobError(Exception):
+    """Raised by a handler to fail the current attempt with a readable message"""
+
+
+def job_handler(kind, max_attempts=3):
+    """Register `func(job, progress)` as the handler for jobs of `kind`"""
+    def decorator(func):
+        JOB_HANDLERS[kind] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(kind, params=None, user=None):
+    """Queue a job and return it; a worker picks it up within JOB_POLL_SECONDS"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(
+        kind=kind,
+        params=params or {},
+        created_by=user if getattr(user, 'is_authenticated', False) else None,
+        max_attempts=JOB_HANDLERS[kind][1],
+        run_after=timezone.now(),
+    )
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next(worker):
+    """Atomically claim the oldest due job, or return None"""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:5]
+    )
+    for job_id in candidates:
+        # Only one worker's UPDATE can move the row out of 'queued'
+        claimed = Job.objects.filter(pk=job_id, status='queued').update(
+            status='running',
+            locked_by=worker,
+            locked_at=now,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.select_related('created_by').get(pk=job_id)
+    return None
+
+
+def requeue_stale():
+    """Put back jobs whose worker stopped heartbeating (crashed or killed)"""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    stale = Job.objects.filter(status='running', locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=timezone.now(), error='Worker stopped responding',
+    )
+    requeued = stale.update(status='queued', locked_by='', run_after=timezone.now())
+    return requeued + failed
+
+
+def prune_results():
+    """Delete result files of jobs that finished more than JOB_RESULT_RETENTION_DAYS ago"""
+    cutoff = timezone.now() - timedelta(days=settings.JOB_RESULT_RETENTION_DAYS)
+    old = Job.objects.filter(finished_at__lt=cutoff).exclude(result_file='')
+    for job in old:
+        path = Path(settings.JOB_RESULT_DIR) / job.result_file
+        if path.exists():
+            path.unlink()
+    return old.update(result_file='')
+
+
+def upload_path(filename):
+    """Unique path under JOB_RESULT_DIR/uploads for a file a job will read"""
+    directory = Path(settings.JOB_RESULT_DIR) / 'uploads'
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{uuid.uuid4().hex}_{Path(filename).name}"
+
+
+def result_path(job, filename):
+    """Path for a job's result file; stored on the job relative to JOB_RESULT_DIR"""
+    directory = Path(settings.JOB_RESULT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"job_{job.pk}_{filename}"
+
+
+def run_job(job):
+    """Run a claimed job, recording success, a retry or the final failure"""
+    handler = JOB_HANDLERS.get(job.kind, (None, 0))[0]
+    # Only while this worker still holds the job: a restore may have cancelled it, or
+    # requeue_stale handed it to another worker, and that outcome must stand
+    owned = Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by)
+
+    def progress(percent, message=''):
+        # Also refreshes the heartbeat so long jobs are not mistaken for stale ones
+        try:
+            owned.update(
+                progress=max(0, min(100, int(percent))),
+                progress_message=message[:255],
+                locked_at=timezone.now(),
+            )
+        except DatabaseError:
+            # Best effort: on SQLite a concurrent backup can briefly lock the database
+            pass
+
+    try:
+        if handler is None:
+            raise JobError(f'No handler registered for {job.kind}')
+        # Audit entries written by the handler are attributed to whoever queued the job
+        with acting_as(job.created_by):
+            result = handler(job, progress)
+    except Exception as e:
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            owned.update(
+                status='queued', locked_by='', run_after=now + timedelta(seconds=delay),
+                error=f'Attempt {job.attempts} failed: {e}',
+            )
+        else:
+            owned.update(status='failed', finished_at=now, error=str(e))
+        return False
+
+    owned.update(
+        status='succeeded',
+        progress=100,
+        finished_at=timezone.now(),
+        result=result.get('result') if result else None,
+        result_file=result.get('result_file', '') if result else '',
+        error='',
+    )
+    return True
+
+
+def _audit(job, action, target, detail):
+    try:
+        AuditLog.objects.create(user=job.created_by, action=action, target=target, detail=detail)
+    except Exception:
+        pass
+
+
+# ========================================
+#              JOB HANDLERS
+# ========================================
+@job_handler('create_backup')
+def create_backup_job(job, progress):
+    def on_progress(done, expected):
+        percent = done * 100 // expected if expected else 0
+        progress(min(percent, 99), f"Compressed {done / (1024 * 1024):.1f} MB")
+
+    result = BackupManager.create_backup(description=job.params.get('description', ''), progress=on_progress)
+    if result.get('status') != 'success':
+        raise JobError(result.get('error', 'Unknown error'))
+    _audit(job, 'create_backup', result['filename'],
+           f"filename={result.get('filename')}; size_mb={result.get('size_mb')}; description={result.get('description','')}")
+    return {'result': {
+        'message': f"Backup created successfully: {result['filename']} ({result['size_mb']} MB)",
+        'filename': result['filename'],
+        'size_mb': result['size_mb'],
+    }}
+
+
+# A failed restore is not retried automatically; an admin should look first
+@job_handler('restore_backup', max_attempts=1)
+def restore_backup_job(job, progress):
+    filename = job.params['filename']
+
+    def on_progress(done, expected):
+        percent = done * 90 // expected if expected else 0
+        progress(min(percent, 90), f"Restored {done / (1024 * 1024):.1f} MB of {filename}")
+
+    result = BackupManager.restore_backup(filename, progress=on_progress)
+    if result.get('status') != 'success':
+        raise JobError(result.get('error', 'Unknown error'))
+
+    # The restored database has its own copy of the job table: this job may be
+    # missing, and jobs that were pending when the backup was taken must not run again
+    Job.objects.filter(status__in=['queued', 'running']).exclude(pk=job.pk).update(
+        status='failed', finished_at=timezone.now(), error='Cancelled: database was restored from a backup',
+    )
+    job.status = 'running'
+    if job.created_by_id and not User.objects.filter(pk=job.created_by_id).exists():
+        job.created_by = None
+    job.save()
+    _audit(job, 'restore_backup', filename,
+           f"restored={result.get('status')}; message={result.get('message','')}")
+    return {'result': {
+        'message': f"Database restored from {filename}",
+        'restore_point': result.get('restore_point'),
+    }}
+
+
+@job_handler('cleanup_backups')
+def cleanup_backups_job(job, progress):
+    result = BackupManager.cleanup_old_backups(days=job.params.get('days', 30))
+    if result.get('status') != 'success':
+        raise JobError(result.get('error', 'Unknown error'))
+    _audit(job, 'cleanup_backups', 'backups_cleanup',
+           f"deleted_count={result.get('deleted_count')}; freed_space_mb={result.get('freed_space_mb')}")
+    return {'result': {
+        'message': f"Cleanup completed: Deleted {result['deleted_count']} backups, Freed {result['freed_space_mb']} MB",
+        'deleted_count': result['deleted_count'],
+        'freed_space_mb': result['freed_space_mb'],
+    }}
+
+
+@job_handler('export_report')
+def export_report_job(job, progress):
+    report_type = job.params.get('type', 'inventory')
+    filename = report_filename(report_type)
+    path = result_path(job, filename)
+
+    def on_progress(done, total):
+        percent = done * 100 // total if total else 0
+        progress(min(percent, 99), f"Exported {done} of {total} rows")
+
+    rows = write_report_workbook(report_type, path, progress=on_progress)
+    return {
+        'result': {'message': f"Exported {rows} rows", 'filename': filename, 'rows': rows},
+        'result_file': path.name,
+    }
+
+
+@job_handler('export_pdf')
+def export_pdf_job(job, progress):
+    report_type = job.params.get('type', 'inventory')
+    month = job.params.get('month')
+    filename = pdf_filename(report_type, month)
+    path = result_path(job, filename)
+    progress(1, f"Rendering {filename}")
+    written = render_pdf_report(report_type, path, month=month)
+    return {
+        'result': {
+            'message': f"Exported {written['rows']} rows on {written['pages']} pages",
+            'filename': filename, 'rows': written['rows'], 'pages': written['pages'],
+        },
+        'result_file': path.name,
+    }
+
+
+@job_handler('import_products')
+def import_products_job(job, progress):
+    path = Path(settings.JOB_RESULT_DIR) / job.params['path']
+    filename = job.params.get('filename', path.name)
+    errors_name = f"{Path(filename).stem}_errors.csv"
+    errors_path = result_path(job, errors_name)
+
+    def on_progress(done, total):
+        percent = done * 100 // total if total else 0
+        of_total = f" of ~{total}" if total else ''
+        progress(min(percent, 99), f"Processed {done}{of_total} rows")
+
+    result = None
+    try:
+        result = import_products(path, errors_path=errors_path, create_missing=job.params.get('create_missing', False),
+                                 source=filename, progress=on_progress)
+    finally:
+        # Chunks already written are simply upserted again on a retry, so the upload is kept until the last attempt
+        if (result and result['status'] == 'success') or job.attempts >= job.max_attempts:
+            path.unlink(missing_ok=True)
+    if result['status'] != 'success':
+        raise JobError(result.get('error', 'Unknown error'))
+    _audit(job, 'import_products', filename,
+           f"rows={result['rows']}; created={result['created']}; updated={result['updated']}; rejected={result['failed']}")
+    message = f"Imported {result['rows'] - result['failed']} of {result['rows']} rows " \
+              f"({result['created']} created, {result['updated']} updated)"
+    if result['failed']:
+        message += f"; {result['failed']} rows rejected, download the error file for the reasons"
+    return {
+        'result': {
+            'message': message,
+            'filename': errors_name if result['errors_file'] else '',
+            'rows': result['rows'], 'created': result['created'],
+            'updated': result['updated'], 'rejected': result['failed'],
+        },
+        'result_file': errors_path.name if result['errors_file'] else '',
+    }
@@ -0,0 +1,53 @@
+# core/management/commands/archive_audit_logs.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.audit_archive import AuditArchiver
+
+class Command(BaseCommand):
+    help = 'Move old audit log entries into compressed NDJSON archives'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.AUDIT_RETENTION_DAYS,
+            help='Archive entries older than X days (default: AUDIT_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows written per archive file'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many entries would be archived'
+        )
+    
+    def handle(self, *args, **options):
+        days = options['days']
+        dry_run = options.get('dry_run', False)
+        
+        self.stdout.write(self.style.SUCCESS(f'Archiving audit entries older than {days} days...'))
+        try:
+            result = AuditArchiver.archive_older_than(
+                days=days, batch_size=options['batch_size'], dry_run=dry_run
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"✗ Archiving failed: {e}"))
+            return
+        
+        if dry_run:
+            self.stdout.write(f"  {result['archived_rows']} entries would be archived (cutoff {result['cutoff']})")
+            return
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Archiving completed!\n"
+                f"  Archived: {result['archived_rows']} entries\n"
+                f"  Files: {len(result['archives'])}"
+            )
+        )
+        for filename in result['archives']:
+            self.stdout.write(f"  - {filename}")
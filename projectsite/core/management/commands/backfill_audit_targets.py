@@ -0,0 +1,51 @@
+# core/management/commands/backfill_audit_targets.py
+import re
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import AuditLog
+
+# Quantity changes recorded before structured changes existed only survive in the detail text
+RESTOCK_RE = re.compile(r'restocked from (-?\d+) to (-?\d+)')
+
+class Command(BaseCommand):
+    help = 'Backfill structured target columns and changes on existing audit entries'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows updated per transaction'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Stop after X rows (0 = no limit); rerun to resume'
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        limit = options['limit']
+        pending = AuditLog.objects.filter(target_model__isnull=True)
+        
+        self.stdout.write(self.style.SUCCESS(f'Backfilling {pending.count()} audit entries...'))
+        done = 0
+        while not limit or done < limit:
+            size = min(batch_size, limit - done) if limit else batch_size
+            # Processed rows leave the NULL set, so an interrupted run simply resumes here
+            batch = list(pending.order_by('id').only('id', 'target', 'detail', 'changes')[:size])
+            if not batch:
+                break
+            for log in batch:
+                log.target_model, log.target_pk = AuditLog.split_target(log.target)
+                if log.changes is None:
+                    match = RESTOCK_RE.search(log.detail or '')
+                    if match:
+                        log.changes = [{'field': 'quantity', 'old': int(match.group(1)), 'new': int(match.group(2))}]
+            with transaction.atomic():
+                AuditLog.objects.bulk_update(batch, ['target_model', 'target_pk', 'changes'])
+            done += len(batch)
+            self.stdout.write(f"  {done} entries backfilled (last id {batch[-1].id})")
+        
+        self.stdout.write(self.style.SUCCESS(f"✓ Backfill completed: {done} entries updated"))
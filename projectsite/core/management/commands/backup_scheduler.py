@@ -0,0 +1,140 @@
+# core/management/commands/backup_scheduler.py
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.backup import BackupManager
+
+# Higher tiers win when several cadences fall on the same minute
+TIER_RANK = {'hourly': 0, 'daily': 1, 'weekly': 2}
+
+class Command(BaseCommand):
+    help = 'Run scheduled backups (hourly/daily/weekly) with grandfather-father-son retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run one backup and the retention policy immediately, then exit'
+        )
+        parser.add_argument(
+            '--tier',
+            choices=list(TIER_RANK),
+            default='hourly',
+            help='Tier recorded for the --once backup'
+        )
+        parser.add_argument(
+            '--no-jitter',
+            action='store_true',
+            help='Run exactly on schedule'
+        )
+
+    def handle(self, *args, **options):
+        self.health = {'status': 'starting', 'pid': os.getpid()}
+        self.lower_priority()
+
+        if options.get('once'):
+            self.run_backup(options['tier'])
+            return
+
+        jitter = 0 if options.get('no_jitter') else settings.BACKUP_SCHEDULER_JITTER_SECONDS
+        self.stdout.write(self.style.SUCCESS('Backup scheduler started'))
+        try:
+            while True:
+                run_at, tier = self.next_run(datetime.now())
+                if run_at is None:
+                    self.stdout.write(self.style.ERROR('✗ No backup cadence enabled; exiting'))
+                    return
+                run_at += timedelta(seconds=random.uniform(0, jitter))
+                self.write_health(status='idle', next_run=run_at.isoformat(), next_tier=tier)
+                self.stdout.write(f"Next {tier} backup at {run_at:%Y-%m-%d %H:%M:%S}")
+                time.sleep(max(0, (run_at - datetime.now()).total_seconds()))
+                self.run_backup(tier)
+        except KeyboardInterrupt:
+            self.write_health(status='stopped')
+            self.stdout.write(self.style.WARNING('Backup scheduler stopped'))
+
+    def lower_priority(self):
+        """Keep backups from competing with request traffic for CPU and disk"""
+        if hasattr(os, 'nice') and settings.BACKUP_SCHEDULER_NICE:
+            try:
+                os.nice(settings.BACKUP_SCHEDULER_NICE)
+            except OSError:
+                pass
+        try:
+            # Idle I/O class: only gets disk time when nobody else wants it
+            subprocess.run(['ionice', '-c', '3', '-p', str(os.getpid())], check=False, capture_output=True)
+        except OSError:
+            pass
+
+    @staticmethod
+    def next_run(now):
+        """Return (datetime, tier) of the next due backup, or (None, None) if nothing is scheduled"""
+        candidates = []
+        if settings.BACKUP_SCHEDULE_HOURLY:
+            candidates.append((now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1), 'hourly'))
+        if settings.BACKUP_SCHEDULE_DAILY_AT:
+            hour, minute = (int(part) for part in settings.BACKUP_SCHEDULE_DAILY_AT.split(':'))
+            daily = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if daily <= now:
+                daily += timedelta(days=1)
+            tier = 'weekly' if daily.weekday() == settings.BACKUP_SCHEDULE_WEEKLY_DAY else 'daily'
+            candidates.append((daily, tier))
+        if not candidates:
+            return None, None
+        return min(candidates, key=lambda c: (c[0], -TIER_RANK[c[1]]))
+
+    def run_backup(self, tier):
+        started = time.monotonic()
+        self.write_health(status='running', tier=tier, started=datetime.now().isoformat())
+        result = BackupManager.create_backup(description=f'Scheduled {tier} backup', tier=tier)
+        duration = round(time.monotonic() - started, 3)
+
+        metric = {
+            'timestamp': datetime.now().isoformat(),
+            'tier': tier,
+            'status': result.get('status'),
+            'duration_seconds': duration,
+            'size_bytes': result.get('size', 0),
+            'filename': result.get('filename'),
+        }
+        self.record_metric(metric)
+
+        if result.get('status') != 'success':
+            self.stdout.write(self.style.ERROR(f"✗ {tier} backup failed: {result.get('error', 'Unknown error')}"))
+            self.write_health(status='error', last_error=result.get('error'), last_run=metric)
+            return
+
+        retention = BackupManager.apply_retention_policy(
+            hourly=settings.BACKUP_RETENTION_HOURLY,
+            daily=settings.BACKUP_RETENTION_DAILY,
+            weekly=settings.BACKUP_RETENTION_WEEKLY,
+            monthly=settings.BACKUP_RETENTION_MONTHLY,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {tier} backup {result['filename']} ({result['size_mb']} MB) in {duration}s; "
+            f"retention removed {retention.get('deleted_count', 0)} backups"
+        ))
+        self.write_health(status='ok', last_run=metric, last_success=metric['timestamp'], last_error=None)
+
+    @staticmethod
+    def record_metric(metric):
+        path = Path(settings.BACKUP_SCHEDULER_METRICS_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(metric) + '\n')
+
+    def write_health(self, **fields):
+        """Atomically rewrite the health file read by monitoring"""
+        self.health.update(fields, updated=datetime.now().isoformat())
+        path = Path(settings.BACKUP_SCHEDULER_HEALTH_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.health, f, indent=2, default=str)
+        os.replace(tmp_path, path)
@@ -0,0 +1,90 @@
+# core/management/commands/benchmark_api_ingest.py
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+
+class Command(BaseCommand):
+    help = 'Compare product ingest throughput of the web form, single API posts and bulk API posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--records',
+            type=int,
+            default=500,
+            help='Products created by each method'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=250,
+            help='Records per bulk API call'
+        )
+
+    def handle(self, *args, **options):
+        records = options['records']
+        batch_size = options['batch_size']
+        # Run against throwaway test databases and a private cache so real data and report stamps are never touched
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # Login audit rows are written at once, not left in a buffer that outlives the test databases
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, ACTIVITY_LOG='immediate'):
+                client = self._client()
+                category, supplier = self._fixtures()
+                results = [
+                    ('Web form, one POST per record', self._time(
+                        lambda rows: [client.post(reverse('products-add'), row) for row in rows],
+                        self._rows('F', records, category, supplier), records, 302)),
+                    ('API, one POST per record', self._time(
+                        lambda rows: [client.post(reverse('v1:product-list'), row[0], content_type='application/json') for row in rows],
+                        self._batches('S', records, 1, category, supplier), records, 201)),
+                    (f'API bulk, {batch_size} per POST', self._time(
+                        lambda rows: [client.post(reverse('v1:product-bulk'), batch, content_type='application/json') for batch in rows],
+                        self._batches('B', records, batch_size, category, supplier), records, 201)),
+                ]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(self.style.SUCCESS(f"\nProduct ingest throughput ({records:,} records each):\n"))
+        baseline = results[0][1]
+        for label, rate in results:
+            self.stdout.write(f"  {label:<32} {rate:10,.0f} records/s  ({rate / baseline:5.1f}x)")
+
+    @staticmethod
+    def _client():
+        from core.models import UserRole
+        user = User.objects.create_user('benchmark', password='benchmark')
+        UserRole.objects.update_or_create(user=user, defaults={'role': 'admin'})
+        client = Client()
+        client.force_login(user)
+        return client
+
+    @staticmethod
+    def _fixtures():
+        from core.models import Category, Supplier
+        return Category.objects.create(name='Benchmark'), Supplier.objects.create(name='Benchmark')
+
+    @staticmethod
+    def _rows(prefix, count, category, supplier):
+        return [
+            {'code': f'{prefix}{i:06d}', 'name': f'Benchmark product {i}', 'category': category.pk,
+             'supplier': supplier.pk, 'unit_price': '9.99', 'quantity': 10}
+            for i in range(count)
+        ]
+
+    def _batches(self, prefix, count, size, category, supplier):
+        rows = self._rows(prefix, count, category, supplier)
+        return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+    def _time(self, run, rows, records, expected_status):
+        started = time.perf_counter()
+        responses = run(rows)
+        elapsed = time.perf_counter() - started
+        failed = [r.status_code for r in responses if r.status_code != expected_status]
+        if failed:
+            self.stderr.write(self.style.ERROR(f"✗ {len(failed)} calls failed (status {failed[0]})"))
+        return records / elapsed
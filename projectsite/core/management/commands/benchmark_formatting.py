@@ -0,0 +1,111 @@
+# core/management/commands/benchmark_formatting.py
+import random
+import time
+from decimal import Decimal
+from django import template
+from django.core.management.base import BaseCommand
+from core.formatting import _format, format_money, money_columns
+from core.models import Category, Product, Supplier
+
+# The float-based filters this replaces, kept here only as the benchmark baseline
+register = template.Library()
+
+
+@register.filter
+def legacy_currency_format(value):
+    try:
+        return f"{float(value):,.2f}"
+    except (ValueError, TypeError):
+        return value
+
+
+@register.filter
+def legacy_mul(value, arg):
+    try:
+        return float(value) * float(arg)
+    except (ValueError, TypeError):
+        return 0
+
+
+ROW = "<tr><td>{{ p.code }}</td><td>{{ p.name }}</td><td>{{ p.quantity }}</td><td>P%s</td><td>P%s</td></tr>"
+VARIANTS = {
+    'float filters per cell (before)': (
+        ROW % ('{{ p.unit_price|legacy_currency_format }}', '{{ p.quantity|legacy_mul:p.unit_price|legacy_currency_format }}'),
+        False,
+    ),
+    'Decimal filters per cell': (
+        ROW % ('{{ p.unit_price|currency_format }}', '{{ p.quantity|mul:p.unit_price|currency_format }}'),
+        False,
+    ),
+    'precomputed columns (now)': (
+        ROW % ('{{ p.unit_price_display }}', '{{ p.value_display }}'),
+        True,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = 'Time rendering an inventory table with per-cell float filters, Decimal filters and precomputed columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Table rows (in-memory products, nothing is written to the database)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Renders per variant; the best time is reported'
+        )
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], max(1, options['repeat'])
+        rng = random.Random(42)
+        category, supplier = Category(name='Bench'), Supplier(name='Bench')
+        # Prices repeat like a real catalogue: a few hundred distinct price points
+        prices = [Decimal(rng.randrange(100, 500000)) / 100 for _ in range(300)]
+        products = [
+            Product(code=f'B{i:06d}', name=f'Product {i}', category=category, supplier=supplier,
+                    unit_price=rng.choice(prices), quantity=rng.randrange(0, 1000))
+            for i in range(rows)
+        ]
+
+        engine = template.Engine(libraries={
+            'currency_filters': 'core.templatetags.currency_filters',
+            'custom_filters': 'core.templatetags.custom_filters',
+            'legacy': 'core.management.commands.benchmark_formatting',
+        })
+        self.stdout.write(self.style.SUCCESS(f"\nRendering {rows:,} inventory rows (best of {repeat}):\n"))
+        results = {}
+        for label, (row, precompute) in VARIANTS.items():
+            tpl = engine.from_string(
+                "{% load currency_filters custom_filters legacy %}<table>{% for p in products %}" + row + "{% endfor %}</table>"
+            )
+            best = None
+            for _ in range(repeat):
+                _format.cache_clear()
+                started = time.perf_counter()
+                if precompute:
+                    money_columns(products, unit_price_display='unit_price', value_display=lambda p: p.quantity * p.unit_price)
+                html = tpl.render(template.Context({'products': products}))
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = (best, html)
+            self.stdout.write(f"  {label:<34} {best * 1000:8.1f} ms  ({best / rows * 1e6:.2f} µs/row)")
+
+        baseline = next(iter(results.values()))[0]
+        fastest = results['precomputed columns (now)'][0]
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Precomputed columns render {baseline / fastest:.1f}x faster than float filters"))
+
+        # Where float formatting and exact Decimal rounding disagree on the printed amount
+        differ = sum(
+            1 for p in products
+            if legacy_currency_format(legacy_mul(p.quantity, p.unit_price)) != format_money(p.quantity * p.unit_price)
+        )
+        half_cents = [Decimal('2.675'), Decimal('1.005'), Decimal('0.125')]
+        examples = ', '.join(f"{v}: {legacy_currency_format(v)} vs {format_money(v)}" for v in half_cents)
+        self.stdout.write(f"  Row values printed differently by the float path: {differ:,} of {rows:,}")
+        self.stdout.write(f"  Half-cent rounding, float vs Decimal: {examples}")
@@ -0,0 +1,64 @@
+# core/management/commands/export_pdf_reports.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.pdf_reports import PDF_AVAILABLE, PDF_REPORT_TYPES, month_range, render_pdf_batch
+
+class Command(BaseCommand):
+    help = 'Render reports as PDF files, several in parallel (e.g. the month-end batch for the auditors)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reports',
+            nargs='+',
+            choices=PDF_REPORT_TYPES,
+            default=list(PDF_REPORT_TYPES),
+            help='Reports to render (default: all)'
+        )
+        parser.add_argument(
+            '--month',
+            action='append',
+            help='Month (YYYY-MM) covered by the profit & loss report; repeat for several months (default: current month)'
+        )
+        parser.add_argument(
+            '--output-dir',
+            default='.',
+            help='Directory the PDFs are written to'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.PDF_WORKERS,
+            help='Reports rendered in parallel'
+        )
+
+    def handle(self, *args, **options):
+        if not PDF_AVAILABLE:
+            self.stdout.write(self.style.ERROR("✗ PDF export requires reportlab"))
+            return
+
+        months = options.get('month') or [None]
+        try:
+            for month in months:
+                month_range(month)
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(f"✗ {e}"))
+            return
+
+        # Inventory is a snapshot of current stock, so it is rendered once whatever the months
+        batch = []
+        for report_type in options['reports']:
+            if report_type == 'profit_loss':
+                batch.extend((report_type, month) for month in months)
+            else:
+                batch.append((report_type, None))
+
+        self.stdout.write(self.style.SUCCESS(f"Rendering {len(batch)} reports with {min(options['workers'], len(batch))} workers..."))
+        results = render_pdf_batch(batch, options['output_dir'], workers=options['workers'])
+        for result in results:
+            if result['status'] == 'success':
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ {result['path']}: {result['rows']:,} rows, {result['pages']:,} pages in {result['seconds']}s"
+                ))
+            else:
+                month = f" ({result['month']})" if result['month'] else ''
+                self.stdout.write(self.style.ERROR(f"✗ {result['report']}{month} failed: {result['error']}"))
@@ -0,0 +1,53 @@
+# core/management/commands/import_products.py
+from django.core.management.base import BaseCommand
+from core.imports import import_products
+
+class Command(BaseCommand):
+    help = 'Import products from a CSV or XLSX file (columns: code, name, category, unit_price[, supplier, quantity, reorder_level])'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV or XLSX file to import')
+        parser.add_argument(
+            '--errors',
+            help='Where to write rejected rows (default: <file>.errors.csv)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Rows validated and written per transaction (default: IMPORT_CHUNK_SIZE)'
+        )
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help='Create categories and suppliers that do not exist yet'
+        )
+
+    def handle(self, *args, **options):
+        def on_progress(done, total):
+            of_total = f" of ~{total:,}" if total else ''
+            self.stdout.write(f"  {done:,}{of_total} rows processed")
+
+        self.stdout.write(self.style.SUCCESS(f"Importing {options['file']}..."))
+        result = import_products(
+            options['file'],
+            errors_path=options.get('errors'),
+            chunk_size=options.get('chunk_size'),
+            create_missing=options['create_missing'],
+            progress=on_progress,
+        )
+
+        if result['status'] != 'success':
+            self.stdout.write(self.style.ERROR(f"✗ Import failed: {result['error']}"))
+        else:
+            rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✓ Imported {result['rows'] - result['failed']:,} of {result['rows']:,} rows "
+                    f"in {result['seconds']}s ({rate:,.0f} rows/s)\n"
+                    f"  Created: {result['created']:,}\n"
+                    f"  Updated: {result['updated']:,}\n"
+                    f"  Batches: {result['batches']:,}"
+                )
+            )
+        if result['errors_file']:
+            self.stdout.write(self.style.ERROR(f"✗ {result['failed']:,} rows rejected; see {result['errors_file']}"))
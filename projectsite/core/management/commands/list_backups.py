@@ -12,10 +12,19 @@ class Command(BaseCommand):
             action='store_true',
             help='Show backup statistics'
         )
+        parser.add_argument(
+            '--rebuild-catalog',
+            action='store_true',
+            help='Rebuild the backup catalog from the JSON metadata files first'
+        )
     
     def handle(self, *args, **options):
         show_stats = options.get('stats', False)
         
+        if options.get('rebuild_catalog'):
+            BackupManager.get_catalog().rebuild()
+            self.stdout.write(self.style.SUCCESS("✓ Backup catalog rebuilt"))
+        
         backups = BackupManager.get_backups()
         
         if not backups:
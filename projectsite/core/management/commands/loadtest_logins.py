@@ -0,0 +1,162 @@
+# core/management/commands/loadtest_logins.py
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+
+# (label, settings) of each run; the first is the baseline
+CONFIGS = [
+    ('audit row per login, database sessions', {
+        'ACTIVITY_LOG': 'immediate',
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    }),
+    ('batched audit rows, database sessions', {
+        'ACTIVITY_LOG': 'batched',
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    }),
+    ('batched audit rows, cache sessions', {
+        'ACTIVITY_LOG': 'batched',
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cache',
+    }),
+]
+PASSWORD = 'loadtest-password'
+
+
+class Command(BaseCommand):
+    help = 'Log many cashiers in at the same moment and compare login audit and session settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=200,
+            help='Cashiers logging in simultaneously (one thread each)'
+        )
+        parser.add_argument(
+            '--fast-hasher',
+            action='store_true',
+            help='Hash passwords with MD5 so database writes, not PBKDF2, dominate the timings'
+        )
+
+    def handle(self, *args, **options):
+        count = options['users']
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hasher'] else None
+        # A throwaway database and private cache; SQLite test databases go to a file, so writers really contend for its lock
+        setup_test_environment()
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        if connection.vendor == 'sqlite':
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            overrides = {'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}}
+            if hashers:
+                overrides['PASSWORD_HASHERS'] = hashers
+            with override_settings(**overrides):
+                users = self._create_users(count)
+                results = []
+                for label, config in CONFIGS:
+                    with override_settings(**config):
+                        results.append((label, self._run(users)))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{count} simultaneous logins and logouts ({connection.vendor}, "
+            f"{'MD5' if hashers else 'default'} password hasher):\n"
+        ))
+        baseline = results[0][1]['rate']
+        for label, result in results:
+            self.stdout.write(
+                f"  {label:<40} {result['rate']:7.1f} logins/s ({result['rate'] / baseline:4.1f}x)  "
+                f"p50 {result['p50']:6.0f} ms  p95 {result['p95']:6.0f} ms  "
+                f"{result['writes']:4.1f} writes/login  {result['audit_rows']} audit rows for {result['logins']} logins"
+            )
+            for failure, n in result['failures'].most_common(3):
+                self.stdout.write(self.style.ERROR(f"    ✗ {n} failed: {failure}"))
+
+    @staticmethod
+    def _create_users(count):
+        """Cashier accounts sharing one password hash, so setup does not hash `count` times"""
+        from core.models import UserRole
+        hashed = make_password(PASSWORD)
+        User.objects.bulk_create([User(username=f'cashier_{i:04d}', password=hashed) for i in range(count)])
+        users = list(User.objects.filter(username__startswith='cashier_').order_by('username'))
+        UserRole.objects.bulk_create([UserRole(user=user, role='cashier') for user in users])
+        return users
+
+    @staticmethod
+    def _run(users):
+        """Log every user in at once (and out again); returns throughput, latency and writes per login"""
+        from core.activity_log import activity_log
+        from core.models import AuditLog
+        barrier = threading.Barrier(len(users))
+        latencies, failures, writes = [], Counter(), Counter()
+        lock = threading.Lock()
+
+        def count_writes(execute, sql, params, many, context):
+            if sql.lstrip().split(' ', 1)[0].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+                with lock:
+                    writes['login'] += 1
+            return execute(sql, params, many, context)
+
+        def login(user):
+            client = Client()
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                with connection.execute_wrapper(count_writes):
+                    response = client.post(reverse('login'), {'username': user.username, 'password': PASSWORD})
+                elapsed = time.perf_counter() - started
+                if response.status_code != 302:
+                    failure = f'HTTP {response.status_code}'
+                else:
+                    failure = None
+                    client.get(reverse('logout'))
+            except Exception as e:
+                failure, elapsed = f'{type(e).__name__}: {e}', None
+            finally:
+                connections.close_all()
+            with lock:
+                if failure:
+                    failures[failure] += 1
+                else:
+                    latencies.append(elapsed)
+
+        threads = [threading.Thread(target=login, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        activity_log.flush()
+
+        audit = AuditLog.objects.filter(action__in=('login', 'logout'))
+        result = {
+            'rate': len(latencies) / elapsed,
+            'p50': statistics.median(latencies) * 1000 if latencies else 0,
+            'p95': sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+            # Per attempt: a login that failed half way wrote too
+            'writes': writes['login'] / len(users),
+            'logins': len(latencies),
+            'audit_rows': audit.count(),
+            'failures': failures,
+        }
+        # Start the next configuration from the same state
+        audit.delete()
+        Session.objects.all().delete()
+        return result
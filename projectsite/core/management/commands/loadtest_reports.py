@@ -0,0 +1,87 @@
+# core/management/commands/loadtest_reports.py
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ['/reports/', '/reports/inventory/', '/reports/profit-loss/']
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # A redirect means the session was rejected; count it instead of following it
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent report requests at a running server and report throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to test')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+        parser.add_argument('--username', required=True, help='Admin user the requests are made as')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=500, help='Total requests to send')
+        parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User not found: {options['username']}")
+
+        # Log in by creating a session directly, so the test measures report views only
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        cookie = f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+        base_url = options['base_url'].rstrip('/')
+        paths = options['paths'] or DEFAULT_PATHS
+        total = options['requests']
+        timeout = options['timeout']
+        opener = urllib.request.build_opener(NoRedirect)
+
+        def fetch(i):
+            request = urllib.request.Request(base_url + paths[i % len(paths)], headers={'Cookie': cookie})
+            started = time.perf_counter()
+            try:
+                with opener.open(request, timeout=timeout) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return ok, time.perf_counter() - started
+
+        self.stdout.write(f"{total} requests to {base_url} ({', '.join(paths)}) with concurrency {options['concurrency']}...")
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                results = list(pool.map(fetch, range(total)))
+        finally:
+            session.delete()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(seconds for ok, seconds in results if ok)
+        errors = total - len(latencies)
+        if not latencies:
+            raise CommandError(f'All {total} requests failed; is the server running at {base_url}?')
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(latencies) / elapsed:.1f} req/s over {elapsed:.2f}s\n"
+            f"  latency p50 {percentile(0.50):.0f} ms, p95 {percentile(0.95):.0f} ms, "
+            f"max {latencies[-1] * 1000:.0f} ms, mean {statistics.mean(latencies) * 1000:.0f} ms"
+        ))
+        if errors:
+            self.stdout.write(self.style.ERROR(f"✗ {errors} requests failed or were redirected"))
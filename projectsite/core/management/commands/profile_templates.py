@@ -0,0 +1,60 @@
+# core/management/commands/profile_templates.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+from core.profiling import install_template_profiler, start_profile, stop_profile
+
+class Command(BaseCommand):
+    help = 'Request pages as a user and report the slowest templates and tags (works with TEMPLATE_PROFILING off)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls',
+            nargs='*',
+            default=['/', '/products/', '/purchases/', '/reports/', '/reports/inventory/', '/audit-logs/'],
+            help='Paths to request (default: the heaviest pages)'
+        )
+        parser.add_argument(
+            '--user',
+            help='Username to request the pages as (default: the first superuser)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Requests per page; the first shows the cold cost, later ones the cached cost'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Templates and tags listed per page'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(username=options['user']) if options.get('user') else \
+            User.objects.filter(is_superuser=True).order_by('pk')
+        user = users.first()
+        if user is None:
+            self.stdout.write(self.style.ERROR("✗ No such user; pass --user <username>"))
+            return
+
+        install_template_profiler()
+        client = Client()
+        client.force_login(user)
+        for url in options['urls']:
+            timings = []
+            profile = None
+            for _ in range(max(1, options['repeat'])):
+                profile, token = start_profile()
+                try:
+                    response = client.get(url)
+                finally:
+                    stop_profile(token)
+                timings.append(profile.total * 1000)
+            if response.status_code != 200:
+                self.stdout.write(self.style.ERROR(f"✗ {url} returned {response.status_code}"))
+                continue
+            runs = ', '.join(f"{ms:.1f}" for ms in timings)
+            self.stdout.write(self.style.SUCCESS(f"\n{url}  (render ms per request: {runs})"))
+            self.stdout.write(profile.report(f"last request as {user.username}", limit=options['top']))
@@ -0,0 +1,51 @@
+# core/management/commands/refresh_replica.py
+import os
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.db_routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Refresh the emulated SQLite read replica from the primary database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every N seconds (0 = refresh once and exit)'
+        )
+
+    def handle(self, *args, **options):
+        replica = settings.DATABASES.get(REPLICA_ALIAS)
+        if not replica:
+            raise CommandError("No 'replica' database configured (set DB_REPLICA=sqlite).")
+        if 'sqlite' not in replica['ENGINE']:
+            raise CommandError('The replica is a real database server; it is kept in sync by replication.')
+
+        interval = options.get('interval', 0)
+        while True:
+            started = time.monotonic()
+            self.refresh(settings.DATABASES['default']['NAME'], replica['NAME'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Replica refreshed in {time.monotonic() - started:.2f}s"
+            ))
+            if interval <= 0:
+                return
+            time.sleep(interval)
+
+    @staticmethod
+    def refresh(primary_path, replica_path):
+        """Take a consistent snapshot with the SQLite backup API and swap it in atomically"""
+        tmp_path = f"{replica_path}.tmp"
+        src = sqlite3.connect(primary_path)
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        # Readers that already opened the old file keep their snapshot; new connections see the copy
+        os.replace(tmp_path, replica_path)
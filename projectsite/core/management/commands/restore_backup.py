@@ -1,5 +1,6 @@
 # core/management/commands/restore_backup.py
-from django.core.management.base import BaseCommand
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
 from core.backup import BackupManager
 
 class Command(BaseCommand):
@@ -9,8 +10,15 @@ class Command(BaseCommand):
         parser.add_argument(
             'backup_file',
             type=str,
+            nargs='?',
             help='Name of the backup file to restore (e.g., backup_20251204_120000.db.gz)'
         )
+        parser.add_argument(
+            '--to-time',
+            type=str,
+            help='Point-in-time restore: replay captured changes up to this time (e.g., "2025-12-04 14:30:00"); '
+                 'the nearest earlier backup is used unless backup_file is given'
+        )
         parser.add_argument(
             '--force',
             action='store_true',
@@ -20,21 +28,29 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         backup_file = options['backup_file']
         force = options.get('force', False)
+        target_time = None
+        if options.get('to_time'):
+            try:
+                target_time = datetime.fromisoformat(options['to_time'])
+            except ValueError:
+                raise CommandError(f"Invalid --to-time: {options['to_time']}")
+            if backup_file is None:
+                base = BackupManager.find_base_backup(target_time)
+                backup_file = base['filename'] if base else None
+                if backup_file is None:
+                    raise CommandError(f"No backup found at or before {target_time}")
+        elif backup_file is None:
+            raise CommandError('Give a backup file, --to-time, or both.')
         
         # Get backup info
-        backups = BackupManager.get_backups()
-        backup_info = None
-        for backup in backups:
-            if backup.get('filename') == backup_file:
-                backup_info = backup
-                break
+        backup_info = BackupManager.get_backup(backup_file)
         
         if not backup_info:
             self.stdout.write(
                 self.style.ERROR(f"✗ Backup not found: {backup_file}")
             )
             self.stdout.write(self.style.WARNING("\nAvailable backups:"))
-            for backup in backups:
+            for backup in BackupManager.get_backups():
                 print(f"  - {backup['filename']} ({backup['size_mb']} MB)")
             return
         
@@ -45,6 +61,7 @@ class Command(BaseCommand):
                 f"   Date: {backup_info['datetime']}\n"
                 f"   Size: {backup_info['size_mb']} MB\n"
                 f"   Description: {backup_info.get('description', 'None')}"
+                + (f"\n   Roll forward to: {target_time}" if target_time else "")
             ))
             confirm = input("\nAre you sure you want to restore? (yes/no): ").lower()
             if confirm != 'yes':
@@ -53,7 +70,7 @@ class Command(BaseCommand):
         
         # Restore backup
         self.stdout.write(self.style.SUCCESS('\nRestoring backup...'))
-        result = BackupManager.restore_backup(backup_file)
+        result = BackupManager.restore_backup(backup_file, target_time=target_time)
         
         if result.get('status') == 'success':
             self.stdout.write(
@@ -61,6 +78,7 @@ class Command(BaseCommand):
                     f"✓ Database restored successfully!\n"
                     f"  Message: {result['message']}\n"
                     f"  Restore Point: {result['restore_point']}"
+                    + (f"\n  Changes replayed: {result['changes_applied']}" if 'changes_applied' in result else "")
                 )
             )
         else:
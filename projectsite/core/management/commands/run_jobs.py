@@ -0,0 +1,114 @@
+# core/management/commands/run_jobs.py
+import multiprocessing
+import signal
+import time
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+# How often each worker looks for stale jobs and expired result files
+MAINTENANCE_SECONDS = 60
+
+
+def _run_worker(burst):
+    """
+    Entry point of a worker process
+
+    A module-level function (a bound method cannot be pickled) that sets
+    Django up itself: under the spawn start method (Windows, macOS) the
+    child starts from a fresh interpreter. This module imports no models at
+    the top for the same reason. A no-op setup when forked.
+    """
+    django.setup()
+    Command().work(burst)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (backups, restores, cleanups, exports) in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.JOB_WORKERS,
+            help='Number of worker processes'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        burst = options.get('burst', False)
+        if workers == 1:
+            self.work(burst)
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        processes = {}
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write(self.style.SUCCESS(f"Starting {workers} job workers"))
+        try:
+            while not stopping:
+                for slot in range(workers):
+                    proc = processes.get(slot)
+                    if proc is not None and proc.is_alive():
+                        continue
+                    if proc is not None:
+                        if burst and proc.exitcode == 0:
+                            continue
+                        if proc.exitcode != 0:
+                            self.stdout.write(self.style.ERROR(f"✗ Worker {proc.pid} exited with {proc.exitcode}; restarting"))
+                    proc = multiprocessing.Process(target=_run_worker, args=(burst,), daemon=True)
+                    proc.start()
+                    processes[slot] = proc
+                if burst and all(p.exitcode == 0 for p in processes.values()):
+                    break
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for proc in processes.values():
+                if proc.is_alive():
+                    # Workers finish their current job before exiting
+                    proc.terminate()
+            for proc in processes.values():
+                proc.join()
+        self.stdout.write(self.style.WARNING('Job workers stopped'))
+
+    def work(self, burst=False):
+        """Claim and run jobs until stopped (or until the queue is empty with `burst`)"""
+        from core.jobs import claim_next, prune_results, requeue_stale, run_job, worker_id
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        worker = worker_id()
+        last_maintenance = 0
+        while not stopping:
+            if time.monotonic() - last_maintenance >= MAINTENANCE_SECONDS:
+                requeue_stale()
+                prune_results()
+                last_maintenance = time.monotonic()
+
+            job = claim_next(worker)
+            if job is None:
+                if burst:
+                    return
+                close_old_connections()
+                time.sleep(settings.JOB_POLL_SECONDS)
+                continue
+
+            self.stdout.write(f"[{worker}] {job.kind} #{job.pk} (attempt {job.attempts}/{job.max_attempts})")
+            if run_job(job):
+                self.stdout.write(self.style.SUCCESS(f"✓ {job.kind} #{job.pk} done"))
+            else:
+                self.stdout.write(self.style.ERROR(f"✗ {job.kind} #{job.pk} failed"))
+            close_old_connections()
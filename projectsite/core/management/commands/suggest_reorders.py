@@ -0,0 +1,50 @@
+# core/management/commands/suggest_reorders.py
+import csv
+from django.core.management.base import BaseCommand
+from core.stock import StockManager
+
+class Command(BaseCommand):
+    help = 'List products below their reorder level with suggested order quantities'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Sales window used for the daily velocity (default: REORDER_VELOCITY_DAYS)'
+        )
+        parser.add_argument(
+            '--cover-days',
+            type=int,
+            help='Days of sales the order should cover (default: REORDER_COVER_DAYS)'
+        )
+        parser.add_argument(
+            '--csv',
+            help='Write the suggestions to this CSV file instead of printing them'
+        )
+
+    def handle(self, *args, **options):
+        suggestions = StockManager.suggest_reorders(days=options.get('days'), cover_days=options.get('cover_days'))
+        if not suggestions:
+            self.stdout.write(self.style.SUCCESS("✓ No products below their reorder level"))
+            return
+
+        columns = ['code', 'name', 'supplier', 'quantity', 'reorder_level', 'reserved', 'daily_velocity', 'suggested']
+        rows = [
+            [s['product'].code, s['product'].name, s['product'].supplier.name if s['product'].supplier else '',
+             s['quantity'], s['reorder_level'], s['reserved'], s['daily_velocity'], s['suggested']]
+            for s in suggestions
+        ]
+        if options.get('csv'):
+            with open(options['csv'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
+            self.stdout.write(self.style.SUCCESS(f"✓ {len(rows)} suggestions written to {options['csv']}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"\n{len(rows)} products below their reorder level:\n"))
+        self.stdout.write(f"  {'Code':<14} {'Name':<30} {'Supplier':<20} {'Qty':>6} {'Level':>6} {'Rsvd':>6} {'/day':>7} {'Order':>7}")
+        for code, name, supplier, quantity, level, reserved, velocity, suggested in rows:
+            self.stdout.write(
+                f"  {code:<14} {name[:30]:<30} {supplier[:20]:<20} {quantity:>6} {level:>6} {reserved:>6} {velocity:>7} {suggested:>7}"
+            )
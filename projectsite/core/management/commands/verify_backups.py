@@ -0,0 +1,48 @@
+# core/management/commands/verify_backups.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.backup import BackupManager
+
+class Command(BaseCommand):
+    help = 'Verify backup checksums and run PRAGMA quick_check against restored copies'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'backup_files',
+            nargs='*',
+            help='Backups to verify (default: all backups in the catalog)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.BACKUP_VERIFY_WORKERS,
+            help='Backups verified in parallel'
+        )
+    
+    def handle(self, *args, **options):
+        filenames = options.get('backup_files') or [b['filename'] for b in BackupManager.get_backups()]
+        if not filenames:
+            self.stdout.write(self.style.WARNING("No backups found."))
+            return
+        
+        workers = max(1, options['workers'])
+        self.stdout.write(self.style.SUCCESS(f"Verifying {len(filenames)} backups with {workers} workers...\n"))
+        failed = 0
+        # Decompression, hashing and SQLite checks release the GIL, so threads run in parallel
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(BackupManager.verify_backup, name): name for name in filenames}
+            for future in as_completed(futures):
+                name = futures[future]
+                result = future.result()
+                if result['status'] == 'ok':
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✓ {name}: checksum {result['checksum']}, quick_check {result['quick_check'] or 'n/a'}"
+                    ))
+                else:
+                    failed += 1
+                    reason = result['error'] or f"checksum {result['checksum']}, quick_check {result['quick_check']}"
+                    self.stdout.write(self.style.ERROR(f"✗ {name}: {reason}"))
+        
+        summary = f"\n{len(filenames) - failed} passed, {failed} failed"
+        self.stdout.write(self.style.ERROR(summary) if failed else self.style.SUCCESS(summary))
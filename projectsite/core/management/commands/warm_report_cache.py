@@ -0,0 +1,42 @@
+# core/management/commands/warm_report_cache.py
+from django.core.management.base import BaseCommand
+from core.report_cache import REPORTS, ReportCache
+from core.reports import REPORT_PERIODS
+
+class Command(BaseCommand):
+    help = 'Pre-render reports into the cache (run before business hours, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--report',
+            action='append',
+            choices=sorted(REPORTS),
+            help='Report to warm; repeat for several (default: all reports)'
+        )
+        parser.add_argument(
+            '--period',
+            action='append',
+            choices=['all', *REPORT_PERIODS],
+            help='Period to warm; repeat for several (default: every period a report supports)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild entries even if their data version is still current'
+        )
+
+    def handle(self, *args, **options):
+        results = ReportCache.warm(options.get('report'), options.get('period'), force=options['force'])
+        failed = 0
+        for result in results:
+            label = f"{result['report']} ({result['period']})"
+            if result['status'] != 'success':
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"✗ {label}: {result['error']}"))
+            elif result['built']:
+                self.stdout.write(self.style.SUCCESS(f"✓ {label}: built in {result['build_seconds']}s"))
+            else:
+                self.stdout.write(f"  {label}: already current")
+
+        summary = f"\n{len(results) - failed} warm, {failed} failed"
+        self.stdout.write(self.style.ERROR(summary) if failed else self.style.SUCCESS(summary))
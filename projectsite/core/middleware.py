@@ -1,24 +1,179 @@
-import threading
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import close_old_connections
+from .profiling import install_template_profiler, start_profile, stop_profile
 
-_thread_locals = threading.local()
+profiling_logger = logging.getLogger('core.profiling')
+
+# Context-local, so each request (thread or asyncio task) sees only its own user.
+# The request is stored rather than request.user: the user is a lazy object, and
+# asgiref compares context values when crossing sync/async boundaries, which
+# would load it from the database in async code.
+_current_request = ContextVar('current_request', default=None)
 
 class CurrentUserMiddleware:
-    """Middleware that stores the current request user in thread-local storage.
+    """Middleware that stores the current request user in a context variable.
 
     This allows signal handlers and other code without direct request access to
-    determine the acting user when processing requests.
+    determine the acting user when processing requests. The value is reset
+    after the response, and works under both WSGI and ASGI.
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
         try:
-            _thread_locals.user = getattr(request, 'user', None)
-        except Exception:
-            _thread_locals.user = None
-        response = self.get_response(request)
-        return response
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+# Explicit acting user for work outside the request cycle (jobs, commands, worker threads)
+_acting_user = ContextVar('acting_user', default=None)
 
 
 def get_current_user():
-    return getattr(_thread_locals, 'user', None)
+    """Return the user the current code runs on behalf of, or None"""
+    user = _acting_user.get()
+    if user is not None:
+        return user
+    request = _current_request.get()
+    return getattr(request, 'user', None)
+
+
+@contextmanager
+def acting_as(user):
+    """Make get_current_user() return `user` inside the block"""
+    token = _acting_user.set(user)
+    try:
+        yield user
+    finally:
+        _acting_user.reset(token)
+
+
+def with_current_user(func):
+    """Bind the current user to `func` so it can run on another thread.
+
+    New threads and executor workers start with an empty context, so
+    get_current_user() would return None there. (asyncio tasks and
+    sync_to_async copy the context themselves and need no help.) The user
+    is resolved now, while the request is still active; in async code,
+    resolve it with `await request.auser()` and use `acting_as` instead.
+    """
+    user = get_current_user()
+    if user is not None:
+        # Load a lazy request.user here rather than from the worker after the response
+        getattr(user, 'pk', None)
+
+    @wraps(func)
+    def _wrapped(*args, **kwargs):
+        with acting_as(user):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # Worker threads are outside the request cycle that normally recycles connections
+                close_old_connections()
+    return _wrapped
+
+
+def submit_with_current_user(executor, func, *args, **kwargs):
+    """executor.submit() that keeps the submitting request's user for audit entries"""
+    return executor.submit(with_current_user(func), *args, **kwargs)
+
+
+class ReplicaPinningMiddleware:
+    """Pin a client to the primary database for a short window after it writes.
+
+    Any unsafe request (POST, PUT, PATCH, DELETE) sets a short-lived cookie;
+    views decorated with `core.db_routers.use_replica` read from the primary
+    while the cookie is present so users always see their own changes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    @staticmethod
+    def pin(request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and 'replica' in settings.DATABASES:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class TemplateProfilerMiddleware:
+    """Time template rendering per request when TEMPLATE_PROFILING is on (see core/profiling.py).
+
+    The slowest templates and tags are logged to 'core.profiling' and the
+    total render time is returned in a Server-Timing header. Removed from
+    the middleware chain entirely when profiling is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        install_template_profiler()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, token = start_profile()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_profile(token)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, token = start_profile()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_profile(token)
+        return self.report(request, response, profile)
+
+    @staticmethod
+    def report(request, response, profile):
+        if profile.total:
+            response['Server-Timing'] = f'templates;desc="Template rendering";dur={profile.total * 1000:.1f}'
+            profiling_logger.info(profile.report(f"{request.method} {request.path}", limit=settings.TEMPLATE_PROFILING_TOP))
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_userrole'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('filename', models.CharField(max_length=255, unique=True)),
+                ('period_start', models.DateTimeField(db_index=True)),
+                ('period_end', models.DateTimeField(db_index=True)),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('row_count', models.IntegerField()),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(max_length=64)),
+            ],
+            options={
+                'ordering': ['-period_start'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_job_import_products_kind'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'verbose_name_plural': 'categories'},
+        ),
+    ]
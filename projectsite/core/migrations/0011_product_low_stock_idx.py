@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_category_verbose_name_plural'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity__lt', models.F('reorder_level'))), fields=['quantity'], name='product_low_stock_idx'),
+        ),
+    ]
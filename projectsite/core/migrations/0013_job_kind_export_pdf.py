@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_auditlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('create_backup', 'Create Backup'), ('restore_backup', 'Restore Backup'), ('cleanup_backups', 'Clean Up Backups'), ('export_report', 'Export Report'), ('export_pdf', 'Export PDF Report'), ('import_products', 'Import Products')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    """Fold report-view summaries written twice for one (user, page, hour) into the oldest row"""
+    AuditLog = apps.get_model('core', 'AuditLog')
+    duplicates = (
+        AuditLog.objects.filter(action='view_reports')
+        .values('user', 'target', 'created_at')
+        .annotate(rows=models.Count('id')).filter(rows__gt=1)
+    )
+    for bucket in duplicates:
+        rows = list(AuditLog.objects.filter(
+            action='view_reports', user=bucket['user'], target=bucket['target'], created_at=bucket['created_at'],
+        ).order_by('id'))
+        views = sum(row.changes[0]['new'] if row.changes else 1 for row in rows)
+        keep = rows[0]
+        keep.changes = [{'field': 'views', 'old': 0, 'new': views}]
+        keep.save(update_fields=['changes'])
+        AuditLog.objects.filter(pk__in=[row.pk for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_job_kind_export_pdf'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='auditlog',
+            constraint=models.UniqueConstraint(condition=models.Q(('action', 'view_reports')), fields=('user', 'target', 'created_at'), name='auditlog_read_event_bucket'),
+        ),
+    ]
@@ -2,6 +2,8 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from decimal import Decimal, ROUND_HALF_UP
 
 # ---------- USER ROLE ----------
@@ -40,6 +42,8 @@ class Supplier(BaseModel):
 # ---------- CATEGORY ----------
 class Category(BaseModel):
     name = models.CharField(max_length=100)
+    class Meta:
+        verbose_name_plural = "categories"
     def __str__(self):
         return self.name
 
@@ -53,9 +57,22 @@ class Product(BaseModel):
     # keep a compatibility column for existing databases; default comes from settings
     reorder_level = models.IntegerField(default=getattr(settings, 'DEFAULT_REORDER_LEVEL', 5))
     quantity = models.IntegerField(default=0)  # materialized for quick read
+
+    class Meta:
+        indexes = [
+            # Partial index holding only products below their reorder level; the database keeps it
+            # current on every stock change, so low-stock reads touch those rows only
+            models.Index(fields=['quantity'], condition=models.Q(quantity__lt=models.F('reorder_level')),
+                         name='product_low_stock_idx'),
+        ]
+
     def __str__(self):
         return f"{self.code} - {self.name}"
 
+    @property
+    def is_low_stock(self):
+        return self.quantity < self.reorder_level
+
 # ---------- PURCHASE ORDER ----------
 class PurchaseOrder(BaseModel):
     po_number = models.CharField(max_length=50, unique=True, editable=False)
@@ -75,6 +92,46 @@ class PurchaseOrder(BaseModel):
             self.po_number = f"PO-{count:08d}"
         super().save(*args, **kwargs)
     
+    def save_items(self, items):
+        """Create (product, quantity, unit_cost) lines, take them out of stock and save the totals"""
+        total_subtotal = Decimal('0.00')
+        total_tax = Decimal('0.00')
+        stock = {}
+        for product, qty, cost in items:
+            # One instance per product with its current quantity, so repeated lines and earlier orders add up
+            if product.pk not in stock:
+                product.refresh_from_db(fields=['quantity'])
+                stock[product.pk] = product
+            product = stock[product.pk]
+            line_total = qty * cost
+            
+            PurchaseItem.objects.create(
+                purchase_order=self,
+                product=product,
+                quantity=qty,
+                unit_cost=cost
+            )
+            
+            # Decrement product stock
+            product.quantity -= qty
+            product.save()
+            
+            total_subtotal += line_total
+            # Calculate tax on this line item based on purchase order tax rate
+            line_tax = (line_total * self.tax_rate / Decimal('100')).quantize(Decimal('0.01'))
+            total_tax += line_tax
+        
+        self.total_subtotal = total_subtotal
+        self.total_tax = total_tax
+        self.total_amount = total_subtotal + total_tax
+        
+        # Calculate change if cash is provided
+        if self.cash:
+            cash = Decimal(str(self.cash))
+            self.change = (cash - self.total_amount).quantize(Decimal('0.01'))
+        
+        self.save()
+    
     def __str__(self):
         return self.po_number
 
@@ -90,9 +147,123 @@ class PurchaseItem(models.Model):
 
 # ---------- AUDIT LOG ----------
 class AuditLog(BaseModel):
+    # When the event happened, which batched and summary rows set themselves (auto_now_add would overwrite it)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     action = models.CharField(max_length=150)
     target = models.CharField(max_length=150)
+    # Structured copy of `target` ("Model:pk"); NULL until backfilled, '' when target is not a model
+    target_model = models.CharField(max_length=50, null=True, blank=True)
+    target_pk = models.CharField(max_length=64, blank=True, default='')
     detail = models.TextField(blank=True)
+    # Field-level changes: [{"field": ..., "old": ..., "new": ...}]
+    changes = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['target_model', 'target_pk'], name='auditlog_target_idx'),
+            models.Index(fields=['action', 'created_at'], name='auditlog_action_created_idx'),
+        ]
+        constraints = [
+            # One report-view summary per (user, page, hour); see core/read_events.py
+            models.UniqueConstraint(
+                fields=['user', 'target', 'created_at'], condition=models.Q(action='view_reports'),
+                name='auditlog_read_event_bucket',
+            ),
+        ]
+
+    # Models that appear as "Model:pk" targets, keyed by lower-case name
+    TARGET_MODELS = {
+        name.lower(): name
+        for name in ('Product', 'Supplier', 'Category', 'PurchaseOrder', 'PurchaseItem', 'User')
+    }
+
+    @staticmethod
+    def split_target(target):
+        """Split a "Model:pk" target into (model, pk); other targets give ('', '')"""
+        model, sep, pk = (target or '').partition(':')
+        if sep and model.isidentifier() and pk:
+            return model, pk
+        return '', ''
+
+    @classmethod
+    def resolve_target(cls, target):
+        """Read a target filter as (model, pk): "product:5" -> ('Product', '5'), "product" -> ('Product', ''), free text -> ('', '')"""
+        model, pk = cls.split_target(target)
+        model = cls.TARGET_MODELS.get(model.lower()) if model else cls.TARGET_MODELS.get((target or '').lower())
+        return (model, pk) if model else ('', '')
+
+    def save(self, *args, **kwargs):
+        if self.target_model is None:
+            self.target_model, self.target_pk = self.split_target(self.target)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user} - {self.action} ({self.target})"
+
+class AuditLogArchive(BaseModel):
+    """Index of compressed NDJSON files holding audit rows moved out of the hot table"""
+    filename = models.CharField(max_length=255, unique=True)
+    period_start = models.DateTimeField(db_index=True)
+    period_end = models.DateTimeField(db_index=True)
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    row_count = models.IntegerField()
+    size_bytes = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64)
+
+    class Meta:
+        ordering = ['-period_start']
+
+    def __str__(self):
+        return f"{self.filename} ({self.row_count} rows)"
+
+# ---------- BACKGROUND JOBS ----------
+class Job(BaseModel):
+    """A unit of work run by `manage.py run_jobs` outside the HTTP request"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    KIND_CHOICES = [
+        ('create_backup', 'Create Backup'),
+        ('restore_backup', 'Restore Backup'),
+        ('cleanup_backups', 'Clean Up Backups'),
+        ('export_report', 'Export Report'),
+        ('export_pdf', 'Export PDF Report'),
+        ('import_products', 'Import Products'),
+    ]
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    params = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Queued jobs become eligible at run_after (retries are pushed back with a backoff)
+    run_after = models.DateTimeField()
+    # Worker that claimed the job; locked_at doubles as a heartbeat, refreshed on progress
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Path relative to JOB_RESULT_DIR of a downloadable file produced by the job
+    result_file = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
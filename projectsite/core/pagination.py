@@ -0,0 +1,10 @@
+# core/pagination.py
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CursorPage(CursorPagination):
+    """Stable pages over a changing table: newest first, ?cursor= to continue"""
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
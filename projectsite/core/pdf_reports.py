@@ -0,0 +1,340 @@
+# core/pdf_reports.py
+"""
+PDF export of the inventory and profit & loss reports.
+
+Documents are built page by page. Rows are read from the database in
+chunks of REPORT_ITERATOR_CHUNK_SIZE and laid out as tables of
+PDF_ROWS_PER_TABLE rows (about a page each; a table that runs past the
+bottom of a page is split and repeats its header). The document template
+is fed from a generator, so only a handful of tables exist at any time
+however many rows the report has. Totals come from database aggregates
+rather than from the rows.
+
+render_pdf_report() writes one report to a path or binary stream;
+render_pdf_batch() renders several in a pool of worker processes, e.g.
+for the month-end run of `manage.py export_pdf_reports`.
+"""
+import time as clock
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from .formatting import format_money
+from .models import Product, PurchaseOrder
+from .projections import product_rows
+from .stock import StockManager
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+PDF_REPORT_TYPES = ('inventory', 'profit_loss')
+
+
+def month_range(month=None, now=None):
+    """
+    Local-time bounds of a month
+
+    Args:
+        month: 'YYYY-MM', or None for the current month
+
+    Returns:
+        tuple: (start, end, label) with `end` the first instant of the next month
+    """
+    if month:
+        try:
+            year, number = (int(part) for part in month.split('-'))
+            first = date(year, number, 1)
+        except ValueError:
+            raise ValueError(f"Invalid month '{month}', expected YYYY-MM")
+    else:
+        first = timezone.localdate(now).replace(day=1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(following, time.min))
+    return start, end, first.strftime('%B %Y')
+
+
+def pdf_filename(report_type, month=None):
+    """Inventory is a snapshot named by date; profit & loss is named by the month it covers"""
+    if report_type == 'profit_loss':
+        return f"report_profit_loss_{month_range(month)[0].strftime('%Y%m')}.pdf"
+    return f"report_{report_type}_{timezone.localdate().strftime('%Y%m%d')}.pdf"
+
+
+def _money(value):
+    return format_money(value or Decimal('0.00'))
+
+
+def _clip(text, length):
+    text = text or ''
+    return text if len(text) <= length else text[:length - 1] + '…'
+
+
+# ========================================
+#           REPORT DEFINITIONS
+# ========================================
+# Each definition returns the document's title, summary lines and sections;
+# a section's rows are a lazy iterable over a chunked queryset.
+def _inventory_report(month=None):
+    chunk_size = settings.REPORT_ITERATOR_CHUNK_SIZE
+    totals = Product.objects.aggregate(
+        products=Count('id'),
+        units=Sum('quantity'),
+        value=Sum(F('quantity') * F('unit_price')),
+        low_stock=Count('id', filter=Q(quantity__lt=F('reorder_level'))),
+        out_of_stock=Count('id', filter=Q(quantity=0)),
+    )
+    products = product_rows().order_by('code').iterator(chunk_size=chunk_size)
+    suggestions = StockManager.suggest_reorders()
+    return {
+        'title': 'Inventory Status Report',
+        'subtitle': f"Stock on hand as of {timezone.localtime().strftime('%B %d, %Y %H:%M')}",
+        'pagesize': landscape(A4),
+        'summary': [
+            ('Products', f"{totals['products']:,}"),
+            ('Units in stock', f"{totals['units'] or 0:,}"),
+            ('Inventory value', f"P{_money(totals['value'])}"),
+            ('Below reorder level', f"{totals['low_stock']:,}"),
+            ('Out of stock', f"{totals['out_of_stock']:,}"),
+        ],
+        'sections': [
+            {
+                'heading': 'Stock Levels',
+                'columns': ['Code', 'Product', 'Category', 'Supplier', 'Qty', 'Reorder', 'Unit Price', 'Value'],
+                'widths': [28 * mm, 72 * mm, 40 * mm, 45 * mm, 16 * mm, 18 * mm, 24 * mm, 26 * mm],
+                'numeric_from': 4,
+                'rows': (
+                    [p.code, _clip(p.name, 44), _clip(p.category_name, 24), _clip(p.supplier_name, 28),
+                     f"{p.quantity:,}", f"{p.reorder_level:,}", _money(p.unit_price), _money(p.quantity * p.unit_price)]
+                    for p in products
+                ),
+            },
+            {
+                'heading': 'Reorder Suggestions',
+                'columns': ['Code', 'Product', 'Supplier', 'Qty', 'Reorder', 'Reserved', 'Per Day', 'Order'],
+                'widths': [28 * mm, 80 * mm, 55 * mm, 18 * mm, 18 * mm, 20 * mm, 20 * mm, 20 * mm],
+                'numeric_from': 3,
+                'rows': (
+                    [s['product'].code, _clip(s['product'].name, 48),
+                     _clip(s['product'].supplier.name if s['product'].supplier else '', 34),
+                     f"{s['quantity']:,}", f"{s['reorder_level']:,}", f"{s['reserved']:,}",
+                     f"{s['daily_velocity']:,.2f}", f"{s['suggested']:,}"]
+                    for s in suggestions
+                ),
+            },
+        ],
+    }
+
+
+def _profit_loss_report(month=None):
+    start, end, label = month_range(month)
+    purchases = PurchaseOrder.objects.filter(created_at__gte=start, created_at__lt=end)
+    totals = purchases.aggregate(
+        orders=Count('id'),
+        subtotal=Sum('total_subtotal'),
+        tax=Sum('total_tax'),
+        amount=Sum('total_amount'),
+    )
+    rows = purchases.only(
+        'id', 'po_number', 'created_at', 'total_subtotal', 'total_tax', 'total_amount', 'received',
+    ).order_by('created_at', 'id').iterator(chunk_size=settings.REPORT_ITERATOR_CHUNK_SIZE)
+    return {
+        'title': f'Profit & Loss Summary - {label}',
+        'subtitle': f"Purchase orders created {start.strftime('%B %d')} to {(end - timedelta(days=1)).strftime('%B %d, %Y')}",
+        'pagesize': A4,
+        'summary': [
+            ('Orders', f"{totals['orders']:,}"),
+            ('Total subtotal', f"P{_money(totals['subtotal'])}"),
+            ('Total tax', f"P{_money(totals['tax'])}"),
+            ('Total amount', f"P{_money(totals['amount'])}"),
+        ],
+        'sections': [
+            {
+                'heading': 'Monthly Transactions',
+                'columns': ['PO Number', 'Date', 'Subtotal', 'Tax', 'Total', 'Status'],
+                'widths': [38 * mm, 28 * mm, 30 * mm, 26 * mm, 30 * mm, 22 * mm],
+                'numeric_from': 2,
+                'rows': (
+                    [p.po_number, timezone.localtime(p.created_at).strftime('%b %d, %Y'), _money(p.total_subtotal),
+                     _money(p.total_tax), _money(p.total_amount), 'Received' if p.received else 'Pending']
+                    for p in rows
+                ),
+            },
+        ],
+    }
+
+
+REPORTS = {
+    'inventory': _inventory_report,
+    'profit_loss': _profit_loss_report,
+}
+
+
+# ========================================
+#             DOCUMENT BUILDING
+# ========================================
+class _FlowableFeed(list):
+    """
+    The flowable list a doc template drains from the front, topped up from a
+    generator whenever the template checks its length. Tables are created
+    just before they are laid out and dropped once drawn.
+    """
+
+    def __init__(self, source, window=4):
+        super().__init__()
+        self.source = source
+        self.window = window
+
+    def __len__(self):
+        while super().__len__() < self.window:
+            flowable = next(self.source, None)
+            if flowable is None:
+                break
+            self.append(flowable)
+        return super().__len__()
+
+
+def _table(columns, rows, widths, numeric_from):
+    style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e9ecef')),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#adb5bd')),
+        ('ALIGN', (numeric_from, 0), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ])
+    return Table([columns] + rows, colWidths=widths, repeatRows=1, style=style)
+
+
+def _flowables(report, counter):
+    """Yield the document's flowables, reading each section's rows one table at a time"""
+    styles = getSampleStyleSheet()
+    rows_per_table = settings.PDF_ROWS_PER_TABLE
+    yield Paragraph(report['title'], styles['Title'])
+    yield Paragraph(report['subtitle'], styles['Normal'])
+    yield Spacer(1, 4 * mm)
+    yield Table(report['summary'], hAlign='LEFT', style=TableStyle([
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ]))
+
+    for section in report['sections']:
+        yield Spacer(1, 6 * mm)
+        yield Paragraph(section['heading'], styles['Heading2'])
+        batch = []
+        written = 0
+        for row in section['rows']:
+            batch.append(row)
+            if len(batch) == rows_per_table:
+                yield _table(section['columns'], batch, section['widths'], section['numeric_from'])
+                written += len(batch)
+                batch = []
+        if batch:
+            yield _table(section['columns'], batch, section['widths'], section['numeric_from'])
+            written += len(batch)
+        if not written:
+            yield Paragraph('No rows.', styles['Italic'])
+        counter['rows'] += written
+
+
+def _footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 7)
+    canvas.drawString(doc.leftMargin, 8 * mm, f"Generated {doc.generated_at}")
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 8 * mm, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def render_pdf_report(report_type, output, month=None):
+    """
+    Write a report as a PDF
+
+    Args:
+        report_type: One of PDF_REPORT_TYPES
+        output: File path or binary stream to write to
+        month: 'YYYY-MM' covered by the profit & loss report (default: current month)
+
+    Returns:
+        dict: rows and pages written
+    """
+    if not PDF_AVAILABLE:
+        raise RuntimeError('PDF export requires reportlab')
+    if report_type not in REPORTS:
+        raise ValueError(f'Unknown report: {report_type}')
+
+    report = REPORTS[report_type](month)
+    doc = SimpleDocTemplate(
+        str(output) if isinstance(output, Path) else output,
+        pagesize=report['pagesize'],
+        title=report['title'],
+        leftMargin=12 * mm, rightMargin=12 * mm, topMargin=12 * mm, bottomMargin=14 * mm,
+    )
+    doc.generated_at = timezone.localtime().strftime('%Y-%m-%d %H:%M')
+    counter = {'rows': 0}
+    doc.build(_FlowableFeed(_flowables(report, counter)), onFirstPage=_footer, onLaterPages=_footer)
+    return {'rows': counter['rows'], 'pages': doc.page}
+
+
+def _render_task(task):
+    report_type, month, path = task
+    started = clock.monotonic()
+    try:
+        written = render_pdf_report(report_type, path, month=month)
+    except Exception as e:
+        return {'status': 'error', 'report': report_type, 'month': month, 'error': str(e),
+                'timestamp': timezone.now().isoformat()}
+    return {
+        'status': 'success',
+        'report': report_type,
+        'month': month,
+        'path': path,
+        'rows': written['rows'],
+        'pages': written['pages'],
+        'seconds': round(clock.monotonic() - started, 2),
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def _init_worker():
+    # A no-op when forked from a configured process; sets Django up under spawn
+    import django
+    django.setup()
+
+
+def render_pdf_batch(reports, output_dir, workers=None):
+    """
+    Render several reports in parallel, one worker process per report
+
+    Args:
+        reports: Iterable of (report_type, month) pairs
+        output_dir: Directory the PDFs are written to (named by pdf_filename())
+        workers: Pool size (default: PDF_WORKERS)
+
+    Returns:
+        list: One result dict per report, in the order given
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(report_type, month, str(output_dir / pdf_filename(report_type, month))) for report_type, month in reports]
+    workers = max(1, min(workers or settings.PDF_WORKERS, len(tasks)))
+    if workers == 1:
+        return [_render_task(task) for task in tasks]
+
+    # Children must not share the parent's database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_render_task, tasks))
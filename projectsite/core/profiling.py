@@ -0,0 +1,124 @@
+# core/profiling.py
+"""
+Template render profiler.
+
+With TEMPLATE_PROFILING on, TemplateProfilerMiddleware collects a
+RenderProfile per request: how long every template took to render
+(inclusive of what it extends and includes) and how long every tag and
+variable took on its own (excluding nested nodes). The slowest entries are
+logged to the 'core.profiling' logger and the total is sent back as a
+Server-Timing header, which browser dev tools show next to the request.
+`manage.py profile_templates` prints the same report for a list of URLs.
+
+Timing works by wrapping Template._render and Node.render_annotated once,
+when the middleware is loaded; the wrappers call straight through when no
+profile is active, so requests outside the middleware pay one ContextVar
+lookup per node.
+"""
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from django.template.base import Node, Template, TokenType
+
+_PROFILE = ContextVar('template_profile', default=None)
+_installed = False
+
+
+class RenderProfile:
+    """Render timings of one request, keyed by template name and by tag/variable + location"""
+
+    def __init__(self):
+        # key -> [calls, inclusive seconds, self seconds]
+        self.templates = defaultdict(lambda: [0, 0.0, 0.0])
+        self.nodes = defaultdict(lambda: [0, 0.0, 0.0])
+        self.total = 0.0
+        # Time spent in nested frames, one slot per open template/node
+        self._children = []
+
+    def measure(self, table, key, render, *args):
+        self._children.append(0.0)
+        started = time.perf_counter()
+        try:
+            return render(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self._children.pop()
+            stats = table[key]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += elapsed - nested
+            if self._children:
+                self._children[-1] += elapsed
+            else:
+                self.total += elapsed
+
+    def slowest_templates(self, limit=10):
+        """[(template, calls, inclusive seconds)], slowest first"""
+        rows = sorted(self.templates.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(key, calls, total) for key, (calls, total, _) in rows]
+
+    def slowest_nodes(self, limit=10):
+        """[(tag or variable and location, calls, self seconds)], slowest first"""
+        rows = sorted(self.nodes.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [(key, calls, own) for key, (calls, _, own) in rows]
+
+    def report(self, title='', limit=10):
+        """Multi-line text summary of the slowest templates and tags"""
+        lines = [f"{title} - templates rendered in {self.total * 1000:.1f} ms".strip(' -')]
+        lines.append('  slowest templates (inclusive):')
+        for key, calls, seconds in self.slowest_templates(limit):
+            lines.append(f"    {seconds * 1000:8.2f} ms  x{calls:<5} {key}")
+        lines.append('  slowest tags and variables (self):')
+        for key, calls, seconds in self.slowest_nodes(limit):
+            lines.append(f"    {seconds * 1000:8.2f} ms  x{calls:<5} {key}")
+        return '\n'.join(lines)
+
+
+def _template_label(template):
+    return getattr(template.origin, 'template_name', None) or template.name or '<string>'
+
+
+def _node_label(node):
+    token = getattr(node, 'token', None)
+    origin = getattr(node, 'origin', None)
+    where = f"{getattr(origin, 'template_name', None) or '<string>'}:{token.lineno if token else '?'}"
+    if token is None:
+        return f"{type(node).__name__} {where}"
+    if token.token_type == TokenType.VAR:
+        return f"{{{{ {token.contents[:40]} }}}} {where}"
+    return f"{{% {token.contents.split()[0]} %}} {where}"
+
+
+def install_template_profiler():
+    """Wrap template and node rendering with timers (idempotent)"""
+    global _installed
+    if _installed:
+        return
+    render_template = Template._render
+    render_node = Node.render_annotated
+
+    def _render(self, context):
+        profile = _PROFILE.get()
+        if profile is None:
+            return render_template(self, context)
+        return profile.measure(profile.templates, _template_label(self), render_template, self, context)
+
+    def render_annotated(self, context):
+        profile = _PROFILE.get()
+        if profile is None:
+            return render_node(self, context)
+        return profile.measure(profile.nodes, _node_label(self), render_node, self, context)
+
+    Template._render = _render
+    Node.render_annotated = render_annotated
+    _installed = True
+
+
+def start_profile():
+    """Begin collecting a RenderProfile for the current request; returns (profile, token for stop_profile)"""
+    profile = RenderProfile()
+    return profile, _PROFILE.set(profile)
+
+
+def stop_profile(token):
+    _PROFILE.reset(token)
@@ -0,0 +1,49 @@
+# core/projections.py
+"""
+Querysets shaped for the list and detail pages.
+
+Each projection loads only the columns its template shows, and brings in
+related names as flat display columns (e.g. `category_name`) joined in
+the same query or prefetched once. A page then costs a fixed number of
+queries however many rows it shows; core/tests.py holds them to it.
+"""
+from django.db.models import F, Prefetch
+from .models import Category, Product, PurchaseItem, PurchaseOrder, Supplier
+
+
+def name_choices(model):
+    """id/name pairs for filter dropdowns"""
+    return model.objects.only('id', 'name').order_by('name')
+
+
+def category_rows(queryset=None):
+    queryset = Category.objects.all() if queryset is None else queryset
+    return queryset.only('id', 'name')
+
+
+def supplier_rows(queryset=None):
+    queryset = Supplier.objects.all() if queryset is None else queryset
+    return queryset.only('id', 'name', 'contact_person', 'phone', 'address')
+
+
+def product_rows(queryset=None):
+    """Products with category_name/supplier_name joined in"""
+    queryset = Product.objects.all() if queryset is None else queryset
+    return queryset.annotate(
+        category_name=F('category__name'),
+        supplier_name=F('supplier__name'),
+    ).only('id', 'code', 'name', 'quantity', 'unit_price', 'reorder_level')
+
+
+def purchase_rows(queryset=None):
+    queryset = PurchaseOrder.objects.all() if queryset is None else queryset
+    return queryset.only('id', 'po_number', 'date', 'received', 'total_amount')
+
+
+def purchase_detail(queryset=None):
+    """Orders with their items (and each item's product_name) prefetched in one extra query"""
+    queryset = PurchaseOrder.objects.all() if queryset is None else queryset
+    items = PurchaseItem.objects.annotate(product_name=F('product__name')).only(
+        'id', 'purchase_order_id', 'quantity', 'unit_cost',
+    ).order_by('id')
+    return queryset.prefetch_related(Prefetch('items', queryset=items))
@@ -0,0 +1,146 @@
+# core/read_events.py
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class ReadEventBuffer:
+    """Aggregate read-only page views in memory and flush them as summary audit rows.
+
+    Views are counted per (user, page, hour) and written by a timer
+    READ_EVENT_FLUSH_SECONDS after the first one (and at exit), never by the
+    request being counted, so rendering a report does not take the write
+    lock. Each (user, page, hour) has one row, dated at the start of the
+    hour with its count in `changes`, and a unique constraint keeps it
+    that way; a flush adds to it, so every process feeds the same row. A
+    flush that loses the race to create a row retries once and adds to the
+    winner's; a failed flush keeps its counts for the next one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._timer = None
+
+    def record(self, user, page, label):
+        """Count one view of `page` by `user`; `label` is the human-readable page name"""
+        user_id = getattr(user, 'pk', None) if getattr(user, 'is_authenticated', False) else None
+        username = getattr(user, 'username', 'Anonymous') if user_id else 'Anonymous'
+        hour = timezone.localtime().replace(minute=0, second=0, microsecond=0)
+        key = (user_id, username, page, label, hour)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._schedule()
+
+    def _schedule(self):
+        """Start the flush timer unless one is pending; call with the lock held"""
+        if self._timer is None:
+            self._timer = threading.Timer(settings.READ_EVENT_FLUSH_SECONDS, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Add pending counts to the AuditLog row of each (user, page, hour); returns how many rows were written"""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not counts:
+            return 0
+        try:
+            try:
+                self._write(counts)
+            except IntegrityError:
+                # Another process created one of the rows first (auditlog_read_event_bucket); add to it instead
+                self._write(counts)
+        except Exception:
+            # Auditing should not break the main flow; keep the counts for the next flush
+            logger.exception('Could not write %d read event summaries; keeping them queued', len(counts))
+            with self._lock:
+                for key, count in counts.items():
+                    self._counts[key] = self._counts.get(key, 0) + count
+                self._schedule()
+            return 0
+        return len(counts)
+
+    @staticmethod
+    def _write(counts):
+        with transaction.atomic():
+            existing = {
+                (row.user_id, row.target, row.created_at): row
+                for row in AuditLog.objects.select_for_update().filter(
+                    action='view_reports',
+                    target__in={key[2] for key in counts},
+                    created_at__in={key[4] for key in counts},
+                )
+            }
+            new, updated = [], []
+            now = timezone.now()
+            for (user_id, username, page, label, hour), count in counts.items():
+                row = existing.get((user_id, page, hour))
+                previous = row.changes[0]['new'] if row and row.changes else 0
+                period = f"{hour:%Y-%m-%d %H:00}-{(hour + timedelta(hours=1)):%H:00}"
+                detail = f"User '{username}' viewed the {label} {previous + count} time(s) during {period}"
+                changes = [{'field': 'views', 'old': previous, 'new': previous + count}]
+                if row:
+                    row.detail, row.changes, row.updated_at = detail, changes, now
+                    updated.append(row)
+                else:
+                    new.append(AuditLog(
+                        user_id=user_id,
+                        action='view_reports',
+                        target=page,
+                        target_model='',
+                        detail=detail,
+                        changes=changes,
+                        created_at=hour,
+                    ))
+            AuditLog.objects.bulk_update(updated, ['detail', 'changes', 'updated_at'])
+            AuditLog.objects.bulk_create(new)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's own connection
+            connections.close_all()
+
+
+read_events = ReadEventBuffer()
+
+
+def track_read_event(request, page, label):
+    """Record that the current user viewed a read-only page.
+
+    READ_EVENT_TRACKING selects the mode:
+      'aggregate' - count in memory, flush summaries periodically (default)
+      'immediate' - write one AuditLog row per view
+      'off'       - do not record views
+    """
+    mode = settings.READ_EVENT_TRACKING
+    user = getattr(request, 'user', None)
+    if mode == 'aggregate':
+        read_events.record(user, page, label)
+    elif mode == 'immediate':
+        try:
+            uname = getattr(user, 'username', 'Anonymous') if user and getattr(user, 'is_authenticated', False) else 'Anonymous'
+            AuditLog.objects.create(
+                user=user,
+                action='view_reports',
+                target=page,
+                detail=f"User '{uname}' viewed the {label}"
+            )
+        except Exception:
+            pass
+
+
+# Do not lose buffered counts when the worker process exits
+atexit.register(read_events.flush)
@@ -0,0 +1,159 @@
+# core/report_cache.py
+"""
+Pre-rendered report cache.
+
+Each report is built into its summary context plus the rendered HTML
+fragment of its data section, and stored in the cache stamped with the data version of
+the tables it reads. Committed saves and deletes of those tables replace
+the version stamp (see core/signals.py), so views serve the warm copy while
+it is still valid and rebuild it otherwise. `manage.py warm_report_cache`
+builds every report and period ahead of business hours.
+"""
+import time
+import uuid
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from .db_routers import read_from_primary
+from .reports import REPORT_PERIODS, dashboard_context, fast_moving_context, inventory_context
+
+# Tables grouped by what a report depends on; a write to any of them invalidates the scope
+DATA_SCOPES = {
+    'products': ('core.product', 'core.category', 'core.supplier'),
+    'purchases': ('core.purchaseorder', 'core.purchaseitem'),
+}
+MODEL_SCOPES = {label: scope for scope, labels in DATA_SCOPES.items() for label in labels}
+
+# name -> (context builder, fragment template, data scopes, periods)
+REPORTS = {
+    'dashboard': (dashboard_context, 'reports/fragments/dashboard.html', ('products', 'purchases'), ('all',)),
+    # Reorder suggestions on the inventory report follow sales velocity, hence 'purchases'
+    'inventory': (inventory_context, 'reports/fragments/inventory.html', ('products', 'purchases'), ('all',)),
+    'fast_moving': (fast_moving_context, 'reports/fragments/fast_moving.html', ('products', 'purchases'), ('all', *REPORT_PERIODS)),
+}
+
+
+class ReportCache:
+    """Build, store and serve pre-rendered reports"""
+
+    @staticmethod
+    def _version_key(scope):
+        return f'report:version:{scope}'
+
+    @staticmethod
+    def _entry_key(name, period, now=None):
+        # Periods are relative to the local date, so entries never outlive the day they were built
+        return f'report:{name}:{period}:{timezone.localdate(now).isoformat()}'
+
+    @staticmethod
+    def data_version(scopes):
+        """Current stamp of `scopes`; a scope with no stamp yet gets a fresh one"""
+        keys = [ReportCache._version_key(scope) for scope in scopes]
+        stamps = cache.get_many(keys)
+        for key in keys:
+            if key not in stamps:
+                # add() keeps whichever stamp another process stored first
+                cache.add(key, uuid.uuid4().hex, timeout=None)
+                stamps[key] = cache.get(key)
+        return ':'.join(str(stamps[key]) for key in keys)
+
+    @staticmethod
+    def bump(*scopes):
+        """Invalidate every report that reads `scopes` (all scopes if none are given)"""
+        # A new random stamp, not an increment: two racing bumps can never produce the same value
+        cache.set_many({ReportCache._version_key(scope): uuid.uuid4().hex for scope in scopes or DATA_SCOPES}, timeout=None)
+
+    @staticmethod
+    def build(name, period='all', now=None):
+        """Compute and store one report; returns the cache entry"""
+        builder, template, scopes, _ = REPORTS[name]
+        now = now or timezone.now()
+        # Read the stamp first: a write committed during the build leaves the entry already stale
+        version = ReportCache.data_version(scopes)
+        started = time.monotonic()
+        # Stamps follow writes on the primary, so a lagging replica must not feed the cache
+        with read_from_primary():
+            context = builder(period, now)
+            html = render_to_string(template, context)
+        entry = {
+            'version': version,
+            # Row lists only feed the fragment; caching them would make every hit unpickle model instances
+            'context': {key: value for key, value in context.items() if not isinstance(value, (list, tuple))},
+            'html': str(html),
+            'built_at': now,
+            'build_seconds': round(time.monotonic() - started, 3),
+        }
+        cache.set(ReportCache._entry_key(name, period, now), entry, settings.REPORT_CACHE_SECONDS)
+        return entry
+
+    @staticmethod
+    def get(name, period='all'):
+        """
+        Return a report's cache entry, rebuilding it if missing or stale
+
+        Returns:
+            dict: {version, context, html, built_at, build_seconds, cached}
+        """
+        _, _, scopes, periods = REPORTS[name]
+        if period not in periods:
+            period = 'all'
+        entry = cache.get(ReportCache._entry_key(name, period))
+        cached = entry is not None and entry['version'] == ReportCache.data_version(scopes)
+        if not cached:
+            entry = ReportCache.build(name, period)
+        entry['html'] = mark_safe(entry['html'])
+        entry['cached'] = cached
+        return entry
+
+    @staticmethod
+    async def aget(name, period='all'):
+        """Async get(): a warm entry is served without leaving the event loop's task; a rebuild runs in a thread"""
+        _, _, scopes, periods = REPORTS[name]
+        if period not in periods:
+            period = 'all'
+        entry = await cache.aget(ReportCache._entry_key(name, period))
+        cached = False
+        if entry is not None:
+            keys = [ReportCache._version_key(scope) for scope in scopes]
+            stamps = await cache.aget_many(keys)
+            # A missing stamp has to be created race-free; leave that to the sync path
+            cached = len(stamps) == len(keys) and entry['version'] == ':'.join(str(stamps[key]) for key in keys)
+        if not cached:
+            return await sync_to_async(ReportCache.get)(name, period)
+        entry['html'] = mark_safe(entry['html'])
+        entry['cached'] = True
+        return entry
+
+    @staticmethod
+    def warm(names=None, periods=None, force=False):
+        """Build `names` (default: all reports) for each of their periods; returns one result per entry"""
+        results = []
+        for name in names or REPORTS:
+            _, _, scopes, report_periods = REPORTS[name]
+            for period in report_periods:
+                if periods and period not in periods:
+                    continue
+                try:
+                    entry = cache.get(ReportCache._entry_key(name, period))
+                    if not force and entry is not None and entry['version'] == ReportCache.data_version(scopes):
+                        results.append({'status': 'success', 'report': name, 'period': period, 'built': False,
+                                        'build_seconds': 0, 'timestamp': timezone.now().isoformat()})
+                        continue
+                    entry = ReportCache.build(name, period)
+                    results.append({'status': 'success', 'report': name, 'period': period, 'built': True,
+                                    'build_seconds': entry['build_seconds'], 'timestamp': timezone.now().isoformat()})
+                except Exception as e:
+                    results.append({'status': 'error', 'report': name, 'period': period,
+                                    'error': str(e), 'timestamp': timezone.now().isoformat()})
+        return results
+
+
+def invalidate_reports(sender, **kwargs):
+    """post_save/post_delete receiver: drop cached reports once the write commits"""
+    scope = MODEL_SCOPES.get(sender._meta.label_lower)
+    if scope:
+        transaction.on_commit(lambda: ReportCache.bump(scope), using=kwargs.get('using'))
@@ -0,0 +1,218 @@
+# core/reports.py
+import csv
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .formatting import money_columns
+from .models import Product, PurchaseOrder
+from .stock import StockManager
+
+try:
+    from openpyxl import Workbook
+    EXCEL_AVAILABLE = True
+except ImportError:
+    EXCEL_AVAILABLE = False
+
+# Periods the dashboard summarises and the fast-moving report can be filtered by
+REPORT_PERIODS = ('today', 'week', 'month', 'year')
+
+
+def period_start(period, now=None):
+    """Local midnight at the start of `period`, or None for all time"""
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'today':
+        return today
+    if period == 'week':
+        return today - timedelta(days=today.weekday())
+    if period == 'month':
+        return today.replace(day=1)
+    if period == 'year':
+        return today.replace(month=1, day=1)
+    return None
+
+
+# ========================================
+#        REPORT CONTEXT BUILDERS
+# ========================================
+# Each builder takes (period, now) and returns the context of the report's
+# HTML fragment; ReportCache stores both (see core/report_cache.py).
+def dashboard_context(period=None, now=None):
+    """Purchase summaries for every REPORT_PERIOD plus inventory totals"""
+    starts = {name: period_start(name, now) for name in REPORT_PERIODS}
+    # One conditional aggregate instead of three queries per period
+    aggregates = {}
+    for name, start in starts.items():
+        in_period = Q(created_at__gte=start)
+        aggregates[f'{name}_purchases'] = Count('id', filter=in_period)
+        aggregates[f'{name}_amount'] = Sum('total_amount', filter=in_period)
+        aggregates[f'{name}_tax'] = Sum('total_tax', filter=in_period)
+    totals = PurchaseOrder.objects.filter(created_at__gte=min(starts.values())).aggregate(**aggregates)
+
+    labels = {'today': 'daily', 'week': 'weekly', 'month': 'monthly', 'year': 'yearly'}
+    context = {
+        f'{labels[name]}_summary': {
+            'purchases': totals[f'{name}_purchases'],
+            'amount': totals[f'{name}_amount'] or Decimal('0.00'),
+            'tax': totals[f'{name}_tax'] or Decimal('0.00'),
+        }
+        for name in REPORT_PERIODS
+    }
+
+    inventory = Product.objects.aggregate(
+        total_products=Count('id'),
+        total_collected=Sum('quantity'),
+        total_value=Sum(F('quantity') * F('unit_price')),
+        low_stock=Count('id', filter=Q(quantity__lt=F('reorder_level'))),
+        out_of_stock=Count('id', filter=Q(quantity=0)),
+    )
+    context['inventory_summary'] = {
+        'total_products': inventory['total_products'],
+        'total_collected': inventory['total_collected'] or 0,
+        'total_value': (inventory['total_value'] or Decimal('0.00')).quantize(Decimal('0.01')),
+        'low_stock': inventory['low_stock'],
+        'out_of_stock': inventory['out_of_stock'],
+    }
+    return context
+
+
+def inventory_context(period=None, now=None):
+    """Stock levels of every product plus reorder suggestions; the counts come from the same pass over the rows"""
+    products = []
+    total_value = 0
+    low_stock_count = out_of_stock_count = 0
+    queryset = Product.objects.select_related('category', 'supplier')
+    for p in queryset.iterator(chunk_size=settings.REPORT_ITERATOR_CHUNK_SIZE):
+        products.append(p)
+        total_value += p.quantity * p.unit_price
+        if p.is_low_stock:
+            low_stock_count += 1
+        if p.quantity == 0:
+            out_of_stock_count += 1
+
+    money_columns(products, unit_price_display='unit_price', value_display=lambda p: p.quantity * p.unit_price)
+    return {
+        'products': products,
+        'total_value': total_value,
+        'low_stock_count': low_stock_count,
+        'out_of_stock_count': out_of_stock_count,
+        'reorder_suggestions': StockManager.suggest_reorders(now=now),
+    }
+
+
+def fast_moving_context(period=None, now=None):
+    """Top and bottom ten products by quantity purchased, optionally within one period"""
+    start = period_start(period, now)
+    in_period = {'filter': Q(purchaseitem__purchase_order__created_at__gte=start)} if start else {}
+    products = Product.objects.select_related('category').annotate(
+        purchase_count=Count('purchaseitem', **in_period),
+        # Coalesce so products never purchased sort last on every database
+        total_quantity_sold=Coalesce(Sum('purchaseitem__quantity', **in_period), Value(0)),
+    ).order_by('-total_quantity_sold', 'id')
+
+    return {
+        'fast_moving': list(products[:10]),
+        'slow_moving': list(products.reverse()[:10]),
+    }
+
+
+def month_purchases(now=None):
+    """Purchase orders created since the start of the current month"""
+    now = now or timezone.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return PurchaseOrder.objects.filter(created_at__gte=month_start)
+
+
+# Totals of the profit & loss report, read with one aggregate (or aaggregate)
+PROFIT_LOSS_TOTALS = {
+    'total_purchases': Sum('total_amount'),
+    'total_tax': Sum('total_tax'),
+    'total_subtotal': Sum('total_subtotal'),
+}
+
+
+def profit_loss_context(purchases, totals, now):
+    """Context of the profit & loss report from its rows and PROFIT_LOSS_TOTALS"""
+    return {
+        'purchases': money_columns(
+            purchases,
+            total_subtotal_display='total_subtotal', total_tax_display='total_tax', total_amount_display='total_amount',
+        ),
+        **{name: value or Decimal('0.00') for name, value in totals.items()},
+        'month': now.strftime('%B %Y'),
+    }
+
+
+# ========================================
+#               EXPORTS
+# ========================================
+INVENTORY_COLUMNS = ['Product Code', 'Product Name', 'Category', 'Supplier', 'Quantity', 'Unit Price', 'Total Value']
+
+
+def export_products():
+    return Product.objects.select_related('category', 'supplier').order_by('code')
+
+
+def inventory_row(p):
+    return [p.code, p.name, p.category.name, p.supplier.name if p.supplier else '',
+            p.quantity, p.unit_price, p.quantity * p.unit_price]
+
+
+class _Line:
+    """File-like object whose write() hands back the line, so csv.writer formats one row at a time"""
+
+    def write(self, value):
+        return value
+
+
+def csv_writer():
+    """csv.writer whose writerow() returns the formatted line instead of writing it"""
+    return csv.writer(_Line())
+
+
+def report_filename(report_type, extension='xlsx'):
+    return f"report_{report_type}_{timezone.now().strftime('%Y%m%d')}.{extension}"
+
+
+def write_report_workbook(report_type, path, progress=None):
+    """
+    Write a report as an .xlsx file
+
+    Rows are streamed from the database in chunks into a write-only workbook,
+    so memory stays flat however many products there are.
+
+    Args:
+        report_type: Report to export ('inventory')
+        path: File path or binary stream to write to
+        progress: Optional callable(rows_done, rows_total)
+
+    Returns:
+        int: Number of data rows written
+    """
+    wb = Workbook(write_only=True)
+    rows = 0
+
+    if report_type == 'inventory':
+        ws = wb.create_sheet("Inventory Report")
+        ws.append(INVENTORY_COLUMNS)
+
+        products = export_products()
+        chunk_size = settings.REPORT_ITERATOR_CHUNK_SIZE
+        total = products.count() if progress else 0
+        for p in products.iterator(chunk_size=chunk_size):
+            row = inventory_row(p)
+            # Numbers, not text cells, in the sheet
+            row[5:] = [float(value) for value in row[5:]]
+            ws.append(row)
+            rows += 1
+            if progress and rows % chunk_size == 0:
+                progress(rows, total)
+    else:
+        wb.create_sheet("Report")
+
+    wb.save(path)
+    if progress:
+        progress(rows, rows)
+    return rows
@@ -0,0 +1,148 @@
+# core/roles.py
+"""
+Role resolution for permission checks.
+
+Every page checks the user's role, and reading `request.user.user_role`
+costs a UserRole query per request (more when a page checks twice). Roles
+change rarely, so RoleCache keeps each user's role in the shared cache,
+and on the user object for the rest of the request. A committed save or
+delete of a UserRole drops the entry (see core/signals.py), as does a
+backup restore; ROLE_CACHE_SECONDS bounds anything else.
+
+Views check roles with `role_required` (function views, sync or async) or
+`RoleRequiredMixin` (class-based views); templates get the role as `role`
+from the `role` context processor.
+"""
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
+from .models import UserRole
+
+ROLE_LABELS = dict(UserRole.ROLE_CHOICES)
+NO_ROLE_MESSAGE = 'User role not assigned.'
+INVENTORY_REPORT_DENIED = 'You do not have permission to view inventory reports. Only Admin and Inventory Clerk can access this.'
+FINANCIAL_REPORT_DENIED = 'You do not have permission to view this report. Only Administrators can access Financial & Analytics reports.'
+# Stored for users without a role, so they are cached too
+_NO_ROLE = ''
+
+
+class RoleCache:
+    """Look up and invalidate cached user roles"""
+
+    @staticmethod
+    def _key(user_id):
+        return f'role:{user_id}'
+
+    @staticmethod
+    def _known(user):
+        """The role already looked up for `user` this request, or None"""
+        if not getattr(user, 'is_authenticated', False):
+            return _NO_ROLE
+        # Not user.user_role: an instance can hold a stale related object
+        return getattr(user, '_role', None)
+
+    @staticmethod
+    def get(user):
+        """Role name of `user` ('admin', 'cashier', ...), or None if no role is assigned"""
+        role = RoleCache._known(user)
+        if role is None:
+            key = RoleCache._key(user.pk)
+            role = cache.get(key)
+            if role is None:
+                role = UserRole.objects.filter(user_id=user.pk).values_list('role', flat=True).first() or _NO_ROLE
+                cache.set(key, role, settings.ROLE_CACHE_SECONDS)
+            user._role = role
+        return role or None
+
+    @staticmethod
+    async def aget(user):
+        """Async get()"""
+        role = RoleCache._known(user)
+        if role is None:
+            key = RoleCache._key(user.pk)
+            role = await cache.aget(key)
+            if role is None:
+                role = await UserRole.objects.filter(user_id=user.pk).values_list('role', flat=True).afirst() or _NO_ROLE
+                await cache.aset(key, role, settings.ROLE_CACHE_SECONDS)
+            user._role = role
+        return role or None
+
+    @staticmethod
+    def invalidate(*user_ids):
+        """Forget the cached roles of `user_ids`"""
+        cache.delete_many([RoleCache._key(user_id) for user_id in user_ids])
+
+
+def has_role(user, *roles):
+    return RoleCache.get(user) in roles
+
+
+def _deny(request, role, message, json):
+    if role is None:
+        message = NO_ROLE_MESSAGE
+    if json:
+        return JsonResponse({'error': message.rstrip('.')}, status=403)
+    messages.error(request, message)
+    return redirect('home')
+
+
+def role_required(*roles, message='You do not have permission to access this page.', json=False):
+    """
+    Allow a view only to users with one of `roles`
+
+        @login_required(login_url='login')
+        @role_required('admin', 'inventory_clerk', message='Only Admin and Inventory Clerk ...')
+        def inventory_report(request): ...
+
+    Anyone else is sent home with `message` (or 'User role not assigned.'),
+    or gets a 403 JSON error with json=True. Works on sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                role = await RoleCache.aget(await request.auser())
+                if role not in roles:
+                    # Message storage touches the session, which is sync-only
+                    return await sync_to_async(_deny)(request, role, message, json)
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                role = RoleCache.get(request.user)
+                if role not in roles:
+                    return _deny(request, role, message, json)
+                return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+
+class RoleRequiredMixin(UserPassesTestMixin):
+    """Mixin to require one of `allowed_roles`"""
+    allowed_roles = ()
+
+    def test_func(self):
+        return has_role(self.request.user, *self.allowed_roles)
+
+    def handle_no_permission(self):
+        messages.error(self.request, 'You do not have permission to access this page.')
+        return redirect('home')
+
+
+class AdminRequiredMixin(RoleRequiredMixin):
+    """Mixin to require admin role"""
+    allowed_roles = ('admin',)
+
+
+def role(request):
+    """Template context processor: `role` and `role_label` of the current user, looked up on first use"""
+    return {
+        'role': SimpleLazyObject(lambda: RoleCache.get(request.user) or ''),
+        'role_label': SimpleLazyObject(lambda: ROLE_LABELS.get(RoleCache.get(request.user), '')),
+    }
@@ -0,0 +1,81 @@
+# core/serializers.py
+"""
+Output serializers for the REST API (core/views_api.py).
+
+Writes are validated by the same ModelForms the web pages use, so these
+serializers only shape responses.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from .models import Category, Product, PurchaseItem, PurchaseOrder, Supplier
+
+
+def requested_fields(request):
+    """Field names from ?fields=a,b,c, or None when the parameter is absent"""
+    value = request.query_params.get('fields') if request is not None else None
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """Return only the fields named in ?fields=a,b,c"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get('request'))
+        if wanted:
+            unknown = wanted - set(self.fields)
+            if unknown:
+                raise ParseError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class SupplierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Supplier
+        fields = ['id', 'name', 'contact_person', 'phone', 'email', 'address', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    supplier_name = serializers.CharField(source='supplier.name', read_only=True, default=None)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'code', 'name', 'category', 'category_name', 'supplier', 'supplier_name',
+            'unit_price', 'reorder_level', 'quantity', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class PurchaseItemSerializer(serializers.ModelSerializer):
+    product_code = serializers.CharField(source='product.code', read_only=True)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = PurchaseItem
+        fields = ['id', 'product', 'product_code', 'quantity', 'unit_cost', 'line_total']
+        read_only_fields = fields
+
+
+class PurchaseOrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    items = PurchaseItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = PurchaseOrder
+        fields = [
+            'id', 'po_number', 'date', 'received', 'tax_rate', 'total_subtotal', 'total_tax',
+            'total_amount', 'cash', 'change', 'cashier', 'items', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
@@ -1,5 +1,10 @@
 import json
+from collections import Counter
+from contextlib import ContextDecorator
+from contextvars import ContextVar
 from datetime import date, datetime
+from decimal import Decimal
+from django.db.models import Model
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.dispatch import receiver
@@ -8,10 +13,77 @@ from .models import (
     AuditLog, Product, Supplier, Category, PurchaseOrder, PurchaseItem
 )
 from .middleware import get_current_user
+from .activity_log import log_activity
 
 # Simple in-memory cache to hold pre-save snapshots for change detection
 _PRE_SAVE_CACHE = {}
 
+# Counts of the active suspend_audit() block of this thread/task, if any
+_SUSPENDED_AUDIT = ContextVar('suspended_audit', default=None)
+
+
+class suspend_audit(ContextDecorator):
+    """Context manager and decorator that stops per-row audit entries for a block.
+
+    Inside the block the audit handlers below only count saves and deletes
+    (no pre-save snapshot query, no audit insert). On exit a single summary
+    entry is written, e.g. "120 products updated, 3 categories created by
+    import catalogue.csv"; without a `summary` nothing is written. Nested
+    blocks count towards the outermost one.
+
+        with suspend_audit('import catalogue.csv'):
+            ...
+
+        @suspend_audit('nightly repricing')
+        def reprice(): ...
+    """
+
+    def __init__(self, summary=None, user=None):
+        self.summary = summary
+        self.user = user
+        self.counts = None
+        self._token = None
+
+    def _recreate_cm(self):
+        # Each decorated call gets its own counts
+        return suspend_audit(self.summary, self.user)
+
+    def __enter__(self):
+        if _SUSPENDED_AUDIT.get() is None:
+            self.counts = Counter()
+            self._token = _SUSPENDED_AUDIT.set(self.counts)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._token is None:
+            return False
+        _SUSPENDED_AUDIT.reset(self._token)
+        self._token = None
+        if self.summary and self.counts:
+            _create_audit(self.user or get_current_user(), *_summarize(self.counts, self.summary))
+        return False
+
+
+def _summarize(counts, summary):
+    """(action, target, detail) of the summary entry for {(model, verb): n}"""
+    verbs = {verb for _, verb in counts}
+    models = sorted({model.__name__ for model, _ in counts})
+    parts = []
+    for (model, verb), n in sorted(counts.items(), key=lambda item: (item[0][0].__name__, item[0][1])):
+        name = model._meta.verbose_name if n == 1 else model._meta.verbose_name_plural
+        parts.append(f"{n} {name} {verb}")
+    action = f"bulk_{verbs.pop()}" if len(verbs) == 1 else 'bulk_changed'
+    return action, ','.join(models)[:150], f"{', '.join(parts)} by {summary}"
+
+
+def _count_suspended(sender, verb):
+    """Count the change instead of auditing it when inside suspend_audit()"""
+    counts = _SUSPENDED_AUDIT.get()
+    if counts is None:
+        return False
+    counts[(sender, verb)] += 1
+    return True
+
 def _snapshot_instance(instance):
     data = {}
     for f in instance._meta.fields:
@@ -50,15 +122,38 @@ def _format_changes(changes: list) -> str:
         parts.append(f"{field}: {old} -> {new}")
     return '; '.join(parts)
 
-def _create_audit(user, action, target, detail=""):
+def _jsonable_changes(changes):
+    """Make change values JSON-friendly (related objects are stored by pk)"""
+    result = []
+    for ch in changes:
+        item = dict(ch)
+        for key in ('old', 'new'):
+            value = item.get(key)
+            if isinstance(value, Model):
+                item[key] = value.pk
+            elif not isinstance(value, (type(None), bool, int, float, str, Decimal, date, datetime)):
+                item[key] = str(value)
+        result.append(item)
+    return result
+
+
+def _create_audit(user, action, target, detail="", changes=None):
     try:
-        AuditLog.objects.create(user=user, action=action, target=target, detail=str(detail))
+        AuditLog.objects.create(
+            user=user, action=action, target=target, detail=str(detail),
+            changes=_jsonable_changes(changes) if changes else None
+        )
     except Exception:
         # Fail silently; auditing should not break main flow
         pass
 
 
-def _register_pre_save(sender, instance, **kwargs):
+def _register_pre_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        # Fixture loading and change replay restore rows; they are not user edits
+        return
+    if _SUSPENDED_AUDIT.get() is not None:
+        return
     if instance.pk:
         try:
             orig = sender.objects.get(pk=instance.pk)
@@ -67,7 +162,9 @@ def _register_pre_save(sender, instance, **kwargs):
             pass
 
 
-def _register_post_save(sender, instance, created, **kwargs):
+def _register_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw or _count_suspended(sender, 'created' if created else 'updated'):
+        return
     user = get_current_user()
     target = f"{sender.__name__}:{getattr(instance, 'pk', None)}"
     if created:
@@ -134,7 +231,7 @@ def _register_post_save(sender, instance, created, **kwargs):
                     detail = "Product was updated"
             else:
                 detail = f"{sender.__name__} was updated"
-            _create_audit(user, 'updated', target, detail)
+            _create_audit(user, 'updated', target, detail, changes)
             # Quantity-specific audit: detect restock or out-of-stock
             for ch in changes:
                 if ch.get('field') == 'quantity':
@@ -148,27 +245,35 @@ def _register_post_save(sender, instance, created, **kwargs):
                                     code = getattr(instance, 'code', None)
                                     name = getattr(instance, 'name', None)
                                     label = f"({code})_{name}"
-                                    _create_audit(user, 'restocked', target, f"Product '{label}' was restocked from {old_q} to {new_q}")
+                                    _create_audit(user, 'restocked', target, f"Product '{label}' was restocked from {old_q} to {new_q}", [ch])
                                 except Exception:
-                                    _create_audit(user, 'restocked', target, f'Product was restocked from {old_q} to {new_q}')
+                                    _create_audit(user, 'restocked', target, f'Product was restocked from {old_q} to {new_q}', [ch])
                             else:
-                                _create_audit(user, 'restocked', target, f'Item was restocked from {old_q} to {new_q}')
+                                _create_audit(user, 'restocked', target, f'Item was restocked from {old_q} to {new_q}', [ch])
                         if new_q == 0:
                             if sender.__name__ == 'Product':
                                 try:
                                     code = getattr(instance, 'code', None)
                                     name = getattr(instance, 'name', None)
                                     label = f"({code})_{name}"
-                                    _create_audit(user, 'marked_out_of_stock', target, f"Product '{label}' is out of stock")
+                                    _create_audit(user, 'marked_out_of_stock', target, f"Product '{label}' is out of stock", [ch])
                                 except Exception:
-                                    _create_audit(user, 'marked_out_of_stock', target, f'Product is out of stock')
+                                    _create_audit(user, 'marked_out_of_stock', target, f'Product is out of stock', [ch])
                             else:
-                                _create_audit(user, 'marked_out_of_stock', target, f'Item is out of stock')
+                                _create_audit(user, 'marked_out_of_stock', target, f'Item is out of stock', [ch])
+                        # Low-stock alert when the quantity crosses the product's own reorder level
+                        level = getattr(instance, 'reorder_level', None)
+                        if sender.__name__ == 'Product' and level is not None and old_q >= level > new_q > 0:
+                            label = f"({getattr(instance, 'code', None)})_{getattr(instance, 'name', None)}"
+                            _create_audit(user, 'low_stock', target,
+                                          f"Product '{label}' fell below its reorder level of {level} ({new_q} left)", [ch])
                     except Exception:
                         pass
 
 
 def _register_post_delete(sender, instance, **kwargs):
+    if _count_suspended(sender, 'deleted'):
+        return
     user = get_current_user()
     target = f"{sender.__name__}:{getattr(instance, 'pk', None)}"
     # Friendly delete messages
@@ -203,13 +308,13 @@ for model in (Product, Supplier, Category, PurchaseOrder, PurchaseItem):
     post_delete.connect(_register_post_delete, sender=model)
 
 
-# User activity signals
+# User activity signals; written in batches when ACTIVITY_LOG='batched' (see core/activity_log.py)
 @receiver(user_logged_in)
 def _user_logged_in(sender, request, user, **kwargs):
     ip = request.META.get('REMOTE_ADDR') or request.META.get('HTTP_X_FORWARDED_FOR') or 'unknown'
     uname = getattr(user, 'username', 'Unknown')
     detail = f"User '{uname}' logged in from {ip}"
-    _create_audit(user, 'login', f'User:{user.pk}', detail)
+    log_activity(user, 'login', f'User:{user.pk}', detail)
 
 
 @receiver(user_logged_out)
@@ -217,18 +322,20 @@ def _user_logged_out(sender, request, user, **kwargs):
     ip = request.META.get('REMOTE_ADDR') or request.META.get('HTTP_X_FORWARDED_FOR') or 'unknown'
     uname = getattr(user, 'username', 'Unknown') if user else 'Unknown'
     detail = f"User '{uname}' logged out from {ip}"
-    _create_audit(user, 'logout', f'User:{getattr(user, "pk", None)}', detail)
+    log_activity(user, 'logout', f'User:{getattr(user, "pk", None)}', detail)
 # core/signals.py
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import UserRole
+from .roles import RoleCache
 
 
 @receiver(post_save, sender=User)
-def create_user_role(sender, instance, created, **kwargs):
+def create_user_role(sender, instance, created, raw=False, **kwargs):
     """Auto-create UserRole when a new User is created"""
-    if created:
+    if created and not raw:
         # Make superusers/admins get the 'admin' role by default
         default_role = 'admin' if getattr(instance, 'is_superuser', False) or getattr(instance, 'is_staff', False) else 'cashier'
         UserRole.objects.get_or_create(
@@ -238,25 +345,35 @@ def create_user_role(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_role(sender, instance, **kwargs):
-    """Save UserRole when User is saved"""
-    try:
-        instance.user_role.save()
-    except UserRole.DoesNotExist:
-        # If the user is staff/superuser, create as admin, otherwise cashier
-        role = 'admin' if getattr(instance, 'is_superuser', False) or getattr(instance, 'is_staff', False) else 'cashier'
-        UserRole.objects.create(user=instance, role=role)
+def ensure_user_role(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Give a saved User that has no UserRole one; an existing role is never re-saved"""
+    if created or raw or update_fields is not None:
+        # New users get theirs above; partial saves such as last_login on login leave it alone
+        return
+    if instance._state.fields_cache.get('user_role') is not None:
+        return
+    # If the user is staff/superuser, create as admin, otherwise cashier
+    role = 'admin' if getattr(instance, 'is_superuser', False) or getattr(instance, 'is_staff', False) else 'cashier'
+    UserRole.objects.get_or_create(user=instance, defaults={'role': role})
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_role(sender, instance, raw=False, **kwargs):
+    """Drop the cached role (see core/roles.py) once the change is committed"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: RoleCache.invalidate(user_id))
 
 
 @receiver(post_save, sender=User)
-def audit_user_created(sender, instance, created, **kwargs):
+def audit_user_created(sender, instance, created, raw=False, **kwargs):
     """Create a human-friendly audit entry when a User is created.
 
     - If created by an authenticated user (admin), record who created it.
     - If created while request user is anonymous, assume registration form.
     - If no request context and user is superuser/staff, assume createsuperuser.
     """
-    if not created:
+    if not created or raw or _count_suspended(sender, 'created'):
         return
 
     try:
@@ -284,3 +401,33 @@ def audit_user_created(sender, instance, created, **kwargs):
                 _create_audit(None, 'created', f'User:{instance.pk}', f"User '{uname}' was created")
     except Exception:
         pass
+
+
+# Change capture for point-in-time recovery (see core/changelog.py)
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import m2m_changed
+from .changelog import CAPTURED_MODELS, capture_save, capture_m2m, capture_delete
+
+
+def connect_change_capture():
+    """Capture committed changes of CAPTURED_MODELS (CHANGE_CAPTURE=1 connects this at startup)"""
+    for label in CAPTURED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(capture_save, sender=model, dispatch_uid=f'capture_save_{model._meta.label_lower}')
+        post_delete.connect(capture_delete, sender=model, dispatch_uid=f'capture_delete_{model._meta.label_lower}')
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(capture_m2m, sender=field.remote_field.through, dispatch_uid=f'capture_m2m_{field.remote_field.through._meta.label_lower}')
+
+
+if settings.CHANGE_CAPTURE:
+    connect_change_capture()
+
+
+# Cached reports are stamped with the data version of the tables they read (see core/report_cache.py)
+from .report_cache import MODEL_SCOPES, invalidate_reports
+
+for label in MODEL_SCOPES:
+    model = apps.get_model(label)
+    post_save.connect(invalidate_reports, sender=model, dispatch_uid=f'invalidate_reports_save_{label}')
+    post_delete.connect(invalidate_reports, sender=model, dispatch_uid=f'invalidate_reports_delete_{label}')
@@ -0,0 +1,99 @@
+# core/stock.py
+"""
+Stock levels, reservations and replenishment.
+
+- A product is low on stock when its quantity falls below its own
+  `reorder_level`. The low-stock set is backed by a partial index
+  (product_low_stock_idx) that the database updates with every stock
+  change, so reading it costs O(k) in the number of low-stock products.
+- Purchase orders take their items out of stock when created. Until an
+  order is received those units are reserved, not gone: deleting an open
+  order releases them back into stock, receiving it makes them final.
+- Reorder suggestions are computed in one batch for the whole low-stock set
+  from each product's sales velocity over the last REORDER_VELOCITY_DAYS.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import Product, PurchaseItem
+
+
+class StockManager:
+    """Low-stock detection, reservations and reorder suggestions"""
+
+    @staticmethod
+    def low_stock():
+        """Products below their reorder level, served from the partial index"""
+        return Product.objects.filter(quantity__lt=F('reorder_level'))
+
+    @staticmethod
+    def reserved(product_ids=None):
+        """{product id: units held by open (not yet received) purchase orders}"""
+        items = PurchaseItem.objects.filter(purchase_order__received=False)
+        if product_ids is not None:
+            items = items.filter(product_id__in=product_ids)
+        return dict(items.values('product_id').annotate(units=Sum('quantity')).values_list('product_id', 'units'))
+
+    @staticmethod
+    def release(order):
+        """
+        Put an open order's reserved units back into stock (before its items are deleted or replaced)
+
+        Returns:
+            int: Number of products restocked
+        """
+        if order.received:
+            return 0
+        units = defaultdict(int)
+        for product_id, quantity in order.items.values_list('product_id', 'quantity'):
+            units[product_id] += quantity
+        # One save per product, so each restock is audited like a manual edit
+        for product in Product.objects.filter(pk__in=units):
+            product.quantity += units[product.pk]
+            product.save()
+        return len(units)
+
+    @staticmethod
+    def suggest_reorders(days=None, cover_days=None, now=None):
+        """
+        Reorder quantities for every low-stock product
+
+        Each product is brought up to enough stock to cover `cover_days` of its
+        average daily sales over the last `days`, on top of its reorder level.
+
+        Returns:
+            list: One dict per low-stock product (product, quantity, reorder_level,
+                  reserved, daily_velocity, suggested), grouped by supplier
+        """
+        days = days or settings.REORDER_VELOCITY_DAYS
+        cover_days = settings.REORDER_COVER_DAYS if cover_days is None else cover_days
+        since = (now or timezone.now()) - timedelta(days=days)
+        products = list(StockManager.low_stock().select_related('supplier'))
+
+        sold, reserved = {}, {}
+        ids = [p.pk for p in products]
+        for start in range(0, len(ids), settings.BULK_BATCH_SIZE):
+            batch = ids[start:start + settings.BULK_BATCH_SIZE]
+            sold.update(
+                PurchaseItem.objects.filter(product_id__in=batch, purchase_order__created_at__gte=since)
+                .values('product_id').annotate(units=Sum('quantity')).values_list('product_id', 'units')
+            )
+            reserved.update(StockManager.reserved(batch))
+
+        suggestions = []
+        for p in products:
+            velocity = sold.get(p.pk, 0) / days
+            target = p.reorder_level + math.ceil(velocity * cover_days)
+            suggestions.append({
+                'product': p,
+                'quantity': p.quantity,
+                'reorder_level': p.reorder_level,
+                'reserved': reserved.get(p.pk, 0),
+                'daily_velocity': round(velocity, 2),
+                'suggested': max(target - p.quantity, 0),
+            })
+        suggestions.sort(key=lambda s: (s['product'].supplier.name if s['product'].supplier else '', s['product'].code))
+        return suggestions
@@ -1,12 +1,10 @@
 # core/templatetags/currency_filters.py
 from django import template
+from core.formatting import format_money
 
 register = template.Library()
 
 @register.filter
 def currency_format(value):
-    """Format number as currency with thousand separators"""
-    try:
-        return f"{float(value):,.2f}"
-    except (ValueError, TypeError):
-        return value
+    """Format number as currency with thousand separators (exact Decimal rounding, see core/formatting.py)"""
+    return format_money(value)
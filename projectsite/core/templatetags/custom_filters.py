@@ -1,19 +1,24 @@
+from decimal import InvalidOperation
 from django import template
+from core.formatting import to_decimal
 
 register = template.Library()
 
+# Exact Decimal arithmetic, so amounts keep their cents. For table columns,
+# compute the values in the view instead (core/formatting.py money_columns).
+
 @register.filter
 def mul(value, arg):
     """Multiply the value by the argument"""
     try:
-        return float(value) * float(arg)
-    except (ValueError, TypeError):
+        return to_decimal(value) * to_decimal(arg)
+    except (InvalidOperation, ValueError, TypeError):
         return 0
 
 @register.filter
 def add_decimal(value, arg):
     """Add two decimal values"""
     try:
-        return float(value) + float(arg)
-    except (ValueError, TypeError):
+        return to_decimal(value) + to_decimal(arg)
+    except (InvalidOperation, ValueError, TypeError):
         return 0
@@ -0,0 +1,61 @@
+# core/templatetags/fragment_cache.py
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from core.report_cache import DATA_SCOPES, ReportCache
+
+register = template.Library()
+
+
+class DataCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, scopes, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.scopes = scopes
+        self.vary_on = vary_on
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        if self.scopes:
+            # The data-version stamps change with every committed write to those tables
+            vary_on.insert(0, ReportCache.data_version(self.scopes))
+        key = make_template_fragment_key(f'datacache:{self.fragment_name}', vary_on)
+        content = cache.get(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, settings.FRAGMENT_CACHE_SECONDS)
+        return content
+
+
+@register.tag
+def datacache(parser, token):
+    """
+    Cache a template fragment until the data it shows changes
+
+        {% datacache "product-filters" scopes="products" selected_category %}
+            ...
+        {% enddatacache %}
+
+    The fragment is keyed on its name, the current data version of each scope
+    in `scopes` (see core/report_cache.py DATA_SCOPES) and the values of any
+    further variables; it is kept for FRAGMENT_CACHE_SECONDS at most.
+    Without `scopes` only the variables decide, e.g. for static navigation.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name")
+    fragment_name = bits[1].strip('"\'')
+    scopes = ()
+    vary_on = []
+    for bit in bits[2:]:
+        if bit.startswith('scopes='):
+            scopes = tuple(scope for scope in bit[len('scopes='):].strip('"\'').split(',') if scope)
+            unknown = set(scopes) - set(DATA_SCOPES)
+            if unknown:
+                raise template.TemplateSyntaxError(f"'{bits[0]}' got unknown scopes: {', '.join(sorted(unknown))}")
+        else:
+            vary_on.append(parser.compile_filter(bit))
+    nodelist = parser.parse((f'end{bits[0]}',))
+    parser.delete_first_token()
+    return DataCacheNode(nodelist, fragment_name, scopes, vary_on)
@@ -1,3 +1,1155 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import json
+import shutil
+import sqlite3
+import tempfile
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import IntegrityError, connection, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .activity_log import activity_log
+from .audit_archive import AuditArchiver, AuditLogFilter
+from .backup import BackupCatalog, BackupList, BackupManager, SQLiteBackend, parallel_gzip
+from .changelog import CAPTURED_MODELS, ChangeLog, capture_delete, capture_save, change_log
+from .imports import import_products
+from .jobs import JOB_HANDLERS, claim_next, enqueue, job_handler, requeue_stale, run_job
+from .read_events import ReadEventBuffer
+from .models import AuditLog, Category, Job, Product, PurchaseItem, PurchaseOrder, Supplier, UserRole
+from .pdf_reports import PDF_REPORT_TYPES
+from .report_cache import ReportCache
+from .roles import RoleCache
+from .signals import connect_change_capture
+from . import views_async
 
-# Create your tests here.
+PAGE_SIZE = 10
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    READ_EVENT_TRACKING='off',
+    ACTIVITY_LOG='immediate',
+)
+class ListViewQueryCountTests(TestCase):
+    """Pages must cost the same number of queries with one row as with a full page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin_qc', password='x')
+        UserRole.objects.filter(user=cls.admin).update(role='admin')
+        cls.category = Category.objects.create(name='Category 0')
+        cls.supplier = Supplier.objects.create(name='Supplier 0')
+
+    def setUp(self):
+        # Cached roles of earlier tests' users outlive their rolled-back rows
+        cache.clear()
+        self.client.force_login(self.admin)
+        # Warm the role cache, so both measurements find it
+        RoleCache.get(self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def assertConstantQueries(self, url, add_rows):
+        """`url` costs as many queries after add_rows() fills the page as it did before"""
+        # Run the on-commit hooks so cached fragments of the page are invalidated, as after a real write
+        with self.captureOnCommitCallbacks(execute=True):
+            add_rows(1)
+        one_row = self.count_queries(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            add_rows(PAGE_SIZE * 2)
+        self.assertEqual(self.count_queries(url), one_row, f"{url} runs extra queries per row")
+
+    def add_products(self, count):
+        start = Product.objects.count()
+        for i in range(start, start + count):
+            category = Category.objects.create(name=f'Category {i + 1}')
+            supplier = Supplier.objects.create(name=f'Supplier {i + 1}') if i % 2 else None
+            Product.objects.create(code=f'P{i:04d}', name=f'Product {i}', category=category,
+                                   supplier=supplier, unit_price=Decimal('9.99'), quantity=i)
+
+    def add_purchase(self, item_count):
+        order = PurchaseOrder.objects.create(tax_rate=Decimal('12'), cashier=self.admin)
+        self.add_products(item_count)
+        for product in Product.objects.order_by('-id')[:item_count]:
+            PurchaseItem.objects.create(purchase_order=order, product=product, quantity=1, unit_cost=Decimal('5.00'))
+        return order
+
+    def test_product_list(self):
+        self.assertConstantQueries(reverse('products-list'), self.add_products)
+
+    def test_product_list_search_and_sort(self):
+        self.add_products(3)
+        for query in ('?q=Product', '?sort=price', '?sort=-stock', f'?category={self.category.pk}'):
+            self.assertEqual(self.client.get(reverse('products-list') + query).status_code, 200, query)
+
+    def test_category_list(self):
+        def add_categories(count):
+            for i in range(count):
+                Category.objects.create(name=f'Extra {Category.objects.count()}')
+        self.assertConstantQueries(reverse('categories-list'), add_categories)
+
+    def test_supplier_list(self):
+        def add_suppliers(count):
+            for i in range(count):
+                Supplier.objects.create(name=f'Extra {Supplier.objects.count()}', phone='123')
+        self.assertConstantQueries(reverse('suppliers-list'), add_suppliers)
+
+    def test_purchase_list(self):
+        def add_purchases(count):
+            for i in range(count):
+                self.add_purchase(2)
+        self.assertConstantQueries(reverse('purchases-list'), add_purchases)
+        self.assertEqual(self.client.get(reverse('purchases-list') + '?q=PO').status_code, 200)
+
+    def test_purchase_detail(self):
+        order = PurchaseOrder.objects.create(tax_rate=Decimal('12'), cashier=self.admin)
+
+        def add_items(count):
+            self.add_products(count)
+            for product in Product.objects.order_by('-id')[:count]:
+                PurchaseItem.objects.create(purchase_order=order, product=product, quantity=1, unit_cost=Decimal('5.00'))
+        self.assertConstantQueries(reverse('purchases-detail', args=[order.pk]), add_items)
+
+    def test_user_list(self):
+        def add_users(count):
+            for i in range(count):
+                User.objects.create_user(f'user_{User.objects.count()}')
+        self.assertConstantQueries(reverse('user-list'), add_users)
+
+    def test_audit_log_list(self):
+        def add_logs(count):
+            AuditLog.objects.bulk_create([
+                AuditLog(user=self.admin, action='updated', target=f'Product:{i}', detail='x') for i in range(count)
+            ])
+        self.assertConstantQueries(reverse('audit-log-list'), add_logs)
+
+    def test_api_lists(self):
+        self.assertConstantQueries(reverse('v1:product-list'), self.add_products)
+        self.assertConstantQueries(reverse('v1:purchase-order-list'), lambda count: [self.add_purchase(2) for _ in range(count)])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, ACTIVITY_LOG='immediate')
+class FragmentCacheTests(TestCase):
+    """{% datacache %} fragments are reused until a write to their data commits"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk_fc', password='x')
+        Category.objects.create(name='Beverages')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_filters_follow_writes(self):
+        self.assertContains(self.client.get(reverse('products-list')), 'Beverages')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('products-list'))
+        self.assertFalse(any('FROM "core_category"' in q['sql'] for q in queries),
+                         'category dropdown was not served from the cache')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Snacks')
+        self.assertContains(self.client.get(reverse('products-list')), 'Snacks')
+
+    def test_home_stats_are_lazy(self):
+        self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+        self.assertFalse(any('FROM "core_purchaseorder"' in q['sql'] for q in queries),
+                         'dashboard totals were recomputed on a cache hit')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, ACTIVITY_LOG='immediate')
+class RoleCacheTests(TestCase):
+    """Roles are read from the cache until assign_user_role changes them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin_rc', password='x')
+        cls.clerk = User.objects.create_user('clerk_rc', password='x')
+        UserRole.objects.filter(user=cls.admin).update(role='admin')
+        UserRole.objects.filter(user=cls.clerk).update(role='inventory_clerk')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_role_is_cached(self):
+        self.client.force_login(self.clerk)
+        self.assertEqual(self.client.get(reverse('inventory-report')).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('inventory-report')).status_code, 200)
+        self.assertFalse(any('"core_userrole"' in q['sql'] for q in queries), 'role was looked up again')
+
+    def test_assign_role_invalidates(self):
+        self.client.force_login(self.clerk)
+        self.assertEqual(self.client.get(reverse('inventory-report')).status_code, 200)
+
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('assign-role', args=[self.clerk.pk]), {'role': 'cashier'})
+
+        self.client.force_login(self.clerk)
+        self.assertRedirects(self.client.get(reverse('inventory-report')), reverse('home'), fetch_redirect_response=False)
+
+    def test_user_saves_leave_role_alone(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.force_login(self.clerk)
+            self.clerk.first_name = 'Clerk'
+            self.clerk.save()
+        self.assertFalse(any(q['sql'].startswith('UPDATE "core_userrole"') for q in queries), 'role was re-saved')
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    ACTIVITY_LOG='batched', ACTIVITY_LOG_BATCH_SIZE=3, ACTIVITY_LOG_FLUSH_SECONDS=3600,
+)
+class ActivityLogTests(TestCase):
+    """Logins are audited in batches and write nothing else they do not need"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'cashier_al{i}', password='x') for i in range(3)]
+
+    def tearDown(self):
+        activity_log.flush()
+
+    def test_logins_are_written_in_one_batch(self):
+        for user in self.users[:2]:
+            self.client.force_login(user)
+        self.assertFalse(AuditLog.objects.filter(action='login').exists())
+        with CaptureQueriesContext(connection) as queries:
+            self.client.force_login(self.users[2])
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "core_auditlog"') for q in queries), 1)
+        self.assertEqual(
+            sorted(AuditLog.objects.filter(action='login').values_list('target_model', 'target_pk')),
+            sorted(('User', str(user.pk)) for user in self.users),
+        )
+
+    def test_rows_keep_the_event_time(self):
+        before = timezone.now()
+        self.client.force_login(self.users[0])
+        with mock.patch('django.utils.timezone.now', return_value=before + timedelta(minutes=5)):
+            self.assertEqual(activity_log.flush(), 1)
+        created_at = AuditLog.objects.get(action='login').created_at
+        self.assertLess(created_at - before, timedelta(minutes=1))
+
+    def test_failed_flush_keeps_the_rows(self):
+        self.client.force_login(self.users[0])
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=RuntimeError('disk full')), \
+                self.assertLogs('core.activity_log', 'ERROR'):
+            self.assertEqual(activity_log.flush(), 0)
+        self.assertEqual(activity_log.flush(), 1)
+        self.assertTrue(AuditLog.objects.filter(action='login', target_pk=str(self.users[0].pk)).exists())
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+    def test_login_with_cache_sessions_only_updates_last_login(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'username': 'cashier_al0', 'password': 'x'})
+        self.assertEqual(response.status_code, 302)
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(len(writes), 1, writes)
+        self.assertTrue(writes[0].startswith('UPDATE "auth_user" SET "last_login"'))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, ACTIVITY_LOG='immediate')
+class AuditArchiveSearchTests(TestCase):
+    """Archived entries follow the table page by page and match the same filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin_aa', password='x')
+        UserRole.objects.filter(user=cls.admin).update(role='admin')
+
+    def setUp(self):
+        cache.clear()
+        archive_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, archive_dir)
+        patcher = mock.patch.object(AuditArchiver, 'ARCHIVE_DIR', archive_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        old = timezone.now() - timedelta(days=400)
+        for i in range(30):
+            log = AuditLog.objects.create(user=self.admin, action='updated', target=f'Product:{i}', detail=f'old {i}')
+            AuditLog.objects.filter(pk=log.pk).update(created_at=old + timedelta(minutes=i))
+        AuditArchiver.archive_older_than(days=180)
+        for i in range(5):
+            AuditLog.objects.create(user=self.admin, action='updated', target=f'Product:{i}', detail=f'new {i}')
+        self.client.force_login(self.admin)
+        self.end = f'{timezone.localdate():%Y-%m-%d}'
+
+    def page(self, query):
+        response = self.client.get(reverse('audit-log-list') + f'?end={self.end}&{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_archived_entries_follow_the_table(self):
+        self.assertEqual(AuditLog.objects.filter(action='updated').count(), 5)
+        first = self.page('action=updated&page=1')
+        self.assertEqual(first.paginator.count, 35)
+        self.assertEqual([log.detail for log in first.object_list[:6]], [f'new {i}' for i in range(4, -1, -1)] + ['old 29'])
+        second = self.page('action=updated&page=2')
+        self.assertEqual([log.detail for log in second.object_list], [f'old {i}' for i in range(9, -1, -1)])
+        self.assertTrue(all(getattr(log, 'archived', False) for log in second.object_list))
+
+    def test_filters_match_archived_rows_like_table_rows(self):
+        for query, expected in (
+            ('target=product:3', ['new 3', 'old 3']),
+            ('target=Product:3', ['new 3', 'old 3']),
+            ('target=product:1', ['new 1', 'old 1']),
+            ('q=OLD 2', ['old 29', 'old 28', 'old 27', 'old 26', 'old 25', 'old 24', 'old 23', 'old 22', 'old 21', 'old 20', 'old 2']),
+            ('action=UPDATED&q=new 4', ['new 4']),
+        ):
+            page = self.page(query)
+            self.assertEqual([log.detail for log in page.object_list], expected, query)
+
+    def test_archived_entries_newer_than_the_oldest_table_row_are_kept(self):
+        # A row older than the archive that a partial archive run left in the table
+        straggler = AuditLog.objects.create(user=self.admin, action='updated', target='Product:99', detail='straggler')
+        AuditLog.objects.filter(pk=straggler.pk).update(created_at=timezone.now() - timedelta(days=500))
+        first = self.page('action=updated&page=1')
+        self.assertEqual(first.paginator.count, 36)
+        self.assertEqual([log.detail for log in first.object_list],
+                         [f'new {i}' for i in range(4, -1, -1)] + [f'old {i}' for i in range(29, 9, -1)])
+        second = self.page('action=updated&page=2')
+        self.assertEqual([log.detail for log in second.object_list], [f'old {i}' for i in range(9, -1, -1)] + ['straggler'])
+
+
+@override_settings(READ_EVENT_FLUSH_SECONDS=3600)
+class ReadEventTests(TestCase):
+    """Report views are counted in memory and summarised in one row per (user, page, hour)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin_re', password='x')
+
+    def test_record_does_not_write(self):
+        buffer = ReadEventBuffer()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                buffer.record(self.user, 'reports_dashboard', 'reports dashboard')
+        buffer.flush()
+        self.assertEqual(len(queries), 0)
+
+    def test_flushes_from_several_processes_share_a_row(self):
+        buffers = [ReadEventBuffer(), ReadEventBuffer()]
+        for count, buffer in zip((2, 3), buffers):
+            for _ in range(count):
+                buffer.record(self.user, 'reports_dashboard', 'reports dashboard')
+        for buffer in buffers:
+            self.assertEqual(buffer.flush(), 1)
+
+        row = AuditLog.objects.get(action='view_reports')
+        self.assertEqual(row.changes[0]['new'], 5)
+        self.assertIn('reports dashboard 5 time(s)', row.detail)
+        self.assertEqual(row.created_at, timezone.localtime().replace(minute=0, second=0, microsecond=0))
+
+    def test_failed_flush_keeps_the_counts(self):
+        buffer = ReadEventBuffer()
+        buffer.record(self.user, 'reports_dashboard', 'reports dashboard')
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=RuntimeError('disk full')), \
+                self.assertLogs('core.read_events', 'ERROR'):
+            self.assertEqual(buffer.flush(), 0)
+        buffer.record(self.user, 'reports_dashboard', 'reports dashboard')
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(AuditLog.objects.get(action='view_reports').changes[0]['new'], 2)
+
+    def test_a_bucket_has_one_row(self):
+        hour = timezone.localtime().replace(minute=0, second=0, microsecond=0)
+        AuditLog.objects.create(user=self.user, action='view_reports', target='reports_dashboard', created_at=hour)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AuditLog.objects.create(user=self.user, action='view_reports', target='reports_dashboard', created_at=hour)
+        # Other actions are not constrained
+        AuditLog.objects.create(user=self.user, action='updated', target='reports_dashboard', created_at=hour)
+        AuditLog.objects.create(user=self.user, action='updated', target='reports_dashboard', created_at=hour)
+
+    def test_a_flush_that_loses_the_insert_race_adds_to_the_winner(self):
+        hour = timezone.localtime().replace(minute=0, second=0, microsecond=0)
+        AuditLog.objects.create(user=self.user, action='view_reports', target='reports_dashboard', created_at=hour,
+                                changes=[{'field': 'views', 'old': 0, 'new': 3}])
+        buffer = ReadEventBuffer()
+        for _ in range(2):
+            buffer.record(self.user, 'reports_dashboard', 'reports dashboard')
+        # The first read misses the row, as if the other process had not committed it yet
+        select_for_update = AuditLog.objects.select_for_update
+        with mock.patch.object(AuditLog.objects, 'select_for_update',
+                               side_effect=[AuditLog.objects.none(), select_for_update()]):
+            self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(list(AuditLog.objects.filter(action='view_reports').values_list('changes', flat=True)),
+                         [[{'field': 'views', 'old': 3, 'new': 5}]])
+
+
+class InMemorySQLiteBackend(SQLiteBackend):
+    """SQLiteBackend for the in-memory test database: dumped and loaded through sqlite3's serialize()"""
+
+    def __init__(self):
+        super().__init__(connection.settings_dict)
+
+    @staticmethod
+    def _sqlite():
+        connection.ensure_connection()
+        return connection.connection
+
+    def size_hint(self):
+        return len(self._sqlite().serialize())
+
+    @contextmanager
+    def open_dump(self):
+        yield io.BytesIO(self._sqlite().serialize())
+
+    def load(self, stream, before_swap=None, progress=None):
+        data = stream.read()
+        if progress:
+            progress(len(data))
+        if before_swap:
+            before_swap()
+        self._sqlite().deserialize(data)
+
+    def create_restore_point(self, timestamp):
+        path = BackupManager.get_backup_path(timestamp, '.db')
+        path.write_bytes(self._sqlite().serialize())
+        return path
+
+
+class SQLiteRestoreTests(TestCase):
+    """SQLiteBackend.load swaps in a verified file atomically and never blocks writers for the restore point"""
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.object(BackupManager, 'BACKUP_DIR', self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db_path = self.directory / 'live.sqlite3'
+        self.write_db(self.db_path, 'old')
+        self.backend = SQLiteBackend({'NAME': str(self.db_path), 'OPTIONS': {'timeout': 1}})
+
+    @staticmethod
+    def write_db(path, value):
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS t (value TEXT)')
+            conn.execute('INSERT INTO t VALUES (?)', (value,))
+        conn.close()
+
+    @staticmethod
+    def values(path):
+        conn = sqlite3.connect(path)
+        try:
+            return [row[0] for row in conn.execute('SELECT value FROM t ORDER BY rowid')]
+        finally:
+            conn.close()
+
+    def backup_stream(self, value):
+        path = self.directory / f'{value}.sqlite3'
+        path.unlink(missing_ok=True)
+        self.write_db(path, value)
+        return io.BytesIO(path.read_bytes())
+
+    def test_a_corrupt_backup_leaves_the_live_database_untouched(self):
+        before = self.db_path.read_bytes()
+        before_swap = mock.Mock()
+        with self.assertRaisesMessage(RuntimeError, 'integrity check'):
+            self.backend.load(io.BytesIO(b'not a database' * 1000), before_swap=before_swap)
+        before_swap.assert_not_called()
+        self.assertEqual(self.db_path.read_bytes(), before)
+        self.assertEqual(sorted(p.name for p in self.directory.iterdir()), ['live.sqlite3'])
+
+    def test_the_swap_is_a_single_rename(self):
+        inode = self.db_path.stat().st_ino
+        with mock.patch('core.backup.os.replace', side_effect=OSError('power cut')):
+            with self.assertRaises(OSError):
+                self.backend.load(self.backup_stream('new'))
+        # Nothing was written into the live file; the temp file is gone
+        self.assertEqual((self.db_path.stat().st_ino, self.values(self.db_path)), (inode, ['old']))
+        self.assertFalse(self.db_path.with_name('live.sqlite3.restore-tmp').exists())
+
+        self.backend.load(self.backup_stream('new'))
+        self.assertNotEqual(self.db_path.stat().st_ino, inode)
+        self.assertEqual(self.values(self.db_path), ['new'])
+
+    def test_writers_are_not_blocked_while_the_restore_point_is_taken(self):
+        points = []
+
+        def take_restore_point():
+            points.append(self.backend.create_restore_point('20250101_000000_restore_point'))
+            # A writer with no busy timeout would fail if the live database were locked
+            conn = sqlite3.connect(self.db_path, timeout=0)
+            with conn:
+                conn.execute('INSERT INTO t VALUES (?)', ('during',))
+            conn.close()
+
+        self.backend.load(self.backup_stream('new'), before_swap=take_restore_point)
+        self.assertEqual(self.values(points[0]), ['old'])
+        self.assertEqual(self.values(self.db_path), ['new'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, ACTIVITY_LOG='immediate')
+class PointInTimeRestoreTests(TransactionTestCase):
+    """restore_backup(target_time=...) replays captured changes up to the target and no further"""
+
+    def setUp(self):
+        backup_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, backup_dir)
+        for patcher in (
+            mock.patch.object(BackupManager, 'BACKUP_DIR', backup_dir),
+            mock.patch.object(ChangeLog, 'DIR', backup_dir / 'changes'),
+            mock.patch('core.backup.get_backup_backend', InMemorySQLiteBackend),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Capture is off in settings; capture the one model the test changes
+        post_save.connect(capture_save, sender=Category, dispatch_uid='test_capture_save')
+        post_delete.connect(capture_delete, sender=Category, dispatch_uid='test_capture_delete')
+        self.addCleanup(post_save.disconnect, sender=Category, dispatch_uid='test_capture_save')
+        self.addCleanup(post_delete.disconnect, sender=Category, dispatch_uid='test_capture_delete')
+        self.addCleanup(change_log.seal)
+
+    def test_restore_to_a_time_between_changes(self):
+        kept = Category.objects.create(name='Kept')
+        removed = Category.objects.create(name='Removed')
+        backup = BackupManager.create_backup()
+        self.assertEqual(backup['status'], 'success', backup)
+
+        Category.objects.create(name='Added')
+        kept.name = 'Kept (renamed)'
+        kept.save()
+        removed.delete()
+        target_time = datetime.now()
+        Category.objects.create(name='Too late')
+        kept.delete()
+
+        result = BackupManager.restore_backup(target_time=target_time)
+        self.assertEqual(result['status'], 'success', result)
+        # The save, update and delete before the target (and any earlier records of the backup's second)
+        self.assertGreaterEqual(result['changes_applied'], 3)
+        self.assertEqual(
+            sorted(Category.objects.values_list('name', flat=True)),
+            ['Added', 'Kept (renamed)'],
+        )
+        # Changes after the target now belong to an abandoned timeline
+        self.assertFalse(any(record['op'] == 'delete' and record['pk'] == kept.pk
+                             for record in ChangeLog.read(since=target_time)))
+
+    def test_only_business_models_are_captured(self):
+        connect_change_capture()
+        for label in CAPTURED_MODELS:
+            model = apps.get_model(label)
+            self.addCleanup(post_save.disconnect, sender=model, dispatch_uid=f'capture_save_{label}')
+            self.addCleanup(post_delete.disconnect, sender=model, dispatch_uid=f'capture_delete_{label}')
+
+        category = Category.objects.create(name='Captured')
+        Product.objects.create(code='C1', name='Captured', category=category, unit_price=Decimal('1.00'))
+        enqueue('cleanup_backups')
+        audit = AuditLog.objects.create(action='updated', target='Product:1', detail='')
+        self.assertTrue(AuditLog.objects.exclude(pk=audit.pk).exists())
+        change_log.seal()
+
+        captured = {record['object']['model'] if record['op'] == 'save' else record['model']
+                    for record in ChangeLog.read()}
+        self.assertEqual(captured, {'core.category', 'core.product'})
+        # Records of other models in older segments are skipped on replay
+        self.assertEqual(ChangeLog.apply([{'op': 'delete', 'model': 'core.auditlog', 'pk': audit.pk}]), 0)
+        self.assertTrue(AuditLog.objects.filter(pk=audit.pk).exists())
+
+
+class BackupRetentionTests(TestCase):
+    """apply_retention_policy() keeps the newest backup of each day, week and month, and the newest overall"""
+
+    def setUp(self):
+        self.backup_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.backup_dir)
+        patcher = mock.patch.object(BackupManager, 'BACKUP_DIR', self.backup_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add(self, created, tier='daily'):
+        filename = f'backup_{created:%Y%m%d_%H%M%S}.db.gz'
+        (self.backup_dir / filename).write_bytes(b'backup')
+        BackupManager.get_catalog().add({'filename': filename, 'datetime': created.isoformat(), 'size': 6, 'tier': tier})
+        return filename
+
+    def retain(self, **keep):
+        result = BackupManager.apply_retention_policy(**{'hourly': 0, 'daily': 0, 'weekly': 0, 'monthly': 0, **keep})
+        self.assertEqual(result['status'], 'success', result)
+        kept = {backup['filename'] for backup in BackupManager.get_backups()}
+        self.assertEqual({path.name for path in self.backup_dir.glob('backup_*')}, kept)
+        return kept
+
+    def test_daily_across_a_month_boundary(self):
+        start = datetime(2025, 1, 29)
+        for day in range(5):
+            for hour in (6, 18):
+                self.add(start + timedelta(days=day, hours=hour), tier='hourly')
+        self.assertEqual(self.retain(hourly=1, daily=3), {
+            'backup_20250202_180000.db.gz', 'backup_20250201_180000.db.gz', 'backup_20250131_180000.db.gz',
+        })
+
+    def test_weekly_across_a_year_boundary(self):
+        # 2024-12-30 and 2024-12-31 belong to ISO week 2025-W01
+        start = datetime(2024, 12, 16, 2)
+        for day in range(28):
+            self.add(start + timedelta(days=day))
+        self.assertEqual(self.retain(daily=2, weekly=3), {
+            'backup_20250112_020000.db.gz', 'backup_20250111_020000.db.gz',
+            'backup_20250105_020000.db.gz', 'backup_20241229_020000.db.gz',
+        })
+
+    def test_monthly_across_a_year_boundary(self):
+        for year, month in ((2024, 10), (2024, 11), (2024, 12), (2025, 1), (2025, 2)):
+            for day in (1, 15):
+                self.add(datetime(year, month, day, 2), tier='weekly')
+        self.assertEqual(self.retain(monthly=4), {
+            'backup_20250215_020000.db.gz', 'backup_20250115_020000.db.gz',
+            'backup_20241215_020000.db.gz', 'backup_20241115_020000.db.gz',
+        })
+
+    def test_the_newest_backup_is_never_deleted(self):
+        manual = self.add(datetime(2025, 3, 1, 12), tier=None)
+        for hour in range(3):
+            self.add(datetime(2025, 3, 1, hour), tier='hourly')
+        self.assertEqual(self.retain(), {manual, 'backup_20250301_020000.db.gz'})
+        self.assertEqual(self.retain(), {manual, 'backup_20250301_020000.db.gz'})
+
+
+class BackupFileTests(TestCase):
+    """Compressed backups round-trip, the catalog indexes what was recorded and verification catches damage"""
+
+    def setUp(self):
+        self.backup_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.backup_dir)
+        patcher = mock.patch.object(BackupManager, 'BACKUP_DIR', self.backup_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def compressed_backup(self, filename='backup_20250101_000000.db.gz'):
+        """A small SQLite database compressed by parallel_gzip, recorded in the catalog"""
+        db_path = self.backup_dir / 'source.sqlite3'
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute('CREATE TABLE t (value TEXT)')
+            conn.executemany('INSERT INTO t VALUES (?)', ((f'row {i} ' * 20,) for i in range(2000)))
+        conn.close()
+        with open(db_path, 'rb') as f_in:
+            stats = parallel_gzip(f_in, self.backup_dir / filename, workers=3, chunk_size=16 * 1024)
+        BackupManager.get_catalog().add({
+            'filename': filename, 'datetime': '2025-01-01T00:00:00', 'size': 1, 'sha256': stats['sha256'],
+        })
+        return filename, db_path.read_bytes(), stats
+
+    def test_parallel_gzip_round_trips_through_gzip_open(self):
+        filename, data, stats = self.compressed_backup()
+        raw = (self.backup_dir / filename).read_bytes()
+        members = 0
+        while raw:
+            decompressor = zlib.decompressobj(wbits=31)
+            decompressor.decompress(raw)
+            raw = decompressor.unused_data
+            members += 1
+        self.assertEqual(members, -(-len(data) // (16 * 1024)))
+        self.assertGreater(members, 1)
+        with gzip.open(self.backup_dir / filename, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual((stats['input_bytes'], stats['sha256']), (len(data), hashlib.sha256(data).hexdigest()))
+
+    def test_catalog_pages_and_lookups_match_what_was_recorded(self):
+        catalog = BackupCatalog(self.backup_dir)
+        recorded = [
+            {'filename': f'backup_2025010{day}_000000.db.gz', 'datetime': f'2025-01-0{day}T00:00:00',
+             'size': day * 100, 'tier': 'daily'}
+            for day in range(1, 8)
+        ]
+        for metadata in recorded:
+            catalog.add(metadata)
+            (self.backup_dir / metadata['filename']).with_suffix('.json').write_text(json.dumps(metadata))
+        newest_first = recorded[::-1]
+
+        self.assertEqual(catalog.list(), newest_first)
+        self.assertEqual(catalog.list(offset=2, limit=3), newest_first[2:5])
+        self.assertEqual((catalog.count(), catalog.totals()), (7, (7, 2800)))
+        self.assertEqual(catalog.get(recorded[3]['filename']), recorded[3])
+        self.assertIsNone(catalog.get('backup_20240101_000000.db.gz'))
+        page = Paginator(BackupList(catalog), 3).page(3)
+        self.assertEqual((page.paginator.num_pages, list(page.object_list)), (3, newest_first[6:]))
+
+        catalog.update(recorded[0]['filename'], verification={'status': 'ok'})
+        self.assertEqual(catalog.get(recorded[0]['filename']), {**recorded[0], 'verification': {'status': 'ok'}})
+        catalog.remove(recorded[6]['filename'])
+        self.assertEqual(catalog.list(limit=1), [recorded[5]])
+
+        # A lost catalog is rebuilt from the JSON sidecars
+        catalog.path.unlink()
+        self.assertEqual(BackupCatalog(self.backup_dir).list(), newest_first)
+
+    def test_verify_backup_passes_an_intact_backup(self):
+        filename, _, _ = self.compressed_backup()
+        result = BackupManager.verify_backup(filename)
+        self.assertEqual((result['status'], result['checksum'], result['quick_check']), ('ok', 'ok', 'ok'), result)
+        self.assertEqual(BackupManager.get_backup(filename)['verification'], result)
+
+    def test_verify_backup_flags_a_checksum_mismatch(self):
+        filename, _, _ = self.compressed_backup()
+        BackupManager.get_catalog().update(filename, sha256=hashlib.sha256(b'something else').hexdigest())
+        result = BackupManager.verify_backup(filename)
+        self.assertEqual((result['status'], result['checksum'], result['quick_check']), ('failed', 'mismatch', 'ok'))
+        self.assertEqual(BackupManager.get_backup(filename)['verification']['status'], 'failed')
+
+    def test_verify_backup_flags_a_corrupted_archive(self):
+        filename, _, _ = self.compressed_backup()
+        path = self.backup_dir / filename
+        raw = bytearray(path.read_bytes())
+        middle = len(raw) // 2
+        raw[middle:middle + 64] = bytes(64)
+        path.write_bytes(bytes(raw))
+        result = BackupManager.verify_backup(filename)
+        self.assertEqual(result['status'], 'failed')
+        self.assertTrue(result['error'])
+        self.assertEqual(BackupManager.get_backup(filename)['verification']['status'], 'failed')
+        # The temp copy used for the quick check is removed
+        self.assertEqual(list(self.backup_dir.glob('*.verify-tmp')), [])
+
+
+@override_settings(JOB_RETRY_BACKOFF_SECONDS=30, JOB_STALE_SECONDS=3600)
+class JobQueueTests(TestCase):
+    """Jobs are claimed once, retried with backoff and recovered from dead workers"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.calls = []
+
+        @job_handler('test_flaky', max_attempts=3)
+        def flaky(job, progress):
+            cls.calls.append(job.attempts)
+            if job.params.get('taken_over_by'):
+                # What a restore's cancellation or requeue_stale does while the handler runs
+                Job.objects.filter(pk=job.pk).update(status='running', locked_by=job.params['taken_over_by'])
+            if job.params.get('fail'):
+                raise RuntimeError('boom')
+            return {'result': {'ok': True}}
+
+    @classmethod
+    def tearDownClass(cls):
+        JOB_HANDLERS.pop('test_flaky', None)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.calls.clear()
+
+    def make_due(self, job):
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now() - timedelta(seconds=1))
+
+    def test_a_job_is_claimed_once(self):
+        job = enqueue('test_flaky')
+        first = claim_next('worker-a')
+        self.assertEqual((first.pk, first.status, first.locked_by, first.attempts), (job.pk, 'running', 'worker-a', 1))
+        self.assertIsNone(claim_next('worker-b'))
+
+    def test_a_claim_race_has_one_winner(self):
+        job = enqueue('test_flaky')
+        update = QuerySet.update
+        rival = []
+
+        def update_after_rival(queryset, **kwargs):
+            # Worker A claims the job between worker B's candidate query and B's UPDATE
+            if not rival:
+                rival.append(None)
+                rival.append(claim_next('worker-a'))
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update_after_rival):
+            self.assertIsNone(claim_next('worker-b'))
+        self.assertEqual(rival[1].pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.locked_by, job.attempts), ('worker-a', 1))
+
+    def test_a_failing_job_is_retried_up_to_max_attempts(self):
+        job = enqueue('test_flaky', {'fail': True})
+        for attempt in (1, 2):
+            started = timezone.now()
+            self.assertFalse(run_job(claim_next('worker')))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('queued', attempt))
+            self.assertIn(f'Attempt {attempt} failed: boom', job.error)
+            # Exponential backoff: 30s, then 60s
+            self.assertGreaterEqual(job.run_after, started + timedelta(seconds=30 * 2 ** (attempt - 1)))
+            self.assertIsNone(claim_next('worker'), 'retried before its backoff')
+            self.make_due(job)
+
+        self.assertFalse(run_job(claim_next('worker')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), ('failed', 3, 'boom'))
+        self.assertEqual(self.calls, [1, 2, 3])
+        self.assertIsNone(claim_next('worker'))
+
+    def test_a_stale_running_job_is_requeued(self):
+        job = enqueue('test_flaky')
+        claim_next('dead-worker')
+        self.assertEqual(requeue_stale(), 0)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ('queued', ''))
+
+        self.assertTrue(run_job(claim_next('worker')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), ('succeeded', 2, {'ok': True}))
+
+    def test_a_stale_job_out_of_attempts_fails(self):
+        job = enqueue('test_flaky')
+        Job.objects.filter(pk=job.pk).update(
+            status='running', attempts=3, locked_at=timezone.now() - timedelta(hours=2),
+        )
+        requeue_stale()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'Worker stopped responding'))
+
+    def test_restore_cancels_other_pending_jobs(self):
+        pending = enqueue('test_flaky')
+        restore = enqueue('restore_backup', {'filename': 'backup_20250101_000000.db.gz'})
+        Job.objects.filter(pk=restore.pk).update(run_after=pending.run_after - timedelta(seconds=1))
+        claimed = claim_next('worker')
+        self.assertEqual(claimed.pk, restore.pk)
+
+        def restore_backup(filename, progress=None):
+            progress(50 * 1024 * 1024, 100 * 1024 * 1024)
+            self.assertEqual(Job.objects.get(pk=restore.pk).progress, 45)
+            return {'status': 'success', 'message': ''}
+
+        with mock.patch('core.jobs.BackupManager.restore_backup', side_effect=restore_backup):
+            self.assertTrue(run_job(claimed))
+
+        pending.refresh_from_db()
+        restore.refresh_from_db()
+        self.assertEqual(pending.status, 'failed')
+        self.assertIn('restored from a backup', pending.error)
+        self.assertEqual(restore.status, 'succeeded')
+
+    def test_a_job_cancelled_while_running_stays_cancelled(self):
+        job = enqueue('test_flaky')
+        claimed = claim_next('worker')
+        Job.objects.filter(pk=job.pk).update(status='failed', error='Cancelled: database was restored from a backup')
+        self.assertTrue(run_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'Cancelled: database was restored from a backup'))
+
+    def test_a_worker_that_lost_its_job_does_not_record_the_outcome(self):
+        job = enqueue('test_flaky', {'taken_over_by': 'other-worker', 'fail': True})
+        self.assertFalse(run_job(claim_next('worker')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.error), ('running', 'other-worker', ''))
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    ACTIVITY_LOG='immediate', API_BULK_MAX_RECORDS=10,
+)
+class ApiTests(TestCase):
+    """Bulk writes, pagination, sparse fields, ETags and role permissions of /api/v1/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clerk = User.objects.create_user('clerk_api', password='x')
+        cls.cashier = User.objects.create_user('cashier_api', password='x')
+        UserRole.objects.filter(user=cls.clerk).update(role='inventory_clerk')
+        UserRole.objects.filter(user=cls.cashier).update(role='cashier')
+        cls.category = Category.objects.create(name='Beverages')
+        cls.product = Product.objects.create(code='EXIST', name='Existing', category=cls.category,
+                                             unit_price=Decimal('1.00'), quantity=5)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.clerk)
+
+    def record(self, code, **fields):
+        return {'code': code, 'name': f'Product {code}', 'category': self.category.pk, 'unit_price': '2.50',
+                'quantity': 1, **fields}
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type='application/json')
+
+    def test_bulk_create_is_all_or_nothing(self):
+        records = [self.record('A1'), self.record('A2', unit_price='abc'), self.record('A3'), self.record('EXIST')]
+        response = self.post(reverse('v1:product-bulk'), records)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1, 3])
+        self.assertIn('unit_price', response.json()['errors'][0]['errors'])
+        self.assertIn('code', response.json()['errors'][1]['errors'])
+        self.assertFalse(Product.objects.filter(code__in=['A1', 'A3']).exists())
+
+        response = self.post(reverse('v1:product-bulk'), [self.record('A1'), self.record('A3')])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['count'], 2)
+        pks = sorted(Product.objects.filter(code__in=['A1', 'A3']).values_list('pk', flat=True))
+        self.assertEqual(len(pks), 2)
+        audit = AuditLog.objects.get(action='bulk_created')
+        self.assertEqual(audit.detail, f'2 products created via API; ids {pks[0]}-{pks[1]}')
+        self.assertEqual(list(AuditLogFilter(target='product').apply(AuditLog.objects.filter(action='bulk_created'))), [audit])
+
+    def test_bulk_create_rejects_duplicates_within_the_batch(self):
+        response = self.post(reverse('v1:product-bulk'), [self.record('D1'), self.record('D2'), self.record('D1')])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [2])
+        self.assertIn('Duplicate of record 0', errors[0]['errors']['code'][0]['message'])
+        self.assertFalse(Product.objects.filter(code__startswith='D').exists())
+
+    def test_bulk_update_reports_unknown_ids_by_index(self):
+        response = self.client.patch(reverse('v1:product-bulk'), [
+            {'id': self.product.pk, 'quantity': 9}, {'id': 999999, 'quantity': 1},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 5)
+
+    def test_cursor_pagination(self):
+        for i in range(4):
+            Product.objects.create(code=f'P{i}', name=f'Product {i}', category=self.category, unit_price=Decimal('1'))
+        seen = []
+        url = reverse('v1:product-list') + '?page_size=2&fields=id'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 2)
+            seen += [row['id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(seen, list(Product.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse('v1:product-list') + '?fields=id,code')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'id': self.product.pk, 'code': 'EXIST'}])
+        self.assertEqual(self.client.get(reverse('v1:product-list') + '?fields=id,nope').status_code, 400)
+
+    def test_etag_revalidation(self):
+        url = reverse('v1:product-detail', args=[self.product.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {'quantity': 7}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['quantity'], 7)
+
+    def test_write_permissions_follow_roles(self):
+        self.client.force_login(self.cashier)
+        self.assertEqual(self.client.get(reverse('v1:product-list')).status_code, 200)
+        self.assertEqual(self.post(reverse('v1:product-list'), self.record('C1')).status_code, 403)
+        self.assertEqual(self.post(reverse('v1:product-bulk'), [self.record('C1')]).status_code, 403)
+        order = {'tax_rate': '12', 'cash': '100', 'items': [{'product': self.product.pk, 'quantity': 1, 'unit_cost': '1.00'}]}
+        self.assertEqual(self.post(reverse('v1:purchase-order-list'), order).status_code, 201)
+
+        self.client.force_login(self.clerk)
+        self.assertEqual(self.post(reverse('v1:product-list'), self.record('C1')).status_code, 201)
+        self.assertEqual(self.post(reverse('v1:purchase-order-list'), order).status_code, 403)
+
+        self.client.logout()
+        self.assertIn(self.client.get(reverse('v1:product-list')).status_code, (401, 403))
+
+    def test_delete_is_not_allowed(self):
+        supplier = Supplier.objects.create(name='Acme')
+        for name, obj in (('v1:product-detail', self.product), ('v1:category-detail', self.category),
+                          ('v1:supplier-detail', supplier)):
+            self.assertEqual(self.client.delete(reverse(name, args=[obj.pk])).status_code, 405, name)
+        self.assertTrue(Product.objects.filter(pk=self.product.pk).exists())
+
+
+@override_settings(ACTIVITY_LOG='immediate')
+class ProductImportTests(TestCase):
+    """Imports take their columns from the header, whatever the first row holds"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Beverages')
+        cls.supplier = Supplier.objects.create(name='Acme')
+        Product.objects.create(code='B1', name='Old name', category=cls.category, unit_price=Decimal('1.00'), quantity=1)
+
+    def import_csv(self, text):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        path = directory / 'products.csv'
+        path.write_text(text, encoding='utf-8')
+        return import_products(path)
+
+    def test_short_first_row_does_not_drop_columns(self):
+        result = self.import_csv(
+            'code,name,category,unit_price,supplier,quantity,reorder_level\n'
+            'A1,Apple,Beverages,1.50\n'
+            'B1,Banana,Beverages,2.00,Acme,40,8\n'
+        )
+        self.assertEqual(result['status'], 'success', result)
+        banana = Product.objects.get(code='B1')
+        self.assertEqual((banana.name, banana.supplier_id, banana.quantity, banana.reorder_level),
+                         ('Banana', self.supplier.pk, 40, 8))
+        # The short row has a blank quantity, like any other row leaving the cell empty
+        self.assertEqual((result['updated'], result['failed']), (1, 1))
+        self.assertFalse(Product.objects.filter(code='A1').exists())
+
+    def test_absent_optional_columns_keep_existing_values(self):
+        result = self.import_csv('code,name,category,unit_price\nB1,Banana,Beverages,2.00\n')
+        self.assertEqual(result['status'], 'success', result)
+        banana = Product.objects.get(code='B1')
+        self.assertEqual((banana.name, banana.quantity), ('Banana', 1))
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    ACTIVITY_LOG='immediate', PDF_ROWS_PER_TABLE=5,
+)
+class PdfExportTests(TestCase):
+    """PDF exports are queued as jobs, rendered by a worker and downloaded from the job page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin_pdf', password='x')
+        cls.clerk = User.objects.create_user('clerk_pdf', password='x')
+        UserRole.objects.filter(user=cls.admin).update(role='admin')
+        UserRole.objects.filter(user=cls.clerk).update(role='inventory_clerk')
+        category = Category.objects.create(name='Beverages')
+        Product.objects.bulk_create([
+            Product(code=f'P{i:02d}', name=f'Product {i}', category=category, unit_price=Decimal('2.50'), quantity=i)
+            for i in range(12)
+        ])
+        for _ in range(7):
+            PurchaseOrder.objects.create(cashier=cls.admin, total_subtotal=Decimal('10.00'),
+                                         total_tax=Decimal('1.20'), total_amount=Decimal('11.20'))
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = override_settings(JOB_RESULT_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def export(self, user, report_type, **data):
+        self.client.force_login(user)
+        return self.client.post(reverse('export-pdf'), {'type': report_type, **data})
+
+    def test_each_report_type_renders(self):
+        for report_type in PDF_REPORT_TYPES:
+            with self.subTest(report_type):
+                response = self.export(self.admin, report_type)
+                job = Job.objects.latest('id')
+                self.assertRedirects(response, reverse('job-detail', args=[job.pk]), fetch_redirect_response=False)
+                self.assertEqual((job.kind, job.status), ('export_pdf', 'queued'))
+
+                self.assertTrue(run_job(claim_next('worker')))
+                job.refresh_from_db()
+                self.assertEqual(job.status, 'succeeded', job.error)
+                self.assertGreater(job.result['rows'], 5)
+                self.assertGreater(job.result['pages'], 0)
+
+                download = self.client.get(reverse('job-download', args=[job.pk]))
+                self.assertEqual(download.status_code, 200)
+                self.assertTrue(b''.join(download.streaming_content).startswith(b'%PDF'))
+                self.assertIn(job.result['filename'], download['Content-Disposition'])
+
+    def test_clerks_export_inventory_and_follow_only_their_own_jobs(self):
+        self.export(self.clerk, 'inventory')
+        own = Job.objects.get(created_by=self.clerk)
+        run_job(claim_next('worker'))
+        self.assertEqual(self.client.get(reverse('job-detail', args=[own.pk])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('job-status', args=[own.pk])).json()['status'], 'succeeded')
+        self.assertEqual(self.client.get(reverse('job-download', args=[own.pk])).status_code, 200)
+        self.assertRedirects(self.client.get(reverse('job-list')), reverse('home'), fetch_redirect_response=False)
+
+        self.assertRedirects(self.export(self.clerk, 'profit_loss'), reverse('home'), fetch_redirect_response=False)
+        self.export(self.admin, 'profit_loss')
+        others = Job.objects.get(created_by=self.admin)
+        self.client.force_login(self.clerk)
+        self.assertRedirects(self.client.get(reverse('job-detail', args=[others.pk])), reverse('home'),
+                             fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('job-status', args=[others.pk])).status_code, 403)
+
+    def test_bad_requests_queue_nothing(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('export-pdf'), {'type': 'inventory'}).status_code, 405)
+        self.assertRedirects(self.export(self.admin, 'profit_loss', month='2026-13'), reverse('profit-loss-report'),
+                             fetch_redirect_response=False)
+        self.assertRedirects(self.export(self.admin, 'sales'), reverse('reports-dashboard'), fetch_redirect_response=False)
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    ACTIVITY_LOG='immediate', REPORT_ITERATOR_CHUNK_SIZE=4,
+)
+class AsyncReportTests(TestCase):
+    """The async report views read with the async ORM and match the sync views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin_async', password='x')
+        UserRole.objects.filter(user=cls.admin).update(role='admin')
+        category = Category.objects.create(name='Beverages')
+        Product.objects.bulk_create([
+            Product(code=f'P{i:02d}', name=f'Product {i}', category=category, unit_price=Decimal('2.50'), quantity=i)
+            for i in range(10)
+        ])
+        for _ in range(3):
+            PurchaseOrder.objects.create(cashier=cls.admin, total_subtotal=Decimal('10.00'),
+                                         total_tax=Decimal('1.20'), total_amount=Decimal('11.20'))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def request(self, path):
+        request = AsyncRequestFactory().get(path)
+        request.user = self.admin
+        request.session = self.client.session
+
+        async def auser():
+            return self.admin
+        request.auser = auser
+        return request
+
+    async def test_csv_export_streams_the_same_rows(self):
+        response = await views_async.export_report_csv(self.request('/reports/export/csv/?type=inventory'))
+        self.assertTrue(response.is_async)
+        streamed = b''.join([chunk async for chunk in response.streaming_content])
+        sync = await sync_to_async(
+            lambda: b''.join(self.client.get(reverse('export-csv'), {'type': 'inventory'}).streaming_content)
+        )()
+        self.assertEqual(streamed, sync)
+        lines = streamed.decode().splitlines()
+        self.assertEqual(len(lines), 11)
+        self.assertTrue(lines[1].startswith('P00,Product 0,Beverages,,0,2.50,'))
+
+    async def test_profit_loss_totals(self):
+        response = await views_async.profit_loss_report(self.request('/reports/profit-loss/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '33.60')
+        self.assertContains(response, '30.00')
+
+    async def test_inventory_report_awaits_the_warm_cache(self):
+        self.assertFalse((await ReportCache.aget('inventory'))['cached'])
+        self.assertTrue((await ReportCache.aget('inventory'))['cached'])
+        response = await views_async.inventory_report(self.request('/reports/inventory/'))
+        self.assertContains(response, 'Product 9')
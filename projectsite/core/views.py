@@ -3,39 +3,49 @@
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView, TemplateView
+from django.db import transaction
 from django.db.models import Sum, F, Q, Count, Avg
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.utils.decorators import method_decorator
 from .models import Category, Product, Supplier, PurchaseOrder, PurchaseItem, UserRole, AuditLog
+from .db_routers import use_replica
+from .read_events import track_read_event
+from .activity_log import activity_log
+from .audit_archive import AuditArchiver, AuditLogFilter, AuditTrail
+from .jobs import enqueue, upload_path
+from .report_cache import ReportCache
+from .roles import (
+    FINANCIAL_REPORT_DENIED, INVENTORY_REPORT_DENIED,
+    AdminRequiredMixin, RoleCache, RoleRequiredMixin, has_role, role_required,
+)
+from .projections import (
+    category_rows, name_choices, product_rows, purchase_detail, purchase_rows, supplier_rows,
+)
+from .stock import StockManager
+from .formatting import money_columns
+from .reports import (
+    EXCEL_AVAILABLE, INVENTORY_COLUMNS, PROFIT_LOSS_TOTALS, REPORT_PERIODS, csv_writer, export_products,
+    inventory_row, month_purchases, profit_loss_context, report_filename,
+)
+from .pdf_reports import PDF_AVAILABLE, PDF_REPORT_TYPES, month_range
 from .forms import (
     CategoryForm, ProductForm, SupplierForm, PurchaseOrderForm,
     PurchaseItemForm, BootstrapPasswordChangeForm, UserProfileForm,
-    AdminUserCreationForm, AdminUserChangeForm,
+    AdminUserCreationForm, AdminUserChangeForm, ProductImportForm,
 )
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login as auth_login, logout as auth_logout
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from decimal import Decimal
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import SimpleLazyObject
 import json
-try:
-    from openpyxl import Workbook
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
-
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
 from django.contrib.auth import login as auth_login
 from django.http import JsonResponse
 from decimal import Decimal
@@ -55,21 +65,27 @@ def serialize_products(products_qs):
         })
     return products_list
 
+def purchase_items_from_post(data):
+    """Parse the purchase form's parallel product_id/quantity/unit_cost lists; invalid lines are skipped"""
+    items = []
+    for product_id, quantity, unit_cost in zip(data.getlist('product_id'), data.getlist('quantity'), data.getlist('unit_cost')):
+        if product_id and quantity and unit_cost:
+            try:
+                items.append((Product.objects.get(id=product_id), int(quantity), Decimal(unit_cost)))
+            except (Product.DoesNotExist, ValueError, ArithmeticError):
+                continue
+    return items
+
 # ---------- HOME PAGE ----------
-def home(request):
-    if not request.user.is_authenticated:
-        return redirect('login')
-    from decimal import Decimal
-    from datetime import datetime, timedelta
-    from django.utils import timezone
-    
+def home_stats():
+    """Counts and purchase totals shown on the dashboard"""
     # Basic counts
     total_products = Product.objects.count()
     total_suppliers = Supplier.objects.count()
     total_purchases = PurchaseOrder.objects.count()
     
-    # Stock info (use default threshold)
-    low_stock_products = Product.objects.filter(quantity__lt=settings.DEFAULT_REORDER_LEVEL).count()
+    # Stock info (each product's own reorder level)
+    low_stock_products = StockManager.low_stock().count()
     out_of_stock = Product.objects.filter(quantity=0).count()
     
     # Purchase info
@@ -112,7 +128,7 @@ def home(request):
     year_purchase_amount = PurchaseOrder.objects.filter(created_at__gte=year_start, created_at__lt=now).aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
     year_tax_amount = PurchaseOrder.objects.filter(created_at__gte=year_start, created_at__lt=now).aggregate(Sum('total_tax'))['total_tax__sum'] or Decimal('0.00')
     
-    context = {
+    return {
         'total_products': total_products,
         'total_suppliers': total_suppliers,
         'total_purchases': total_purchases,
@@ -138,6 +154,17 @@ def home(request):
         'year_purchase_amount': year_purchase_amount,
         'year_tax_amount': year_tax_amount,
     }
+
+
+def home(request):
+    if not request.user.is_authenticated:
+        return redirect('login')
+    # Only computed when home.html's cached fragments are stale (a write since, or a new day)
+    context = {
+        'stats': SimpleLazyObject(home_stats),
+        # The day home_stats() counts "today" from
+        'today': timezone.now().date(),
+    }
     return render(request, 'home.html', context)
 
 
@@ -185,7 +212,7 @@ class CategoryListView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = category_rows(super().get_queryset())
 
         q = self.request.GET.get("q")
         sort = self.request.GET.get("sort")
@@ -237,7 +264,7 @@ class ProductListView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = product_rows(super().get_queryset())
 
         q = self.request.GET.get("q")
         sort = self.request.GET.get("sort")
@@ -261,17 +288,17 @@ class ProductListView(LoginRequiredMixin, ListView):
         if supplier:
             qs = qs.filter(supplier_id=supplier)
 
-        # SORT
-        allowed_sorts = [
-            'name', '-name',
-            'price', '-price',
-            'stock', '-stock',
-            'created_at', '-created_at',
-            'id', '-id'
-        ]
+        # SORT (price and stock are the unit_price and quantity columns)
+        allowed_sorts = {
+            'name': 'name', '-name': '-name',
+            'price': 'unit_price', '-price': '-unit_price',
+            'stock': 'quantity', '-stock': '-quantity',
+            'created_at': 'created_at', '-created_at': '-created_at',
+            'id': 'id', '-id': '-id',
+        }
 
         if sort in allowed_sorts:
-            qs = qs.order_by(sort)
+            qs = qs.order_by(allowed_sorts[sort])
         else:
             qs = qs.order_by("-id")  # default newest first
 
@@ -279,8 +306,9 @@ class ProductListView(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
-        context['suppliers'] = Supplier.objects.all()
+        money_columns(context['products'], unit_price_display='unit_price')
+        context['categories'] = name_choices(Category)
+        context['suppliers'] = name_choices(Supplier)
         context['selected_category'] = self.request.GET.get("category", "")
         context['selected_supplier'] = self.request.GET.get("supplier", "")
         context['search_query'] = self.request.GET.get("q", "")
@@ -308,6 +336,29 @@ class ProductDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy('products-list')
 
 
+@login_required(login_url='login')
+@role_required('admin', message='Only administrators can import products.')
+def product_import_view(request):
+    """Upload a CSV/XLSX catalogue; a `run_jobs` worker imports it in chunks"""
+    from django.contrib import messages
+    form = ProductImportForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        upload = form.cleaned_data['file']
+        path = upload_path(upload.name)
+        with open(path, 'wb') as f:
+            for chunk in upload.chunks():
+                f.write(chunk)
+        job = enqueue('import_products', {
+            'path': str(path.relative_to(settings.JOB_RESULT_DIR)),
+            'filename': upload.name,
+            'create_missing': form.cleaned_data['create_missing'],
+        }, request.user)
+        messages.info(request, 'Import queued. This page updates as it runs.')
+        return redirect('job-detail', job_id=job.pk)
+
+    return render(request, 'products_import.html', {'form': form})
+
+
 
 
 # ========================================
@@ -320,7 +371,7 @@ class SupplierListView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = supplier_rows(super().get_queryset())
 
         q = self.request.GET.get("q")
         sort = self.request.GET.get("sort")
@@ -384,7 +435,7 @@ class PurchaseListView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = purchase_rows(super().get_queryset())
 
         q = self.request.GET.get("q")
         sort = self.request.GET.get("sort")
@@ -394,7 +445,6 @@ class PurchaseListView(LoginRequiredMixin, ListView):
         if q:
             qs = qs.filter(
                 Q(items__product__name__icontains=q) |
-                Q(supplier__name__icontains=q) |
                 Q(po_number__icontains=q) |
                 Q(date__icontains=q)
             ).distinct()
@@ -419,6 +469,11 @@ class PurchaseListView(LoginRequiredMixin, ListView):
 
         return qs
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        money_columns(context['purchases'], total_amount_display='total_amount')
+        return context
+
 
 class PurchaseDetailView(LoginRequiredMixin, DetailView):
     model = PurchaseOrder
@@ -426,6 +481,14 @@ class PurchaseDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'purchase'
     login_url = 'login'
 
+    def get_queryset(self):
+        return purchase_detail(super().get_queryset())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        money_columns(self.object.items.all(), unit_cost_display='unit_cost', line_total_display=lambda item: item.line_total())
+        return context
+
     def post(self, request, *args, **kwargs):
         purchase = self.get_object()
         action = request.POST.get('action')
@@ -478,49 +541,7 @@ class PurchaseCreateView(LoginRequiredMixin, CreateView):
             purchase_order.save()  # Save first to get the PO number and primary key
             
             # Add purchase items from form
-            items_data = request.POST.getlist('product_id')
-            quantities = request.POST.getlist('quantity')
-            unit_costs = request.POST.getlist('unit_cost')
-            
-            total_subtotal = Decimal('0.00')
-            total_tax = Decimal('0.00')
-            
-            for product_id, quantity, unit_cost in zip(items_data, quantities, unit_costs):
-                if product_id and quantity and unit_cost:
-                    try:
-                        product = Product.objects.get(id=product_id)
-                        qty = int(quantity)
-                        cost = Decimal(unit_cost)
-                        line_total = qty * cost
-                        
-                        PurchaseItem.objects.create(
-                            purchase_order=purchase_order,
-                            product=product,
-                            quantity=qty,
-                            unit_cost=cost
-                        )
-                        
-                        # Decrement product stock
-                        product.quantity -= qty
-                        product.save()
-                        
-                        total_subtotal += line_total
-                        # Calculate tax on this line item based on purchase order tax rate
-                        line_tax = (line_total * purchase_order.tax_rate / Decimal('100')).quantize(Decimal('0.01'))
-                        total_tax += line_tax
-                    except (Product.DoesNotExist, ValueError):
-                        continue
-            
-            purchase_order.total_subtotal = total_subtotal
-            purchase_order.total_tax = total_tax
-            purchase_order.total_amount = total_subtotal + total_tax
-            
-            # Calculate change if cash is provided
-            if purchase_order.cash:
-                cash = Decimal(str(purchase_order.cash))
-                purchase_order.change = (cash - purchase_order.total_amount).quantize(Decimal('0.01'))
-            
-            purchase_order.save()
+            purchase_order.save_items(purchase_items_from_post(request.POST))
             
             from django.contrib import messages
             messages.success(request, 'Purchase order created successfully!')
@@ -566,11 +587,8 @@ class PurchaseUpdateView(LoginRequiredMixin, UpdateView):
         if form.is_valid():
             purchase_order = self.get_object()
             
-            # Restore stock from old items before deleting
-            old_items = purchase_order.items.all()
-            for old_item in old_items:
-                old_item.product.quantity += old_item.quantity
-                old_item.product.save()
+            # Release the stock reserved by the old items before deleting them
+            StockManager.release(purchase_order)
             
             # Clear existing items
             purchase_order.items.all().delete()
@@ -579,49 +597,7 @@ class PurchaseUpdateView(LoginRequiredMixin, UpdateView):
             purchase_order.cashier = request.user
             
             # Add new items from form
-            items_data = request.POST.getlist('product_id')
-            quantities = request.POST.getlist('quantity')
-            unit_costs = request.POST.getlist('unit_cost')
-            
-            total_subtotal = Decimal('0.00')
-            total_tax = Decimal('0.00')
-            
-            for product_id, quantity, unit_cost in zip(items_data, quantities, unit_costs):
-                if product_id and quantity and unit_cost:
-                    try:
-                        product = Product.objects.get(id=product_id)
-                        qty = int(quantity)
-                        cost = Decimal(unit_cost)
-                        line_total = qty * cost
-                        
-                        PurchaseItem.objects.create(
-                            purchase_order=purchase_order,
-                            product=product,
-                            quantity=qty,
-                            unit_cost=cost
-                        )
-                        
-                        # Decrement product stock
-                        product.quantity -= qty
-                        product.save()
-                        
-                        total_subtotal += line_total
-                        # Calculate tax on this line item based on purchase order tax rate
-                        line_tax = (line_total * purchase_order.tax_rate / Decimal('100')).quantize(Decimal('0.01'))
-                        total_tax += line_tax
-                    except (Product.DoesNotExist, ValueError):
-                        continue
-            
-            purchase_order.total_subtotal = total_subtotal
-            purchase_order.total_tax = total_tax
-            purchase_order.total_amount = total_subtotal + total_tax
-            
-            # Calculate change if cash is provided
-            if purchase_order.cash:
-                cash = Decimal(str(purchase_order.cash))
-                purchase_order.change = (cash - purchase_order.total_amount).quantize(Decimal('0.01'))
-            
-            purchase_order.save()
+            purchase_order.save_items(purchase_items_from_post(request.POST))
             
             from django.contrib import messages
             messages.success(request, 'Purchase order updated successfully!')
@@ -637,6 +613,12 @@ class PurchaseDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'purchases_confirm_delete.html'
     success_url = reverse_lazy('purchases-list')
 
+    def form_valid(self, form):
+        # An order that was never received gives its reserved stock back
+        with transaction.atomic():
+            StockManager.release(self.object)
+            return super().form_valid(form)
+
 
 # ---------- PROFILE ----------
 def profile(request):
@@ -681,37 +663,16 @@ def edit_profile(request):
 # ========================================
 #          ROLE-BASED MIXINS
 # ========================================
-class AdminRequiredMixin(UserPassesTestMixin):
-    """Mixin to require admin role"""
-    def test_func(self):
-        try:
-            return self.request.user.user_role.role == 'admin'
-        except UserRole.DoesNotExist:
-            return False
-    
-    def handle_no_permission(self):
-        from django.contrib import messages
-        messages.error(self.request, 'You do not have permission to access this page.')
-        return redirect('home')
-
-
-class AdminOrCashierMixin(UserPassesTestMixin):
+# AdminRequiredMixin and the role cache behind them live in core/roles.py
+class AdminOrCashierMixin(RoleRequiredMixin):
     """Mixin to require admin or cashier role"""
-    def test_func(self):
-        try:
-            return self.request.user.user_role.role in ['admin', 'cashier']
-        except UserRole.DoesNotExist:
-            return False
-    
-    def handle_no_permission(self):
-        from django.contrib import messages
-        messages.error(self.request, 'You do not have permission to access this page.')
-        return redirect('home')
+    allowed_roles = ('admin', 'cashier')
 
 
 # ========================================
 #              REPORTS & ANALYTICS
 # ========================================
+@method_decorator(use_replica, name='dispatch')
 class ReportsView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
     """Main reports dashboard"""
     template_name = 'reports/dashboard.html'
@@ -719,69 +680,17 @@ class ReportsView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        now = timezone.now()
-        
-        # Date ranges
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-        week_start = now - timedelta(days=now.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        year_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        # Daily summary
-        context['daily_summary'] = {
-            'purchases': PurchaseOrder.objects.filter(created_at__gte=today_start, created_at__lt=today_end).count(),
-            'amount': PurchaseOrder.objects.filter(created_at__gte=today_start, created_at__lt=today_end).aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-            'tax': PurchaseOrder.objects.filter(created_at__gte=today_start, created_at__lt=today_end).aggregate(Sum('total_tax'))['total_tax__sum'] or Decimal('0.00'),
-        }
-        
-        # Weekly summary
-        context['weekly_summary'] = {
-            'purchases': PurchaseOrder.objects.filter(created_at__gte=week_start, created_at__lt=now).count(),
-            'amount': PurchaseOrder.objects.filter(created_at__gte=week_start, created_at__lt=now).aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-            'tax': PurchaseOrder.objects.filter(created_at__gte=week_start, created_at__lt=now).aggregate(Sum('total_tax'))['total_tax__sum'] or Decimal('0.00'),
-        }
-        
-        # Monthly summary
-        context['monthly_summary'] = {
-            'purchases': PurchaseOrder.objects.filter(created_at__gte=month_start, created_at__lt=now).count(),
-            'amount': PurchaseOrder.objects.filter(created_at__gte=month_start, created_at__lt=now).aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-            'tax': PurchaseOrder.objects.filter(created_at__gte=month_start, created_at__lt=now).aggregate(Sum('total_tax'))['total_tax__sum'] or Decimal('0.00'),
-        }
-        
-        # Inventory status
-        total_value = 0
-        total_collected = 0
-        inventory_items = Product.objects.all()
-        for item in inventory_items:
-            total_value += float(item.quantity * item.unit_price)
-            total_collected += item.quantity
-        
-        context['inventory_summary'] = {
-            'total_products': inventory_items.count(),
-            'total_collected': total_collected,
-            'total_value': Decimal(str(total_value)).quantize(Decimal('0.01')),
-            'low_stock': inventory_items.filter(quantity__lt=settings.DEFAULT_REORDER_LEVEL).count(),
-            'out_of_stock': inventory_items.filter(quantity=0).count(),
-        }
+        # Summaries are served pre-rendered while the underlying data is unchanged
+        context['report'] = ReportCache.get('dashboard')
+        context.update(context['report']['context'])
 
-        # Audit: record that reports dashboard was viewed (concise)
-        try:
-            user = getattr(self.request, 'user', None)
-            uname = getattr(user, 'username', 'Anonymous') if user and getattr(user, 'is_authenticated', False) else 'Anonymous'
-            AuditLog.objects.create(
-                user=user,
-                action='view_reports',
-                target='reports_dashboard',
-                detail=f"User '{uname}' viewed the reports dashboard"
-            )
-        except Exception:
-            pass
+        # Audit: count the dashboard view; summaries are flushed periodically (no write per render)
+        track_read_event(self.request, 'reports_dashboard', 'reports dashboard')
 
         return context
 
 
+@method_decorator(use_replica, name='dispatch')
 class AuditLogListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
     """Paginated view for AuditLog entries (admin only)."""
     model = AuditLog
@@ -789,20 +698,34 @@ class AuditLogListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
     context_object_name = 'logs'
     paginate_by = 25
 
-    def get_queryset(self):
-        qs = AuditLog.objects.select_related('user').order_by('-created_at')
-        q = self.request.GET.get('q')
-        action = self.request.GET.get('action')
-        target = self.request.GET.get('target')
-
-        if q:
-            qs = qs.filter(detail__icontains=q)
-
-        if action:
-            qs = qs.filter(action__iexact=action)
+    def get_date_range(self):
+        """Parse ?start=/?end= (YYYY-MM-DD) into an aware [start, end) datetime range"""
+        start = parse_date(self.request.GET.get('start') or '')
+        end = parse_date(self.request.GET.get('end') or '')
+        start_dt = timezone.make_aware(datetime.combine(start, datetime.min.time())) if start else None
+        end_dt = timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time())) if end else None
+        return start_dt, end_dt
 
-        if target:
-            qs = qs.filter(target__icontains=target)
+    def get_queryset(self):
+        # Include the logins and logouts this process is still holding for a batch (batched mode only);
+        # report view counts are left to their timer, or every audit page load would write
+        activity_log.flush()
+        start, end = self.get_date_range()
+        audit_filter = AuditLogFilter(
+            q=self.request.GET.get('q'),
+            action=self.request.GET.get('action'),
+            target=self.request.GET.get('target'),
+            start=start,
+            end=end,
+        )
+        qs = audit_filter.apply(AuditLog.objects.select_related('user').order_by('-created_at', '-id'))
+
+        # Entries past the retention window live in archives; include them when the date filter reaches back.
+        # They are merged with the table by time: a partial archive run can leave older rows in the table.
+        if start or end:
+            archived = AuditArchiver.search(audit_filter)
+            if archived.archives:
+                return AuditTrail(qs, archived)
 
         return qs
 
@@ -811,6 +734,8 @@ class AuditLogListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
         context['q'] = self.request.GET.get('q', '')
         context['action'] = self.request.GET.get('action', '')
         context['target'] = self.request.GET.get('target', '')
+        context['start'] = self.request.GET.get('start', '')
+        context['end'] = self.request.GET.get('end', '')
         # Build a compact page window for pagination (center current page)
         paginator = context.get('paginator')
         page_obj = context.get('page_obj')
@@ -838,137 +763,113 @@ class AuditLogListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
 
 
 @login_required(login_url='login')
+@role_required('admin', 'inventory_clerk', message=INVENTORY_REPORT_DENIED)
+@use_replica
 def inventory_report(request):
     """Inventory status report"""
-    # Check if user is admin or inventory clerk
-    try:
-        user_role = request.user.user_role.role
-        if user_role not in ['admin', 'inventory_clerk']:
-            from django.contrib import messages
-            messages.error(request, 'You do not have permission to view inventory reports. Only Admin and Inventory Clerk can access this.')
-            return redirect('home')
-    except UserRole.DoesNotExist:
-        from django.contrib import messages
-        messages.error(request, 'User role not assigned.')
-        return redirect('home')
-    
-    products = Product.objects.select_related('category', 'supplier').all()
-    
-    context = {
-        'products': products,
-        'total_value': sum(p.quantity * p.unit_price for p in products),
-        'low_stock_count': products.filter(quantity__lt=settings.DEFAULT_REORDER_LEVEL).count(),
-        'out_of_stock_count': products.filter(quantity=0).count(),
-        'default_reorder_level': settings.DEFAULT_REORDER_LEVEL,
-    }
+    report = ReportCache.get('inventory')
+    context = {**report['context'], 'report': report}
     
     return render(request, 'reports/inventory_report.html', context)
 
 
 @login_required(login_url='login')
+@role_required('admin', message=FINANCIAL_REPORT_DENIED)
+@use_replica
 def fast_moving_report(request):
     """Fast-moving and slow-moving products report"""
-    # Check if user is admin
-    try:
-        if request.user.user_role.role != 'admin':
-            from django.contrib import messages
-            messages.error(request, 'You do not have permission to view this report. Only Administrators can access Financial & Analytics reports.')
-            return redirect('home')
-    except UserRole.DoesNotExist:
-        from django.contrib import messages
-        messages.error(request, 'User role not assigned.')
-        return redirect('home')
-    
-    # Get products with purchase frequency
-    products = Product.objects.annotate(
-        purchase_count=Count('purchaseitem'),
-        total_quantity_sold=Sum('purchaseitem__quantity')
-    ).order_by('-total_quantity_sold')
-    
-    fast_moving = products[:10]
-    slow_moving = products.reverse()[:10]
-    
+    period = request.GET.get('period', 'all')
+    report = ReportCache.get('fast_moving', period)
     context = {
-        'fast_moving': fast_moving,
-        'slow_moving': slow_moving,
+        **report['context'],
+        'report': report,
+        'period': period if period in REPORT_PERIODS else 'all',
+        'periods': [('all', 'All Time'), ('today', 'Today'), ('week', 'This Week'), ('month', 'This Month'), ('year', 'This Year')],
     }
     
     return render(request, 'reports/fast_moving_report.html', context)
 
 
 @login_required(login_url='login')
+@role_required('admin', message=FINANCIAL_REPORT_DENIED)
+@use_replica
 def profit_loss_report(request):
     """Profit and loss summary report"""
-    # Check if user is admin
-    try:
-        if request.user.user_role.role != 'admin':
-            from django.contrib import messages
-            messages.error(request, 'You do not have permission to view this report. Only Administrators can access Financial & Analytics reports.')
-            return redirect('home')
-    except UserRole.DoesNotExist:
-        from django.contrib import messages
-        messages.error(request, 'User role not assigned.')
-        return redirect('home')
-    
     now = timezone.now()
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    purchases = PurchaseOrder.objects.filter(created_at__gte=month_start)
-    
-    total_purchases = purchases.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-    total_tax = purchases.aggregate(Sum('total_tax'))['total_tax__sum'] or Decimal('0.00')
-    total_subtotal = purchases.aggregate(Sum('total_subtotal'))['total_subtotal__sum'] or Decimal('0.00')
-    
-    context = {
-        'purchases': purchases,
-        'total_purchases': total_purchases,
-        'total_tax': total_tax,
-        'total_subtotal': total_subtotal,
-        'month': now.strftime('%B %Y'),
-    }
-    
+    purchases = month_purchases(now)
+    totals = purchases.aggregate(**PROFIT_LOSS_TOTALS)
+    context = profit_loss_context(list(purchases), totals, now)
+
     return render(request, 'reports/profit_loss_report.html', context)
 
 
 @login_required(login_url='login')
-@require_http_methods(["GET"])
+@require_http_methods(["POST"])
+@role_required('admin', message='Only Administrators can export reports', json=True)
 def export_report_excel(request):
-    """Export report to Excel"""
-    # Check if user is admin
-    try:
-        if request.user.user_role.role != 'admin':
-            return JsonResponse({'error': 'Only Administrators can export reports'}, status=403)
-    except UserRole.DoesNotExist:
-        return JsonResponse({'error': 'User role not assigned'}, status=403)
-    
+    """Queue an Excel export; the file is built by a `run_jobs` worker"""
     if not EXCEL_AVAILABLE:
         return JsonResponse({'error': 'Excel export not available'}, status=400)
     
+    report_type = request.POST.get('type', 'inventory')
+    job = enqueue('export_report', {'type': report_type}, request.user)
+    return redirect('job-detail', job_id=job.pk)
+
+
+@login_required(login_url='login')
+@role_required('admin', message='Only Administrators can export reports', json=True)
+def export_report_csv(request):
+    """Stream the inventory report as CSV, one chunk of products at a time"""
     report_type = request.GET.get('type', 'inventory')
-    now = timezone.now()
-    wb = Workbook()
-    ws = wb.active
-    
-    if report_type == 'inventory':
-        ws.title = "Inventory Report"
-        ws.append(['Product Code', 'Product Name', 'Category', 'Supplier', 'Quantity', 'Unit Price', 'Total Value'])
-        
-        products = Product.objects.select_related('category', 'supplier').all()
-        for p in products:
-            ws.append([
-                p.code,
-                p.name,
-                p.category.name,
-                p.supplier.name if p.supplier else '',
-                p.quantity,
-                float(p.unit_price),
-                float(p.quantity * p.unit_price)
-            ])
-    
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename="report_{report_type}_{now.strftime("%Y%m%d")}.xlsx"'
-    wb.save(response)
-    return response
+    if report_type != 'inventory':
+        return JsonResponse({'error': f'Unknown report: {report_type}'}, status=400)
+
+    def lines():
+        writer = csv_writer()
+        yield writer.writerow(INVENTORY_COLUMNS)
+        for p in export_products().iterator(chunk_size=settings.REPORT_ITERATOR_CHUNK_SIZE):
+            yield writer.writerow(inventory_row(p))
+
+    return StreamingHttpResponse(lines(), content_type='text/csv', headers={
+        'Content-Disposition': f'attachment; filename="{report_filename(report_type, "csv")}"',
+    })
+
+
+@login_required(login_url='login')
+@require_http_methods(["POST"])
+@role_required('admin', 'inventory_clerk', message=INVENTORY_REPORT_DENIED)
+def export_report_pdf(request):
+    """Queue a PDF export; type=inventory|profit_loss, month=YYYY-MM for profit & loss"""
+    # Inventory clerks may export the inventory report; financial reports are admin only
+    if request.POST.get('type', 'inventory') == 'inventory':
+        return _queue_pdf_export(request)
+    return _queue_financial_pdf_export(request)
+
+
+@role_required('admin', message=FINANCIAL_REPORT_DENIED)
+def _queue_financial_pdf_export(request):
+    return _queue_pdf_export(request)
+
+
+def _queue_pdf_export(request):
+    from django.contrib import messages
+    report_type = request.POST.get('type', 'inventory')
+    if not PDF_AVAILABLE:
+        messages.error(request, 'PDF export not available.')
+        return redirect('reports-dashboard')
+    if report_type not in PDF_REPORT_TYPES:
+        messages.error(request, f'Unknown report: {report_type}')
+        return redirect('reports-dashboard')
+
+    month = request.POST.get('month') or None
+    try:
+        month_range(month)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('profit-loss-report')
+
+    job = enqueue('export_pdf', {'type': report_type, 'month': month}, request.user)
+    return redirect('job-detail', job_id=job.pk)
 
 
 # ========================================
@@ -985,7 +886,7 @@ class UserListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
     def get_queryset(self):
         q = self.request.GET.get('q')
         role = self.request.GET.get('role')
-        qs = User.objects.all().prefetch_related('user_role')
+        qs = User.objects.select_related('user_role').order_by('username')
         
         # Search by username or email
         if q:
@@ -1084,14 +985,9 @@ class UserCreateView(LoginRequiredMixin, AdminRequiredMixin, CreateView):
 def assign_user_role(request, user_id):
     """Assign role to user"""
     # Allow only staff users or users with the 'admin' role
-    try:
-        is_staff_flag = getattr(request.user, 'is_staff', False)
-        user_role_value = request.user.user_role.role if hasattr(request.user, 'user_role') else None
-        if not (is_staff_flag or user_role_value == 'admin'):
-            from django.contrib import messages
-            messages.error(request, 'You do not have permission to manage user roles. Only Administrators and staff can perform this action.')
-            return redirect('home')
-    except UserRole.DoesNotExist:
+    if not (request.user.is_staff or has_role(request.user, 'admin')):
+        from django.contrib import messages
+        messages.error(request, 'You do not have permission to manage user roles. Only Administrators and staff can perform this action.')
         return redirect('home')
     
     user = User.objects.get(id=user_id)
@@ -1132,6 +1028,6 @@ def assign_user_role(request, user_id):
             ('cashier', 'Cashier'),
             ('inventory_clerk', 'Inventory Clerk'),
         ],
-        'current_role': user.user_role.role if hasattr(user, 'user_role') else 'cashier'
+        'current_role': RoleCache.get(user) or 'cashier'
     }
     return render(request, 'users/assign_role.html', context)
\ No newline at end of file
@@ -0,0 +1,276 @@
+# core/views_api.py
+"""
+Versioned REST API (/api/v1/) for POS terminals and integrations.
+
+- Writes go through the web app's ModelForms, so the API accepts exactly
+  what the HTML forms accept.
+- `POST <resource>/bulk/` creates and `PATCH <resource>/bulk/` updates up
+  to API_BULK_MAX_RECORDS records per call, all or nothing.
+- Lists use cursor pagination; `?fields=a,b` returns a sparse fieldset.
+- Reads carry an ETag derived from the data-version stamps of
+  core/report_cache.py, so `If-None-Match` revalidation answers 304
+  without touching the tables.
+"""
+import hashlib
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.forms.models import model_to_dict
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import SAFE_METHODS, BasePermission, IsAuthenticated
+from rest_framework.response import Response
+from .bulk import bulk_save
+from .forms import CategoryForm, ProductForm, PurchaseItemForm, PurchaseOrderForm, SupplierForm
+from .models import Category, Product, PurchaseItem, PurchaseOrder, Supplier
+from .report_cache import ReportCache
+from .roles import RoleCache
+from .serializers import (
+    CategorySerializer, ProductSerializer, PurchaseOrderSerializer, SupplierSerializer, requested_fields,
+)
+
+
+class HasRole(BasePermission):
+    """Any role may read; writing needs one of the view's `write_roles`"""
+    message = 'Your role does not allow this action.'
+
+    def has_permission(self, request, view):
+        role = RoleCache.get(request.user)
+        if role is None:
+            return False
+        return request.method in SAFE_METHODS or role in view.write_roles
+
+
+class ConditionalGetMixin:
+    """ETag / If-None-Match for list and detail reads"""
+    # Data scopes (see core/report_cache.py) whose writes change this resource's output
+    data_scopes = ()
+
+    def get_etag(self, request):
+        version = ReportCache.data_version(self.data_scopes)
+        key = f"{request.version}|{version}|{request.get_full_path()}|{request.accepted_renderer.format}"
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional(self, handler, request, *args, **kwargs):
+        # The stamp is read before the queries run: a concurrent write can only make the ETag stale, never wrong
+        etag = self.get_etag(request)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class FormWriteMixin:
+    """Create/update through `form_class`, one record or a bulk batch at a time"""
+    form_class = None
+
+    def form_for(self, record, instance=None, partial=False):
+        if not isinstance(record, dict):
+            raise ParseError('Each record must be a JSON object')
+        data = record
+        if instance is not None and partial:
+            # Fields missing from a partial update keep their current values
+            data = {**model_to_dict(instance, fields=list(self.form_class.base_fields)), **record}
+        return self.form_class(data=data, instance=instance)
+
+    def form_errors(self, form):
+        return None if form.is_valid() else form.errors.get_json_data()
+
+    def batch_errors(self, forms):
+        """Errors of every invalid record, by index; empty when the whole batch is valid"""
+        errors = {}
+        for index, form in enumerate(forms):
+            form_errors = self.form_errors(form)
+            if form_errors:
+                errors[index] = form_errors
+        # The forms check unique fields against the database only; also reject repeats within the batch
+        model = self.form_class._meta.model
+        for field in model._meta.fields:
+            if not field.unique or field.primary_key or field.name not in self.form_class.base_fields:
+                continue
+            seen = {}
+            for index, form in enumerate(forms):
+                value = getattr(form, 'cleaned_data', {}).get(field.name)
+                if value is None or index in errors:
+                    continue
+                if value in seen:
+                    errors[index] = {field.name: [{'message': f'Duplicate of record {seen[value]} in this batch.', 'code': 'unique'}]}
+                else:
+                    seen[value] = index
+        return [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+
+    def perform_form_save(self, form):
+        # Single records are saved like the web form does, with the per-row audit trail
+        return form.save()
+
+    def perform_bulk_create(self, forms):
+        return bulk_save(self.form_class._meta.model, [form.save(commit=False) for form in forms], user=self.request.user)
+
+    def perform_bulk_update(self, forms):
+        model = self.form_class._meta.model
+        fields = [name for name in self.form_class.base_fields if name != model._meta.pk.name]
+        return bulk_save(model, [form.save(commit=False) for form in forms], fields=fields, user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        form = self.form_for(request.data)
+        form_errors = self.form_errors(form)
+        if form_errors:
+            return Response(form_errors, status=status.HTTP_400_BAD_REQUEST)
+        instance = self.perform_form_save(form)
+        return Response(self.get_serializer(instance).data, status=status.HTTP_201_CREATED)
+
+    def update(self, request, *args, **kwargs):
+        form = self.form_for(request.data, self.get_object(), partial=kwargs.pop('partial', False))
+        form_errors = self.form_errors(form)
+        if form_errors:
+            return Response(form_errors, status=status.HTTP_400_BAD_REQUEST)
+        instance = self.perform_form_save(form)
+        return Response(self.get_serializer(instance).data)
+
+    def bulk_records(self, request):
+        records = request.data
+        if not isinstance(records, list) or not records:
+            raise ParseError('Expected a non-empty JSON array of records')
+        if len(records) > settings.API_BULK_MAX_RECORDS:
+            raise ParseError(f'At most {settings.API_BULK_MAX_RECORDS} records per call')
+        return records
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        """POST: create every record; PATCH: update records identified by "id". All or nothing."""
+        records = self.bulk_records(request)
+        if request.method == 'POST':
+            forms = [self.form_for(record) for record in records]
+            errors = self.batch_errors(forms)
+            if errors:
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            instances = self.perform_bulk_create(forms)
+            status_code = status.HTTP_201_CREATED
+        else:
+            ids = []
+            for index, record in enumerate(records):
+                try:
+                    ids.append(int(record['id']))
+                except (KeyError, TypeError, ValueError):
+                    error = {'id': [{'message': 'A numeric id is required.', 'code': 'required'}]}
+                    return Response({'errors': [{'index': index, 'errors': error}]}, status=status.HTTP_400_BAD_REQUEST)
+            if len(set(ids)) != len(ids):
+                raise ParseError('Each id may appear only once per call')
+            existing = self.form_class._meta.model.objects.in_bulk(ids)
+            missing = [{'index': index, 'errors': {'id': [{'message': f'No record with id {pk}.', 'code': 'does_not_exist'}]}}
+                       for index, pk in enumerate(ids) if pk not in existing]
+            if missing:
+                return Response({'errors': missing}, status=status.HTTP_400_BAD_REQUEST)
+            forms = [self.form_for(record, existing[pk], partial=True) for record, pk in zip(records, ids)]
+            errors = self.batch_errors(forms)
+            if errors:
+                return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            instances = self.perform_bulk_update(forms)
+            status_code = status.HTTP_200_OK
+        data = self.get_serializer(instances, many=True).data
+        return Response({'count': len(instances), 'results': data}, status=status_code)
+
+
+class ApiViewSet(ConditionalGetMixin, FormWriteMixin, viewsets.ModelViewSet):
+    permission_classes = [IsAuthenticated, HasRole]
+    write_roles = ('admin', 'inventory_clerk')
+    # Records are created and edited here; deleting stays in the web app
+    http_method_names = ['get', 'post', 'put', 'patch', 'head', 'options']
+
+
+# ========================================
+#              RESOURCES
+# ========================================
+class CategoryViewSet(ApiViewSet):
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    form_class = CategoryForm
+    data_scopes = ('products',)
+
+
+class SupplierViewSet(ApiViewSet):
+    queryset = Supplier.objects.all()
+    serializer_class = SupplierSerializer
+    form_class = SupplierForm
+    data_scopes = ('products',)
+
+
+class ProductViewSet(ApiViewSet):
+    serializer_class = ProductSerializer
+    form_class = ProductForm
+    data_scopes = ('products',)
+
+    def get_queryset(self):
+        # Only join the tables whose names were asked for
+        fields = requested_fields(self.request)
+        related = [name for name in ('category', 'supplier') if fields is None or f'{name}_name' in fields]
+        return Product.objects.select_related(*related)
+
+
+class PurchaseOrderViewSet(ApiViewSet):
+    """Purchase orders are created here (singly or in bulk); edits that restock go through the web form"""
+    serializer_class = PurchaseOrderSerializer
+    form_class = PurchaseOrderForm
+    data_scopes = ('products', 'purchases')
+    write_roles = ('admin', 'cashier')
+    http_method_names = ['get', 'post', 'head', 'options']
+
+    def get_queryset(self):
+        fields = requested_fields(self.request)
+        queryset = PurchaseOrder.objects.all()
+        if fields is None or 'items' in fields:
+            queryset = queryset.prefetch_related(Prefetch('items', queryset=PurchaseItem.objects.select_related('product')))
+        return queryset
+
+    def form_for(self, record, instance=None, partial=False):
+        if not isinstance(record, dict):
+            raise ParseError('Each record must be a JSON object')
+        # Totals and the cashier are computed server-side, as in the web form
+        data = {**record, 'total_subtotal': 0, 'total_tax': 0, 'cashier': None}
+        form = self.form_class(data=data)
+        items = record.get('items')
+        form.item_forms = [PurchaseItemForm(data=item) for item in items] if isinstance(items, list) else []
+        return form
+
+    def form_errors(self, form):
+        errors = super().form_errors(form) or {}
+        if not form.item_forms:
+            errors['items'] = [{'message': 'At least one item is required.', 'code': 'required'}]
+        else:
+            item_errors = [{'index': index, 'errors': item.errors.get_json_data()}
+                           for index, item in enumerate(form.item_forms) if not item.is_valid()]
+            if item_errors:
+                errors['items'] = item_errors
+        return errors or None
+
+    def save_order(self, form):
+        order = form.save(commit=False)
+        order.cashier = self.request.user
+        order.save()
+        order.save_items([
+            (item.cleaned_data['product'], item.cleaned_data['quantity'], item.cleaned_data['unit_cost'])
+            for item in form.item_forms
+        ])
+        return order
+
+    def perform_form_save(self, form):
+        with transaction.atomic():
+            return self.save_order(form)
+
+    def perform_bulk_create(self, forms):
+        # Orders move stock, so each goes through the same path as the web form, in one transaction
+        with transaction.atomic():
+            return [self.save_order(form) for form in forms]
@@ -0,0 +1,104 @@
+# core/views_async.py
+"""
+Async (ASGI) variants of the report views and the CSV export.
+
+Each awaits its I/O instead of holding a sync thread for the whole
+request: the dashboard and inventory report await the report cache
+(ReportCache.aget), the profit & loss report reads its totals with
+aaggregate() and its rows with aiterator(), and the CSV export streams
+rows from aiterator() through an async generator. Templates still render
+in a thread. The Excel and PDF exports are queued jobs, so they have no
+async variant. They are routed in place of the sync views when
+ASYNC_VIEWS is enabled (see projectsite/urls.py).
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from .db_routers import use_replica
+from .read_events import track_read_event
+from .report_cache import ReportCache
+from .reports import (
+    INVENTORY_COLUMNS, PROFIT_LOSS_TOTALS, csv_writer, export_products, inventory_row, month_purchases,
+    profit_loss_context, report_filename,
+)
+from .roles import FINANCIAL_REPORT_DENIED, INVENTORY_REPORT_DENIED, RoleCache, role_required
+
+
+async def deny(request, message):
+    # Message storage touches the session, which is sync-only
+    await sync_to_async(messages.error)(request, message)
+    return redirect('home')
+
+
+async def render_async(request, template_name, context):
+    # Templates and context processors may hit the ORM (e.g. request.user), so render in a thread
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@method_decorator(use_replica, name='get')
+class AsyncReportsView(View):
+    """Main reports dashboard (async)"""
+    template_name = 'reports/dashboard.html'
+    login_url = 'login'
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), self.login_url)
+        if await RoleCache.aget(user) != 'admin':
+            return await deny(request, 'You do not have permission to access this page.')
+
+        context = await self.get_context_data()
+        await sync_to_async(track_read_event)(request, 'reports_dashboard', 'reports dashboard')
+        return await render_async(request, self.template_name, context)
+
+    async def get_context_data(self):
+        report = await ReportCache.aget('dashboard')
+        return {**report['context'], 'report': report}
+
+
+@login_required(login_url='login')
+@role_required('admin', 'inventory_clerk', message=INVENTORY_REPORT_DENIED)
+@use_replica
+async def inventory_report(request):
+    """Inventory status report (async)"""
+    report = await ReportCache.aget('inventory')
+    return await render_async(request, 'reports/inventory_report.html', {**report['context'], 'report': report})
+
+
+@login_required(login_url='login')
+@role_required('admin', message=FINANCIAL_REPORT_DENIED)
+@use_replica
+async def profit_loss_report(request):
+    """Profit and loss summary report (async)"""
+    now = timezone.now()
+    purchases = month_purchases(now)
+    totals = await purchases.aaggregate(**PROFIT_LOSS_TOTALS)
+    rows = [p async for p in purchases.aiterator(chunk_size=settings.REPORT_ITERATOR_CHUNK_SIZE)]
+    return await render_async(request, 'reports/profit_loss_report.html', profit_loss_context(rows, totals, now))
+
+
+@login_required(login_url='login')
+@role_required('admin', message='Only Administrators can export reports', json=True)
+async def export_report_csv(request):
+    """Stream the inventory report as CSV (async); each chunk of products is awaited, not fetched in one go"""
+    report_type = request.GET.get('type', 'inventory')
+    if report_type != 'inventory':
+        return JsonResponse({'error': f'Unknown report: {report_type}'}, status=400)
+
+    async def lines():
+        writer = csv_writer()
+        yield writer.writerow(INVENTORY_COLUMNS)
+        async for p in export_products().aiterator(chunk_size=settings.REPORT_ITERATOR_CHUNK_SIZE):
+            yield writer.writerow(inventory_row(p))
+
+    return StreamingHttpResponse(lines(), content_type='text/csv', headers={
+        'Content-Disposition': f'attachment; filename="{report_filename(report_type, "csv")}"',
+    })
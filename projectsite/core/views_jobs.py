@@ -0,0 +1,74 @@
+# core/views_jobs.py
+from pathlib import Path
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from .models import Job
+from .roles import RoleCache, role_required
+
+
+def job_status_payload(job):
+    """JSON-friendly job state polled by the job detail page"""
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'kind_display': job.get_kind_display(),
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'progress_message': job.progress_message,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'finished': job.is_finished,
+        'message': (job.result or {}).get('message', ''),
+        'error': job.error,
+        'download_url': reverse('job-download', args=[job.pk]) if job.result_file else '',
+    }
+
+
+def _may_see(user, job):
+    """Admins see every job; other users the jobs they queued (e.g. an inventory clerk's PDF export)"""
+    return RoleCache.get(user) == 'admin' or (job.created_by_id is not None and job.created_by_id == user.pk)
+
+
+@login_required(login_url='login')
+@role_required('admin', message='Only administrators can view background jobs.')
+def job_list_view(request):
+    """Recent background jobs"""
+    jobs = Job.objects.select_related('created_by')[:50]
+    return render(request, 'jobs/job_list.html', {'jobs': jobs})
+
+
+@login_required(login_url='login')
+def job_detail_view(request, job_id):
+    """Progress page for one job; polls job_status_view until the job finishes"""
+    job = get_object_or_404(Job, pk=job_id)
+    if not _may_see(request.user, job):
+        messages.error(request, 'Only administrators can view background jobs.')
+        return redirect('home')
+    return render(request, 'jobs/job_detail.html', {'job': job, 'status': job_status_payload(job)})
+
+
+@login_required(login_url='login')
+def job_status_view(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    if not _may_see(request.user, job):
+        return JsonResponse({'error': 'Only administrators can view background jobs'}, status=403)
+    return JsonResponse(job_status_payload(job))
+
+
+@login_required(login_url='login')
+def job_download_view(request, job_id):
+    """Download the file a job produced (e.g. an Excel or PDF export)"""
+    job = get_object_or_404(Job, pk=job_id, status='succeeded')
+    if not _may_see(request.user, job):
+        messages.error(request, 'Only administrators can download job results.')
+        return redirect('home')
+    path = Path(settings.JOB_RESULT_DIR) / job.result_file
+    if not job.result_file or not path.exists():
+        raise Http404('Result file has expired')
+    filename = (job.result or {}).get('filename') or path.name
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 
     # Third-party
     'widget_tweaks',
+    'rest_framework',
 
     # Local apps
     'core',
@@ -51,19 +52,32 @@ LOGIN_REDIRECT_URL = '/'
 LOGIN_URL = '/login/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# ---------------- SESSIONS ----------------
+# Database sessions by default. Set SESSION_ENGINE=django.contrib.sessions.backends.cache to keep sessions in
+# the shared cache only (no session writes to the database; sessions end when the cache is cleared), or
+# ...backends.cached_db to write through to the database but read from the cache.
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+
 # ---------------- MIDDLEWARE ----------------
 MIDDLEWARE = [
+    'core.middleware.TemplateProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'core.middleware.CurrentUserMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware'
 ]
 
+# ---------------- ASYNC VIEWS ----------------
+# Serve reports and exports with their async variants (core/views_async.py);
+# enable when running under an ASGI server such as uvicorn
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
 # ---------------- URLS / WSGI ----------------
 ROOT_URLCONF = 'projectsite.urls'
 WSGI_APPLICATION = 'projectsite.wsgi.application'
@@ -73,25 +87,209 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'core' / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates are compiled once per process and kept in memory; runserver's
+            # autoreloader clears the cache when a template file changes
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',  # required by allauth
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.roles.role',
             ],
         },
     },
 ]
 
+# Page fragments wrapped in {% datacache %} (core/templatetags/fragment_cache.py) are also
+# invalidated by writes to the data they show
+FRAGMENT_CACHE_SECONDS = int(os.environ.get('FRAGMENT_CACHE_SECONDS', 6 * 60 * 60))
+
+# Log the slowest templates and tags of every request to 'core.profiling' (core/profiling.py)
+TEMPLATE_PROFILING = os.environ.get('TEMPLATE_PROFILING', '0') == '1'
+TEMPLATE_PROFILING_TOP = int(os.environ.get('TEMPLATE_PROFILING_TOP', 10))
+
 # ---------------- DATABASE ----------------
-DATABASES = {
-    'default': {
+# DB_ENGINE=sqlite (default, local development) or DB_ENGINE=postgresql (production)
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'inventory'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Persistent connections, validated before reuse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10)),
+            },
+        }
+    }
+
+    # Optional connection pooler: 'pgbouncer' (external) or 'psycopg' (psycopg 3 built-in pool)
+    DB_POOLER = os.environ.get('DB_POOLER', '').lower()
+    if DB_POOLER == 'pgbouncer':
+        # Transaction pooling cannot keep server-side cursors open between statements
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif DB_POOLER == 'psycopg':
+        # Django requires CONN_MAX_AGE = 0 when the driver manages the pool
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Take the write lock when a transaction starts and wait up to SQLITE_TIMEOUT seconds for it, so
+                # bursts of writers (e.g. logins at a shift change) queue instead of failing with "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': int(os.environ.get('SQLITE_TIMEOUT', 20)),
+            },
+        }
+    }
+
+# ---------------- READ REPLICA ----------------
+# Heavy report/audit reads go to a 'replica' alias when one is configured:
+#   DB_REPLICA_HOST=...   PostgreSQL streaming replica (same credentials as default)
+#   DB_REPLICA=sqlite     local emulation; refresh the copy with `manage.py refresh_replica`
+if DB_ENGINE in ('postgres', 'postgresql') and os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif DB_ENGINE == 'sqlite' and os.environ.get('DB_REPLICA', '').lower() == 'sqlite':
+    DATABASES['replica'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+
+# Seconds a client keeps reading from the primary after a write (read-your-writes)
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 15))
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+# Rows fetched per round trip by report/export iterators (server-side cursors on PostgreSQL)
+REPORT_ITERATOR_CHUNK_SIZE = int(os.environ.get('REPORT_ITERATOR_CHUNK_SIZE', 2000))
+
+# Backup compression: gzip level, compressor threads and bytes per independently compressed chunk
+BACKUP_COMPRESSION_LEVEL = int(os.environ.get('BACKUP_COMPRESSION_LEVEL', 6))
+BACKUP_COMPRESSION_WORKERS = int(os.environ.get('BACKUP_COMPRESSION_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+BACKUP_COMPRESSION_CHUNK_SIZE = int(os.environ.get('BACKUP_COMPRESSION_CHUNK_SIZE', 4 * 1024 * 1024))
+
+# SQLite pages copied per step of a restore point; writers wait at most one step (core/backup.py)
+RESTORE_POINT_STEP_PAGES = int(os.environ.get('RESTORE_POINT_STEP_PAGES', 1024))
+
+# Parallel decompress-and-check jobs run by `manage.py verify_backups`
+BACKUP_VERIFY_WORKERS = int(os.environ.get('BACKUP_VERIFY_WORKERS', 2))
+
+# ---------------- CACHE ----------------
+# Shared by all web and worker processes so `warm_report_cache` warms what the views read.
+# Point CACHE_BACKEND/CACHE_LOCATION at e.g. django.core.cache.backends.redis.RedisCache / redis://... in production.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
     }
 }
+# Pre-rendered reports are also invalidated by writes to the tables they read (core/report_cache.py)
+REPORT_CACHE_SECONDS = int(os.environ.get('REPORT_CACHE_SECONDS', 24 * 60 * 60))
+# User roles for permission checks (core/roles.py); role changes invalidate them at once
+ROLE_CACHE_SECONDS = int(os.environ.get('ROLE_CACHE_SECONDS', 15 * 60))
+
+# ---------------- CHANGE CAPTURE (POINT-IN-TIME RECOVERY) ----------------
+# Ship every committed row change to backups/changes/ so restores can replay up to a timestamp
+CHANGE_CAPTURE = os.environ.get('CHANGE_CAPTURE', '0') == '1'
+CHANGE_CAPTURE_SEGMENT_SECONDS = int(os.environ.get('CHANGE_CAPTURE_SEGMENT_SECONDS', 300))
+CHANGE_CAPTURE_SEGMENT_BYTES = int(os.environ.get('CHANGE_CAPTURE_SEGMENT_BYTES', 8 * 1024 * 1024))
+
+# ---------------- REST API ----------------
+# Versioned JSON API under /api/v1/ (core/views_api.py); POS terminals use HTTP Basic over HTTPS
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.NamespaceVersioning',
+    'ALLOWED_VERSIONS': ['v1'],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CursorPage',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 100)),
+}
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+# Records accepted by one bulk call, and rows per INSERT/UPDATE statement when writing them
+API_BULK_MAX_RECORDS = int(os.environ.get('API_BULK_MAX_RECORDS', 1000))
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 500))
+
+# ---------------- PRODUCT IMPORT ----------------
+# Rows validated and upserted per transaction (and per audit entry) by `import_products` (core/imports.py)
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+
+# ---------------- PDF EXPORT ----------------
+# Report rows per PDF table (about one page; longer tables are split across pages) (core/pdf_reports.py)
+PDF_ROWS_PER_TABLE = int(os.environ.get('PDF_ROWS_PER_TABLE', 30))
+# Reports rendered in parallel by `manage.py export_pdf_reports`
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+
+# ---------------- JOB QUEUE ----------------
+# Background jobs run by `manage.py run_jobs` (backups, restores, cleanups, exports)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', 2))
+JOB_RETRY_BACKOFF_SECONDS = int(os.environ.get('JOB_RETRY_BACKOFF_SECONDS', 30))
+# A running job without a progress update for this long is assumed orphaned and requeued
+JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 3600))
+JOB_RESULT_DIR = BASE_DIR / 'job_results'
+JOB_RESULT_RETENTION_DAYS = int(os.environ.get('JOB_RESULT_RETENTION_DAYS', 7))
+
+# ---------------- BACKUP SCHEDULER ----------------
+# Cadence for `manage.py backup_scheduler`; the weekly backup runs at the daily time on that weekday
+BACKUP_SCHEDULE_HOURLY = os.environ.get('BACKUP_SCHEDULE_HOURLY', '1') == '1'
+BACKUP_SCHEDULE_DAILY_AT = os.environ.get('BACKUP_SCHEDULE_DAILY_AT', '02:00')  # '' disables
+BACKUP_SCHEDULE_WEEKLY_DAY = int(os.environ.get('BACKUP_SCHEDULE_WEEKLY_DAY', 6))  # 0=Mon .. 6=Sun, -1 disables
+# Grandfather-father-son retention for scheduled backups
+BACKUP_RETENTION_HOURLY = int(os.environ.get('BACKUP_RETENTION_HOURLY', 24))
+BACKUP_RETENTION_DAILY = int(os.environ.get('BACKUP_RETENTION_DAILY', 7))
+BACKUP_RETENTION_WEEKLY = int(os.environ.get('BACKUP_RETENTION_WEEKLY', 4))
+BACKUP_RETENTION_MONTHLY = int(os.environ.get('BACKUP_RETENTION_MONTHLY', 12))
+# Random delay added to each run, and CPU niceness (I/O is set to idle class where ionice exists)
+BACKUP_SCHEDULER_JITTER_SECONDS = int(os.environ.get('BACKUP_SCHEDULER_JITTER_SECONDS', 300))
+BACKUP_SCHEDULER_NICE = int(os.environ.get('BACKUP_SCHEDULER_NICE', 10))
+BACKUP_SCHEDULER_HEALTH_FILE = BASE_DIR / 'backups' / 'scheduler_health.json'
+BACKUP_SCHEDULER_METRICS_FILE = BASE_DIR / 'backups' / 'scheduler_metrics.jsonl'
+
+# Client binaries used by BackupManager when running on PostgreSQL
+PG_DUMP_BIN = os.environ.get('PG_DUMP_BIN', 'pg_dump')
+PSQL_BIN = os.environ.get('PSQL_BIN', 'psql')
+
+# ---------------- LOGGING ----------------
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
 
 # ---------------- PASSWORD VALIDATORS ----------------
 AUTH_PASSWORD_VALIDATORS = [
@@ -122,5 +320,23 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Where to redirect users after login
 LOGIN_REDIRECT_URL = '/'
 
-# Default reorder threshold used where `reorder_level` field was removed
-DEFAULT_REORDER_LEVEL = 5
+# Report page views: 'aggregate' (hourly summaries per user/page), 'immediate' (row per view) or 'off'.
+# Aggregated counts are written by a background timer READ_EVENT_FLUSH_SECONDS after the first view
+READ_EVENT_TRACKING = os.environ.get('READ_EVENT_TRACKING', 'aggregate')
+READ_EVENT_FLUSH_SECONDS = int(os.environ.get('READ_EVENT_FLUSH_SECONDS', 60))
+
+# Login/logout audit rows: 'immediate' (row per event) or 'batched' (bulk insert every ACTIVITY_LOG_BATCH_SIZE rows
+# or ACTIVITY_LOG_FLUSH_SECONDS, whichever comes first; rows still queued are lost if the worker is killed)
+ACTIVITY_LOG = os.environ.get('ACTIVITY_LOG', 'immediate')
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', 50))
+ACTIVITY_LOG_FLUSH_SECONDS = int(os.environ.get('ACTIVITY_LOG_FLUSH_SECONDS', 10))
+
+# Audit rows older than this are moved to compressed archives by `archive_audit_logs`
+AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', 180))
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'archives' / 'audit'
+
+# Reorder level given to new products; each product's own `reorder_level` decides when it is low on stock
+DEFAULT_REORDER_LEVEL = int(os.environ.get('DEFAULT_REORDER_LEVEL', 5))
+# Reorder suggestions (core/stock.py): sales velocity window, and days of sales the suggested quantity should cover
+REORDER_VELOCITY_DAYS = int(os.environ.get('REORDER_VELOCITY_DAYS', 30))
+REORDER_COVER_DAYS = int(os.environ.get('REORDER_COVER_DAYS', 14))
@@ -1,11 +1,25 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
-from core import views
+from django.conf import settings
+from rest_framework.routers import DefaultRouter
+from core import views, views_api, views_async
 from core.views_backup import (
     BackupListView, create_backup_view, restore_backup_view, 
     delete_backup_view, cleanup_backups_view
 )
+from core.views_jobs import job_list_view, job_detail_view, job_status_view, job_download_view
+
+# Under ASGI the reports and the CSV export are served by their async variants
+reports = views_async if settings.ASYNC_VIEWS else views
+ReportsView = views_async.AsyncReportsView if settings.ASYNC_VIEWS else views.ReportsView
+
+# REST API, version 1 (see core/views_api.py)
+api_v1 = DefaultRouter()
+api_v1.register('products', views_api.ProductViewSet, basename='product')
+api_v1.register('categories', views_api.CategoryViewSet, basename='category')
+api_v1.register('suppliers', views_api.SupplierViewSet, basename='supplier')
+api_v1.register('purchase-orders', views_api.PurchaseOrderViewSet, basename='purchase-order')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -29,6 +43,7 @@ urlpatterns = [
     # Products
     path('products/', views.ProductListView.as_view(), name='products-list'),
     path('products/add/', views.ProductCreateView.as_view(), name='products-add'),
+    path('products/import/', views.product_import_view, name='products-import'),
     path('products/<int:pk>/edit/', views.ProductUpdateView.as_view(), name='products-edit'),
     path('products/<int:pk>/delete/', views.ProductDeleteView.as_view(), name='products-delete'),
 
@@ -46,11 +61,13 @@ urlpatterns = [
     path('purchases/<int:pk>/delete/', views.PurchaseDeleteView.as_view(), name='purchases-delete'),
 
     # Reports & Analytics
-    path('reports/', views.ReportsView.as_view(), name='reports-dashboard'),
-    path('reports/inventory/', views.inventory_report, name='inventory-report'),
+    path('reports/', ReportsView.as_view(), name='reports-dashboard'),
+    path('reports/inventory/', reports.inventory_report, name='inventory-report'),
     path('reports/fast-moving/', views.fast_moving_report, name='fast-moving-report'),
-    path('reports/profit-loss/', views.profit_loss_report, name='profit-loss-report'),
+    path('reports/profit-loss/', reports.profit_loss_report, name='profit-loss-report'),
     path('reports/export/excel/', views.export_report_excel, name='export-excel'),
+    path('reports/export/csv/', reports.export_report_csv, name='export-csv'),
+    path('reports/export/pdf/', views.export_report_pdf, name='export-pdf'),
 
     # User Management
     path('users/', views.UserListView.as_view(), name='user-list'),
@@ -66,6 +83,15 @@ urlpatterns = [
     path('backups/<str:backup_filename>/restore/', restore_backup_view, name='backup-restore'),
     path('backups/<str:backup_filename>/delete/', delete_backup_view, name='backup-delete'),
     path('backups/cleanup/', cleanup_backups_view, name='backup-cleanup'),
+
+    # Background jobs
+    path('jobs/', job_list_view, name='job-list'),
+    path('jobs/<int:job_id>/', job_detail_view, name='job-detail'),
+    path('jobs/<int:job_id>/status/', job_status_view, name='job-status'),
+    path('jobs/<int:job_id>/download/', job_download_view, name='job-download'),
     # Audit logs (admin)
     path('audit-logs/', views.AuditLogListView.as_view(), name='audit-log-list'),
+
+    # REST API
+    path('api/v1/', include((api_v1.urls, 'v1'), namespace='v1')),
 ]